@@ -0,0 +1,229 @@
+'''
+This file plots the results of several running CoSimulations continuously in one window.
+Each result file is followed by an incremental reader, i.e. only the lines appended since
+the last update are parsed, the data is decimated for plotting and all subplots are
+refreshed together in one event-loop tick.
+E.g. the displacement of several SDoF or FSI runs can be observed at the same time:
+    python live_result_dashboard.py ../pure_sdof/results_sdof.dat run_*/results_sdof.dat
+Chair of Structural Analysis, Technical University of Munich
+'''
+
+import os
+import sys
+import glob
+
+import numpy as np
+import matplotlib.pyplot as plt
+
+class ResultInfoContainer:
+    def __init__(self,
+                 ColumnIndex=-1,
+                 Label="default_lable",
+                 YAxisUpperLimit=None,
+                 YAxisLowerLimit=None,
+                 Factor=1):
+        if ColumnIndex == -1:
+            raise Exception("Please specify a column index for " + Label)
+        self.Label = Label
+        self.ColumnIndex = ColumnIndex
+        self.YAxisUpperLimit = YAxisUpperLimit # default is "None" if no limit is set
+        self.YAxisLowerLimit = YAxisLowerLimit # default is "None" if no limit is set
+        self.Factor = Factor
+
+
+class IncrementalResultReader:
+    """Reads a growing result file, parsing only the lines appended since the last update.
+
+    Incomplete trailing lines (the solver is still writing them) are kept until they are
+    terminated. If the file is truncated (e.g. the run was restarted) the reader starts over.
+    """
+    def __init__(self, file_name, columns, num_rows_to_skip=1, comments="#", initial_capacity=1024):
+        self.file_name = file_name
+        self.columns = tuple(columns)
+        self.num_rows_to_skip = num_rows_to_skip
+        self.comments = comments
+        self.initial_capacity = initial_capacity
+        self.Reset()
+
+    def Reset(self):
+        self.__offset = 0
+        self.__num_skipped_rows = 0
+        self.__pending_bytes = b""
+        self.__buffer = np.empty((self.initial_capacity, len(self.columns)))
+        self.__size = 0
+
+    @property
+    def data(self):
+        """view on the rows read so far, one column per requested column index"""
+        return self.__buffer[:self.__size]
+
+    def Update(self):
+        """reads the new lines of the file and returns the number of new rows"""
+        try:
+            file_size = os.path.getsize(self.file_name)
+        except OSError: # the run did not start writing yet
+            return 0
+
+        if file_size < self.__offset:
+            self.Reset()
+        if file_size == self.__offset:
+            return 0
+
+        with open(self.file_name, "rb") as result_file:
+            result_file.seek(self.__offset)
+            new_bytes = result_file.read(file_size - self.__offset)
+        self.__offset += len(new_bytes)
+
+        new_bytes = self.__pending_bytes + new_bytes
+        last_line_end = new_bytes.rfind(b"\n")
+        if last_line_end == -1:
+            self.__pending_bytes = new_bytes
+            return 0
+        self.__pending_bytes = new_bytes[last_line_end+1:]
+
+        lines = new_bytes[:last_line_end].decode().splitlines()
+        num_rows_to_skip = min(self.num_rows_to_skip - self.__num_skipped_rows, len(lines))
+        self.__num_skipped_rows += num_rows_to_skip
+        lines = lines[num_rows_to_skip:]
+        if len(lines) == 0:
+            return 0
+
+        try:
+            new_rows = np.loadtxt(lines, usecols=self.columns, comments=self.comments, ndmin=2)
+        except IndexError:
+            raise Exception("Loading the results of " + self.file_name + " failed, check the requested ColumnIndices!")
+
+        self.__Append(new_rows)
+        return new_rows.shape[0]
+
+    def __Append(self, new_rows):
+        required_size = self.__size + new_rows.shape[0]
+        if required_size > self.__buffer.shape[0]:
+            new_capacity = max(required_size, 2*self.__buffer.shape[0]) # amortized growth
+            new_buffer = np.empty((new_capacity, self.__buffer.shape[1]))
+            new_buffer[:self.__size] = self.__buffer[:self.__size]
+            self.__buffer = new_buffer
+        self.__buffer[self.__size:required_size] = new_rows
+        self.__size = required_size
+
+
+def DecimateMinMax(x, y, max_num_points):
+    """reduces (x,y) to at most max_num_points points, keeping min and max of each bucket
+
+    Keeping the extrema (instead of plain striding) preserves the peaks of oscillating signals.
+    max_num_points has to be at least 2, the min and max of one bucket.
+    """
+    if max_num_points < 2:
+        raise Exception("The number of points to plot has to be at least 2, got " + str(max_num_points))
+    num_points = x.shape[0]
+    if num_points <= max_num_points:
+        return x, y
+
+    num_buckets = max_num_points // 2
+    bucket_size = num_points // num_buckets
+    num_used_points = num_buckets * bucket_size
+    start = num_points - num_used_points # the most recent values are always kept
+
+    y_buckets = y[start:].reshape(num_buckets, bucket_size)
+    offsets = np.arange(num_buckets) * bucket_size + start
+    min_indices = offsets + np.argmin(y_buckets, axis=1)
+    max_indices = offsets + np.argmax(y_buckets, axis=1)
+    indices = np.sort(np.concatenate((min_indices, max_indices)))
+
+    return x[indices], y[indices]
+
+
+class LiveResultDashboard:
+    """Shows the same result quantities of several runs, one subplot per quantity and one line per run"""
+    def __init__(self, file_names, results, index_x_axis=0, label_x_axis="Time [sec]",
+                 num_rows_to_skip=1, num_points_to_plot=500000, max_num_plotted_points=2000,
+                 plot_title=""):
+        if max_num_plotted_points < 2:
+            raise Exception("Please specify at least 2 for max_num_plotted_points, the min and max of one bucket")
+        self.results = results
+        self.num_points_to_plot = num_points_to_plot
+        self.max_num_plotted_points = max_num_plotted_points
+
+        columns = (index_x_axis,) + tuple(res.ColumnIndex for res in results)
+        self.readers = [IncrementalResultReader(file_name, columns, num_rows_to_skip) for file_name in file_names]
+
+        self.fig, axes = plt.subplots(len(results), 1, sharex=True, squeeze=False)
+        self.axes = axes[:,0]
+        self.lines = [] # lines[i_run][i_result]
+        for file_name in file_names:
+            self.lines.append([ax.plot([], [], lw=1.0, label=file_name)[0] for ax in self.axes])
+
+        for ax, res in zip(self.axes, results):
+            ax.set_ylabel(res.Label)
+            ax.grid(True)
+        self.axes[0].set_title(plot_title)
+        self.axes[-1].set_xlabel(label_x_axis)
+        if len(file_names) <= 10: # otherwise the legend hides the results
+            self.axes[0].legend(loc="upper left", fontsize="small")
+
+    def Update(self):
+        """reads the new data of all runs and redraws the figure once, returns if anything changed"""
+        num_new_rows = sum(reader.Update() for reader in self.readers)
+        if num_new_rows == 0:
+            return False
+
+        for reader, run_lines in zip(self.readers, self.lines):
+            data = reader.data[-self.num_points_to_plot:]
+            for i_result, (line, res) in enumerate(zip(run_lines, self.results)):
+                x, y = DecimateMinMax(data[:,0], data[:,i_result+1], self.max_num_plotted_points)
+                line.set_data(x, y*res.Factor)
+
+        for ax, res in zip(self.axes, self.results):
+            ax.relim()
+            ax.autoscale_view()
+            if res.YAxisLowerLimit is not None:
+                ax.set_ylim(bottom=res.YAxisLowerLimit)
+            if res.YAxisUpperLimit is not None:
+                ax.set_ylim(top=res.YAxisUpperLimit)
+
+        self.fig.canvas.draw_idle()
+        return True
+
+    def Run(self, plot_update_time):
+        plt.ion() # this is responsible for the continuous plot updates
+        plt.show()
+        while plt.fignum_exists(self.fig.number): # runs until the window is closed
+            self.Update()
+            plt.pause(plot_update_time)
+
+
+if __name__ == "__main__":
+    # =============================================================================
+    file_names = ["results_sdof.dat"] # used if no files are passed as arguments
+    num_rows_to_skip       = 1 # in case there is a header in the file
+    num_points_to_plot     = 500000 # number of data points to plot => e.g. seconds to display / delta_t
+    max_num_plotted_points = 2000 # points per line after decimation
+    plot_update_time       = 2 # [sec]
+
+    index_x_axis = 0
+    label_x_axis = "Time [sec]"
+
+    results = []
+    results.append(ResultInfoContainer(ColumnIndex=1, Label="Displacement [m]"))
+
+    plot_title = "CoSimulation Results"
+    # =============================================================================
+
+    if len(sys.argv) > 1:
+        file_names = []
+        for pattern in sys.argv[1:]:
+            file_names.extend(sorted(glob.glob(pattern)) or [pattern]) # runs that did not start yet are watched too
+
+    print("=====================================================")
+    print("INFO: Watching " + str(len(file_names)) + " result file(s), close the window to stop")
+    print("=====================================================\n")
+
+    dashboard = LiveResultDashboard(file_names,
+                                    results,
+                                    index_x_axis=index_x_axis,
+                                    label_x_axis=label_x_axis,
+                                    num_rows_to_skip=num_rows_to_skip,
+                                    num_points_to_plot=num_points_to_plot,
+                                    max_num_plotted_points=max_num_plotted_points,
+                                    plot_title=plot_title)
+    dashboard.Run(plot_update_time)
@@ -5,8 +5,12 @@ Philipp Bucher, 15.10.2017
 Chair of Structural Analysis, Technical University of Munich
 '''
 
+import os
+import sys
 import matplotlib.pyplot as plt
-from numpy import loadtxt
+
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from result_file_loader import LoadResultFile
 
 class ResultInfoContainer:
     def __init__(self,
@@ -73,18 +77,23 @@ num_points_to_plot = int((-1)*num_points_to_plot) # conversion to make the list
 
 fig,ax = plt.subplots(num_results,1)
 
+def LoadColumns(file_name, use_cache):
+    try:
+        data = LoadResultFile(file_name, skiprows=num_rows_to_skip, usecols=col_tuple, use_cache=use_cache)
+    except IndexError:
+        raise Exception("Loading the results failed, check the requested ColumnIndices!")
+    return [data[name] for name in data.dtype.names]
+
 if ref_file_name == "":
     using_ref_file = False
 else:
     using_ref_file = True
+    # the reference file does not change, it is read once (from the cache if it was parsed before)
+    data_res_ref = LoadColumns(ref_file_name, use_cache=True)
 
 while(True): # You have to kill this manually!
-    try:
-        data_results = loadtxt(file_name, skiprows=num_rows_to_skip, usecols=col_tuple, unpack=True)
-        if using_ref_file:
-            data_res_ref = loadtxt(ref_file_name, skiprows=num_rows_to_skip, usecols=col_tuple, unpack=True)
-    except IndexError:
-        raise Exception("Loading the results failed, check the requested ColumnIndices!")
+    # the result file grows while it is plotted, a cache would be outdated at every update
+    data_results = LoadColumns(file_name, use_cache=False)
 
     plt.gca().cla() # clear axis to update them
     for res_index in range(1,num_results+1):
@@ -102,11 +111,9 @@ while(True): # You have to kill this manually!
         plot_start_index = max(0, current_num_results+num_points_to_plot)
         plot_end_index = current_num_results
 
-        data_results[res_index][plot_start_index:plot_end_index] *= result_factors[res_index-1] # premultiply with factor
-        cur_plot.plot(data_results[0][plot_start_index:plot_end_index],data_results[res_index][plot_start_index:plot_end_index], line_style, label='New Result')
+        cur_plot.plot(data_results[0][plot_start_index:plot_end_index],data_results[res_index][plot_start_index:plot_end_index]*result_factors[res_index-1], line_style, label='New Result')
         if using_ref_file:
-            data_res_ref[res_index][plot_start_index:plot_end_index] *= result_factors[res_index-1] # premultiply with factor
-            cur_plot.plot(data_res_ref[0][plot_start_index:plot_end_index],data_res_ref[res_index][plot_start_index:plot_end_index], 'r-', label='Reference Result')
+            cur_plot.plot(data_res_ref[0][plot_start_index:plot_end_index],data_res_ref[res_index][plot_start_index:plot_end_index]*result_factors[res_index-1], 'r-', label='Reference Result')
 
         # Adding labels and Title
         cur_plot.set_ylabel(label_tuple[res_index])
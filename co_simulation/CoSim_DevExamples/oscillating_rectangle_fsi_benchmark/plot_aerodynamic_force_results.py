@@ -11,27 +11,32 @@ Created on:  05.12.2015
 Last update: 10.12.2017
 '''
 #===============================================================================
+import os
 import sys
 from matplotlib.pylab import *
 import numpy as np
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from result_file_loader import LoadResultFile
+
 file2read = "FluidModelPart.Drag_structure_drag.dat" # file name of the drag results
 
 # ======================================================
 
 # *** read in the aerodynamic force/moment results ****************
-simulTime = loadtxt(file2read, skiprows=3, usecols = (0,))
-forceX = loadtxt(file2read, skiprows=3, usecols = (1,))
-forceY = loadtxt(file2read, skiprows=3, usecols = (2,))
-forceZ = loadtxt(file2read, skiprows=3, usecols = (3,))
+results = LoadResultFile(file2read, skiprows=3, names=("time", "force_x", "force_y", "force_z", "moment_x", "moment_y", "moment_z"))
+simulTime = results["time"]
+forceX = results["force_x"]
+forceY = results["force_y"]
+forceZ = results["force_z"]
 
-try: # check if results for moments exist and read them if they exist
-    momentX = loadtxt(file2read, skiprows=3, usecols = (4,))
-    momentY = loadtxt(file2read, skiprows=3, usecols = (5,))
-    momentZ = loadtxt(file2read, skiprows=3, usecols = (6,))
+if "moment_z" in results.dtype.names: # check if results for moments exist and read them if they exist
+    momentX = results["moment_x"]
+    momentY = results["moment_y"]
+    momentZ = results["moment_z"]
     momentsRead = True
     numberOfSubPlots = 2
-except:
+else:
     momentsRead = False
     numberOfSubPlots = 1
 
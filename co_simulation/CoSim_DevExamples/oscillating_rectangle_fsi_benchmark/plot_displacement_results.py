@@ -12,11 +12,16 @@ Last update: 10.12.2017
 '''
 #===============================================================================
 
+import os
+import sys
 import numpy as np
 from matplotlib import pyplot as plt
 from matplotlib import animation
 from pylab import *
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from result_file_loader import LoadSDoFResults
+
 # ======================================================
 import json
 
@@ -24,8 +29,9 @@ file2read = "results_sdof.dat"
 # ======================================================
 
 # read the file
-simulTime = loadtxt(file2read, skiprows=1, usecols = (0,))
-timeData = loadtxt(file2read, skiprows=1, usecols = (1,))
+results = LoadSDoFResults(file2read, usecols=(0,1))
+simulTime = results["time"]
+timeData = results["displacement"]
 
 # set up the plot
 fig = plt.figure()
@@ -1,10 +1,11 @@
+import os
+import sys
 import matplotlib.pyplot as plt
 
-X, Y = [], []
-for line in open('results_sdof.txt', 'r'):
-  values = [float(s) for s in line.split()]
-  X.append(values[0])
-  Y.append(values[1])
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+from result_file_loader import LoadSDoFResults
 
-plt.plot(X, Y)
-plt.show()
\ No newline at end of file
+results = LoadSDoFResults('results_sdof.txt', usecols=(0,1))
+
+plt.plot(results["time"], results["displacement"])
+plt.show()
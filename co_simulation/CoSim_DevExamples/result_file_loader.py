@@ -0,0 +1,114 @@
+'''
+Shared loader for the result files written by the CoSimulation examples
+(e.g. "results_sdof.dat", "FluidModelPart.Drag_structure_drag.dat").
+The text file is parsed only once and all columns are returned together as a structured array.
+The parsed data is cached in a binary ".npy" sidecar next to the result file, the cache is
+keyed by modification time and size of the result file, hence re-plotting a large
+history is a memory-mapped load instead of parsing the text again.
+Usage from the folder of an example:
+    sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), os.pardir))
+    from result_file_loader import LoadResultFile
+    results = LoadResultFile("results_sdof.dat", names=("time", "displacement"))
+    plt.plot(results["time"], results["displacement"])
+Header lines (comments or column titles) are detected automatically if "skiprows" is not given.
+'''
+
+import os
+import glob
+import hashlib
+
+import numpy as np
+from numpy.lib import recfunctions
+
+def GetCacheFileName(file_name, **parse_options):
+    """name of the sidecar for the current state of the file and the given parse options"""
+    options_hash = hashlib.md5(repr(sorted(parse_options.items())).encode()).hexdigest()[:16]
+    directory, base_name = os.path.split(file_name)
+    return os.path.join(directory, "." + base_name + "." + _GetFileStateHash(file_name) + "." + options_hash + ".npy")
+
+# names of the columns written by the SDoF solver
+SDOF_RESULT_NAMES = ("time", "displacement", "velocity", "acceleration")
+
+def CountHeaderLines(file_name, comments="#", max_num_lines=1000):
+    """number of lines before the first row consisting only of numbers"""
+    with open(file_name, "r") as result_file:
+        for line_index, line in enumerate(result_file):
+            if line_index == max_num_lines:
+                break
+            values = line.split(comments, 1)[0].split()
+            if len(values) == 0:
+                continue
+            try:
+                [float(value) for value in values]
+                return line_index
+            except ValueError:
+                continue
+    return 0
+
+def LoadResultFile(file_name, skiprows=None, names=None, usecols=None, comments="#", use_cache=True):
+    """reads all (or the selected) columns of a result file in one pass
+
+    skiprows: number of header lines, if None they are detected with CountHeaderLines
+    names: field names for the columns, the columns without a name are called "col_<index>".
+           Names for columns which do not exist in the file are ignored, this way optional
+           columns can be checked with "name in results.dtype.names".
+    usecols: indices of the columns to read, the names refer to the selected columns
+    use_cache: read from/write to the ".npy" sidecar, the returned array is memory-mapped
+               (read-only) if it was loaded from the sidecar.
+    """
+    if skiprows is None:
+        skiprows = CountHeaderLines(file_name, comments)
+    if usecols is not None:
+        usecols = tuple(usecols)
+
+    parse_options = {"skiprows" : skiprows, "names" : tuple(names) if names else None, "usecols" : usecols, "comments" : comments}
+
+    if use_cache:
+        cache_file_name = GetCacheFileName(file_name, **parse_options)
+        if os.path.isfile(cache_file_name):
+            return np.load(cache_file_name, mmap_mode="r")
+
+    raw_data = np.loadtxt(file_name, dtype=np.float64, skiprows=skiprows, usecols=usecols, comments=comments, ndmin=2)
+
+    num_columns = raw_data.shape[1]
+    column_indices = usecols if usecols is not None else range(num_columns)
+    field_names = ["col_" + str(i) for i in column_indices]
+    if names:
+        for i, name in enumerate(names[:num_columns]):
+            field_names[i] = name
+    results = recfunctions.unstructured_to_structured(raw_data, names=field_names)
+
+    if use_cache:
+        _RemoveStaleCacheFiles(file_name)
+        try:
+            np.save(cache_file_name, results)
+        except OSError: # e.g. read-only folder, the cache is optional
+            pass
+
+    return results
+
+def LoadSDoFResults(file_name, usecols=None, use_cache=True):
+    """reads the results of the SDoF solver, the fields are named after SDOF_RESULT_NAMES"""
+    if usecols is None:
+        names = SDOF_RESULT_NAMES
+    else:
+        names = tuple(SDOF_RESULT_NAMES[i] for i in usecols)
+    return LoadResultFile(file_name, names=names, usecols=usecols, use_cache=use_cache)
+
+def _GetFileStateHash(file_name):
+    file_stat = os.stat(file_name)
+    return hashlib.md5(repr((file_stat.st_size, file_stat.st_mtime_ns)).encode()).hexdigest()[:16]
+
+def _RemoveStaleCacheFiles(file_name):
+    """removes the sidecars of previous states of the file, the ones of the current state (other parse options) are kept"""
+    directory, base_name = os.path.split(file_name)
+    cache_prefix = "." + base_name + "."
+    current_state_hash = _GetFileStateHash(file_name)
+    for cache_file_name in glob.glob(os.path.join(directory, glob.escape(cache_prefix) + "*.npy")):
+        cache_hashes = os.path.basename(cache_file_name)[len(cache_prefix):-len(".npy")].split(".")
+        if len(cache_hashes) == 2 and cache_hashes[0] == current_state_hash:
+            continue
+        try:
+            os.remove(cache_file_name)
+        except OSError:
+            pass
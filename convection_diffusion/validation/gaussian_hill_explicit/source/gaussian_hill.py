@@ -3,6 +3,8 @@ import KratosMultiphysics.ConvectionDiffusionApplication
 from KratosMultiphysics.ConvectionDiffusionApplication.convection_diffusion_analysis import ConvectionDiffusionAnalysis
 
 from math import *
+import numpy as np
+from field_utilities import SetNodalField
 
 class GaussianHillExplicit(ConvectionDiffusionAnalysis):
     """
@@ -16,19 +18,17 @@ class GaussianHillExplicit(ConvectionDiffusionAnalysis):
         super().ApplyBoundaryConditions()
         if self.apply_initial_condition:
             model_part_name = self.project_parameters["problem_data"]["model_part_name"].GetString()
-            for node in self.model.GetModelPart(model_part_name).Nodes:
-                x = node.X
-                y = node.Y
-                diffusivity = 1e-3
-                t = pi/2 + simulation.time - self.project_parameters["solver_settings"]["time_stepping"]["time_step"].GetDouble()
-
-                (x0, y0) = (0.0, 0.5)
-                x_bar = x0*cos(t) - y0*sin(t)
-                y_bar = -x0*sin(t) + y0*cos(t)
-                r2 = (x-x_bar)**2 + (y-y_bar)**2
+            diffusivity = 1e-3
+            t = pi/2 + self.time - self.project_parameters["solver_settings"]["time_stepping"]["time_step"].GetDouble()
+
+            (x0, y0) = (0.0, 0.5)
+            x_bar = x0*cos(t) - y0*sin(t)
+            y_bar = -x0*sin(t) + y0*cos(t)
 
-                phi_analytical = 1.0 / (4*pi*diffusivity*t) * exp(-r2 / (4*diffusivity*t))
-                node.SetSolutionStepValue(KratosMultiphysics.TEMPERATURE,1,phi_analytical)
+            def phi_analytical(x, y, z):
+                r2 = (x-x_bar)**2 + (y-y_bar)**2
+                return 1.0 / (4*pi*diffusivity*t) * np.exp(-r2 / (4*diffusivity*t))
+            SetNodalField(self.model.GetModelPart(model_part_name),KratosMultiphysics.TEMPERATURE,phi_analytical,1)
             self.apply_initial_condition = False
 
 if __name__ == "__main__":
@@ -3,6 +3,8 @@ import KratosMultiphysics.ConvectionDiffusionApplication
 from KratosMultiphysics.ConvectionDiffusionApplication.convection_diffusion_analysis import ConvectionDiffusionAnalysis
 
 from math import *
+import numpy as np
+from field_utilities import SetNodalField
 
 class GaussianHillWithDiffusionExplicit(ConvectionDiffusionAnalysis):
     """
@@ -18,13 +20,9 @@ class GaussianHillWithDiffusionExplicit(ConvectionDiffusionAnalysis):
         if self.apply_initial_condition:
             model_part_name = self.project_parameters["problem_data"]["model_part_name"].GetString()
             # set initial field
-            for node in self.model.GetModelPart(model_part_name).Nodes:
-                x = node.X
-                diffusivity = 1e-3
-                x0 = 2/15
-                l = 7*sqrt(2)/300
-                phi_analytical = 5/7*exp(-((x-x0)/l)**2)
-                node.SetSolutionStepValue(KratosMultiphysics.TEMPERATURE,1,phi_analytical)
+            x0 = 2/15
+            l = 7*sqrt(2)/300
+            SetNodalField(self.model.GetModelPart(model_part_name),KratosMultiphysics.TEMPERATURE,lambda x, y, z: 5/7*np.exp(-((x-x0)/l)**2),1)
             # set boundary conditions
             for node in self.model.GetModelPart(model_part_name).Nodes:
                 x = node.X
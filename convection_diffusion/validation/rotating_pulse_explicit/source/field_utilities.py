@@ -0,0 +1,30 @@
+from __future__ import print_function, absolute_import, division #makes KratosMultiphysics backward compatible with python 2.6 and 2.7
+
+import numpy as np
+
+import KratosMultiphysics
+
+def GetNodalCoordinates(model_part):
+    """ Returns the current coordinates of the nodes as three arrays x, y, z of size the number of nodes
+    """
+    coordinates = KratosMultiphysics.VariableUtils().GetCurrentPositionsVector(model_part.Nodes, 3)
+    coordinates = np.array(coordinates).reshape(model_part.NumberOfNodes(), 3)
+    return coordinates[:, 0], coordinates[:, 1], coordinates[:, 2]
+
+def SetNodalField(model_part, variable, field_function, step = 0, historical = True):
+    """ Evaluates an analytic field on all the nodes at once and assigns it in bulk
+    The function is called as field_function(x, y, z) with the arrays of the nodal coordinates and returns, using NumPy,
+    an array of size the number of nodes for scalar variables, or of shape (number of nodes, 3) for vector variables.
+    Constants (or a constant vector) are assigned to all the nodes
+    """
+    if isinstance(variable, KratosMultiphysics.Array1DVariable3):
+        shape = (model_part.NumberOfNodes(), 3)
+    else:
+        shape = (model_part.NumberOfNodes(),)
+    values = np.broadcast_to(np.asarray(field_function(*GetNodalCoordinates(model_part)), dtype=np.float64), shape)
+    values = KratosMultiphysics.Vector(values.ravel().tolist())
+
+    if historical:
+        KratosMultiphysics.VariableUtils().SetSolutionStepValuesVector(model_part.Nodes, variable, values, step)
+    else:
+        KratosMultiphysics.VariableUtils().SetValuesVector(model_part.Nodes, variable, values)
@@ -3,6 +3,8 @@ import KratosMultiphysics.ConvectionDiffusionApplication
 from KratosMultiphysics.ConvectionDiffusionApplication.convection_diffusion_analysis import ConvectionDiffusionAnalysis
 
 from math import *
+import numpy as np
+from field_utilities import SetNodalField
 
 class RotatingPules(ConvectionDiffusionAnalysis):
     """
@@ -11,19 +13,16 @@ class RotatingPules(ConvectionDiffusionAnalysis):
     def ApplyBoundaryConditions(self):
         super().ApplyBoundaryConditions()
         model_part_name = self.project_parameters["problem_data"]["model_part_name"].GetString()
-        for node in self.model.GetModelPart(model_part_name).Nodes:
-            x = node.X
-            y = node.Y
-            convective_velocity = [-y+0.5,x-0.5,0.0]
-            node.SetSolutionStepValue(KratosMultiphysics.VELOCITY,convective_velocity)
-            node.SetSolutionStepValue(KratosMultiphysics.VELOCITY,1,convective_velocity)
-            if (sqrt(x**2+y**2)<=1):
-                forcing = exp(-self.time**10) * cos(pi/2*sqrt(x**2+y**2))
-                forcing_previous = exp(-(self.time-self.project_parameters["solver_settings"]["time_stepping"]["time_step"].GetDouble())**10) * cos(pi/2*sqrt(x**2+y**2))
-            else:
-                forcing = 0
-            node.SetSolutionStepValue(KratosMultiphysics.HEAT_FLUX,forcing)
-            node.SetSolutionStepValue(KratosMultiphysics.HEAT_FLUX,1,forcing_previous)
+        model_part = self.model.GetModelPart(model_part_name)
+        previous_time = self.time-self.project_parameters["solver_settings"]["time_stepping"]["time_step"].GetDouble()
+        convective_velocity = lambda x, y, z: np.stack((-y+0.5,x-0.5,np.zeros_like(x)),axis=1)
+        SetNodalField(model_part,KratosMultiphysics.VELOCITY,convective_velocity)
+        SetNodalField(model_part,KratosMultiphysics.VELOCITY,convective_velocity,1)
+        # the forcing is zero outside the unit circle
+        def forcing(time):
+            return lambda x, y, z: np.where(np.sqrt(x**2+y**2)<=1, exp(-time**10) * np.cos(pi/2*np.sqrt(x**2+y**2)), 0.0)
+        SetNodalField(model_part,KratosMultiphysics.HEAT_FLUX,forcing(self.time))
+        SetNodalField(model_part,KratosMultiphysics.HEAT_FLUX,forcing(previous_time),1)
 
 if __name__ == "__main__":
     from sys import argv
@@ -7,6 +7,8 @@ from KratosMultiphysics.FluidDynamicsApplication.fluid_dynamics_analysis import
 
 import sys
 import time
+import numpy as np
+from field_utilities import SetNodalField
 
 # Hierarchy of classes: (>> = inherits to)
 # PythonSolver >> FluidSolver >> NavierStokesTwoFluidsSolver
@@ -30,11 +32,11 @@ class FluidDynamicsAnalysisWithFlush(FluidDynamicsAnalysis):
 
         # Description of the case can be found e.g. in:
         # Larese, Rossi, Onate, Idelsohn: Validation of the particle finite element method (PFEM) for simulation of free surface flow, 2008
-        for node in self._GetSolver().GetComputingModelPart().Nodes:
-            d_z = abs(node.Z) - H
-            d_x = abs(node.X - OffsetX) - L
-            distance = max(d_x,d_z)
-            node.SetSolutionStepValue(KratosMultiphysics.DISTANCE, distance)
+        def ComputeDistance(x, y, z):
+            d_z = np.abs(z) - H
+            d_x = np.abs(x - OffsetX) - L
+            return np.maximum(d_x,d_z)
+        SetNodalField(self._GetSolver().GetComputingModelPart(), KratosMultiphysics.DISTANCE, ComputeDistance)
 
     # Extension of the function FinalizeSolutionStep() to force writing of buffered output
     def FinalizeSolutionStep(self):
@@ -4,7 +4,8 @@ import KratosMultiphysics
 import KratosMultiphysics.FluidDynamicsApplication
 
 from KratosMultiphysics.FluidDynamicsApplication.fluid_dynamics_analysis import FluidDynamicsAnalysis
-from math import pi, cos
+import numpy as np
+from field_utilities import SetNodalField
 
 import sys
 import time
@@ -26,16 +27,11 @@ class FluidDynamicsAnalysisWithFlush(FluidDynamicsAnalysis):
         init_h = 1.7    # height of water at rest
         wave_h = 0.8    # height of the wave
 
-        for node in self._GetSolver().GetComputingModelPart().Nodes:
-            if ( node.X < pi/2 ):
-                # "inside" the region of the initial wave
-                waterlevel = init_h + 0.5 * wave_h * ( cos(2.0*node.X) + 1.0 )
-            else:
-                # "outside" the region of the initial wave
-                waterlevel = init_h
-
-            distance = node.Y - waterlevel
-            node.SetSolutionStepValue(KratosMultiphysics.DISTANCE, distance)
+        def ComputeDistance(x, y, z):
+            # "inside" the region of the initial wave the water level is raised, "outside" it is at rest
+            waterlevel = np.where( x < np.pi/2, init_h + 0.5 * wave_h * ( np.cos(2.0*x) + 1.0 ), init_h )
+            return y - waterlevel
+        SetNodalField(self._GetSolver().GetComputingModelPart(), KratosMultiphysics.DISTANCE, ComputeDistance)
 
     # Extension of the function FinalizeSolutionStep() to force writing of buffered output
     def FinalizeSolutionStep(self):
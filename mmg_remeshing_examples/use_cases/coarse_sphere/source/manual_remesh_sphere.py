@@ -3,6 +3,8 @@ from __future__ import print_function, absolute_import, division #makes KratosMu
 
 import KratosMultiphysics
 import KratosMultiphysics.MeshingApplication as MeshingApplication
+import numpy as np
+from metric_utilities import ComputeNodalMetric, AnisotropicMetric
 
 # We create the model part
 current_model = KratosMultiphysics.Model()
@@ -17,48 +19,22 @@ main_model_part.AddNodalSolutionStepVariable(KratosMultiphysics.NODAL_H)
 KratosMultiphysics.ModelPartIO("coarse_sphere").ReadModelPart(main_model_part)
 
 # We know that the gradient is unitary and in X direction
-UnityVector = KratosMultiphysics.Vector(3)
-UnityVector[0] = 1.0
-UnityVector[1] = 0.0
-UnityVector[2] = 0.0
+UnityVector = [1.0, 0.0, 0.0]
 
-# We set to zero the metric
-MetricVector = KratosMultiphysics.Vector(6)
+# We define the metric of all the nodes at once
+def ComputeSphereMetric(coordinates, values):
+    distance = np.abs(values["DISTANCE"])
 
-for node in main_model_part.Nodes:
     # Calculate the element size
-    distance = node.GetSolutionStepValue(KratosMultiphysics.DISTANCE, 0)
-    nodal_h = node.GetSolutionStepValue(KratosMultiphysics.NODAL_H, 0)
-    element_size = 0.1
-    if (abs(distance) > 0.5):
-        element_size = nodal_h
+    element_size = np.where(distance > 0.5, values["NODAL_H"], 0.1)
 
     # Calculate anisotropic ratio
-    ratio = 1.0
-    if (abs(distance) < 0.5):
-        ratio = 0.01 + (abs(distance)/0.5) * (1.0 - 0.01);
-
-    # We get the gradient
-    gradient_value = UnityVector
+    ratio = np.where(distance < 0.5, 0.01 + (distance/0.5) * (1.0 - 0.01), 1.0)
 
     # Finally we calculate the metric
-    coeff0 = 1.0/(element_size * element_size);
-    coeff1 = coeff0/(ratio * ratio);
-
-    v0v0 = gradient_value[0]*gradient_value[0];
-    v0v1 = gradient_value[0]*gradient_value[1];
-    v0v2 = gradient_value[0]*gradient_value[2];
-    v1v1 = gradient_value[1]*gradient_value[1];
-    v1v2 = gradient_value[1]*gradient_value[2];
-    v2v2 = gradient_value[2]*gradient_value[2];
+    return AnisotropicMetric(element_size, ratio, UnityVector)
 
-    MetricVector[0] = coeff0*(1.0 - v0v0) + coeff1*v0v0
-    MetricVector[1] = coeff0*(1.0 - v1v1) + coeff1*v1v1
-    MetricVector[2] = coeff0*(1.0 - v2v2) + coeff1*v2v2
-    MetricVector[3] = coeff0*(    - v0v1) + coeff1*v0v1
-    MetricVector[4] = coeff0*(    - v1v2) + coeff1*v1v2
-    MetricVector[5] = coeff0*(    - v0v2) + coeff1*v0v2
-    node.SetValue(MeshingApplication.METRIC_TENSOR_3D, MetricVector)
+ComputeNodalMetric(main_model_part, ComputeSphereMetric, [KratosMultiphysics.DISTANCE, KratosMultiphysics.NODAL_H])
 
 # We create the remeshing process
 remesh_param = KratosMultiphysics.Parameters("""{ }""")
@@ -0,0 +1,100 @@
+from __future__ import print_function, absolute_import, division #makes KratosMultiphysics backward compatible with python 2.6 and 2.7
+
+import numpy as np
+
+import KratosMultiphysics
+import KratosMultiphysics.MeshingApplication as MeshingApplication
+
+# Components of the symmetric metric tensor in the order of METRIC_TENSOR_2D and METRIC_TENSOR_3D
+VOIGT_INDICES = {2 : [(0,0), (1,1), (0,1)],
+                 3 : [(0,0), (1,1), (2,2), (0,1), (1,2), (0,2)]}
+
+def GetMetricVariable(dimension):
+    """ Returns the nodal metric variable of the given dimension
+    """
+    if dimension == 2:
+        return MeshingApplication.METRIC_TENSOR_2D
+    elif dimension == 3:
+        return MeshingApplication.METRIC_TENSOR_3D
+    raise Exception("The metric is only defined in 2D and 3D, not in " + str(dimension) + "D")
+
+def GetNodalCoordinates(model_part):
+    """ Returns the current coordinates of the nodes as an array of shape (number of nodes, 3)
+    """
+    coordinates = KratosMultiphysics.VariableUtils().GetCurrentPositionsVector(model_part.Nodes, 3)
+    return np.array(coordinates).reshape(model_part.NumberOfNodes(), 3)
+
+def GetNodalValues(model_part, variable, historical = True):
+    """ Returns the values of a scalar variable of the nodes as an array of shape (number of nodes)
+    """
+    if historical:
+        values = KratosMultiphysics.VariableUtils().GetSolutionStepValuesVector(model_part.Nodes, variable, 0)
+    else:
+        values = KratosMultiphysics.VariableUtils().GetValuesVector(model_part.Nodes, variable)
+    return np.array(values)
+
+def IsotropicMetric(element_size, dimension = 3):
+    """ Returns the metric tensors, in Voigt notation, of an isotropic size field: M = I/h^2
+    """
+    element_size = np.asarray(element_size, dtype=np.float64)
+    metric = np.zeros((element_size.shape[0], len(VOIGT_INDICES[dimension])))
+    metric[:, :dimension] = (1.0/element_size**2)[:, np.newaxis]
+    return metric
+
+def AnisotropicMetric(element_size, ratio, direction, dimension = 3):
+    """ Returns the metric tensors, in Voigt notation, of a size field refined by a ratio along a direction (e.g. the gradient of a level set):
+    M = 1/h^2 (I - v v^T) + 1/(r h)^2 v v^T, with v the unit direction, as the ComputeLevelSetSolMetricProcess
+    The direction can be the same for all the nodes, shape (dimension), or one per node, shape (number of nodes, dimension)
+    """
+    element_size = np.asarray(element_size, dtype=np.float64)
+    ratio = np.broadcast_to(np.asarray(ratio, dtype=np.float64), element_size.shape)
+    direction = np.broadcast_to(np.asarray(direction, dtype=np.float64)[..., :dimension], (element_size.shape[0], dimension))
+    norm = np.linalg.norm(direction, axis=1)
+    direction = direction / np.where(norm > 0.0, norm, 1.0)[:, np.newaxis]
+    coeff0 = 1.0/element_size**2
+    coeff1 = coeff0/ratio**2
+    metric = np.empty((element_size.shape[0], len(VOIGT_INDICES[dimension])))
+    for component, (i, j) in enumerate(VOIGT_INDICES[dimension]):
+        vivj = direction[:, i] * direction[:, j]
+        metric[:, component] = coeff0 * ((1.0 if i == j else 0.0) - vivj) + coeff1 * vivj
+    return metric
+
+def TensorToVoigt(tensors):
+    """ Returns the symmetric tensors of shape (number of nodes, dimension, dimension) in Voigt notation
+    """
+    dimension = tensors.shape[1]
+    return np.stack([tensors[:, i, j] for (i, j) in VOIGT_INDICES[dimension]], axis=1)
+
+def SetNodalMetric(model_part, metric, dimension = 3):
+    """ Writes the metric of all the nodes, given as sizes (isotropic metric), Voigt vectors or tensors, in bulk
+    """
+    metric = np.asarray(metric, dtype=np.float64)
+    if metric.ndim == 1:
+        metric = IsotropicMetric(metric, dimension)
+    elif metric.ndim == 3:
+        metric = TensorToVoigt(metric)
+    if metric.shape != (model_part.NumberOfNodes(), len(VOIGT_INDICES[dimension])):
+        raise Exception("The metric has shape " + str(metric.shape) + ", expected " + str((model_part.NumberOfNodes(), len(VOIGT_INDICES[dimension]))))
+
+    metric_variable = GetMetricVariable(dimension)
+    try:
+        # One call for all the nodes, where the metric variable is supported by the VariableUtils
+        KratosMultiphysics.VariableUtils().SetValuesVector(model_part.Nodes, metric_variable, KratosMultiphysics.Vector(metric.ravel().tolist()))
+    except (AttributeError, TypeError):
+        # The metric is already computed, the loop only copies it to the nodes
+        for node, node_metric in zip(model_part.Nodes, metric.tolist()):
+            node.SetValue(metric_variable, KratosMultiphysics.Vector(node_metric))
+
+def ComputeNodalMetric(model_part, metric_function, variables = [], non_historical_variables = [], dimension = 3):
+    """ Evaluates a vectorized metric function on all the nodes and writes the metric in bulk
+    The function is called as metric_function(coordinates, values), where coordinates is an array of shape (number of nodes, 3)
+    and values a dictionary of the arrays of the given scalar variables by name, and returns sizes (isotropic metric),
+    Voigt vectors or tensors, see SetNodalMetric
+    """
+    coordinates = GetNodalCoordinates(model_part)
+    values = {}
+    for variable in variables:
+        values[variable.Name()] = GetNodalValues(model_part, variable)
+    for variable in non_historical_variables:
+        values[variable.Name()] = GetNodalValues(model_part, variable, False)
+    SetNodalMetric(model_part, metric_function(coordinates, values), dimension)
@@ -22,15 +22,7 @@ local_gradient = KratosMultiphysics.ComputeNodalGradientProcess3D(main_model_par
 local_gradient.Execute()
 
 # We set to zero the metric
-ZeroVector = KratosMultiphysics.Vector(6)
-ZeroVector[0] = 0.0
-ZeroVector[1] = 0.0
-ZeroVector[2] = 0.0
-ZeroVector[3] = 0.0
-ZeroVector[4] = 0.0
-ZeroVector[5] = 0.0
-for node in main_model_part.Nodes:
-    node.SetValue(MeshingApplication.METRIC_TENSOR_3D, ZeroVector)
+KratosMultiphysics.VariableUtils().SetNonHistoricalVariableToZero(MeshingApplication.METRIC_TENSOR_3D, main_model_part.Nodes)
 
 # We define a metric using the ComputeLevelSetSolMetricProcess
 level_set_param = KratosMultiphysics.Parameters("""
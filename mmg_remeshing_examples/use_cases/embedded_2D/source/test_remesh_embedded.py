@@ -32,12 +32,7 @@ local_gradient = KratosMultiphysics.ComputeNodalGradientProcess2D(main_model_par
 local_gradient.Execute()
 
 # We set to zero the metric
-ZeroVector = KratosMultiphysics.Vector(3)
-ZeroVector[0] = 0.0
-ZeroVector[1] = 0.0
-ZeroVector[2] = 0.0
-for node in main_model_part.Nodes:
-    node.SetValue(MeshingApplication.METRIC_TENSOR_2D, ZeroVector)
+KratosMultiphysics.VariableUtils().SetNonHistoricalVariableToZero(MeshingApplication.METRIC_TENSOR_2D, main_model_part.Nodes)
 
 # We define a metric using the ComputeLevelSetSolMetricProcess
 level_set_param = KratosMultiphysics.Parameters("""
@@ -3,7 +3,9 @@ from __future__ import print_function, absolute_import, division #makes KratosMu
 import KratosMultiphysics
 import KratosMultiphysics.MeshingApplication as MeshingApplication
 
-import math
+import numpy as np
+from field_utilities import SetNodalField
+from remeshing_pipeline import RemeshingPipeline
 
 current_model = KratosMultiphysics.Model()
 main_model_part = current_model.CreateModelPart("MainModelPart")
@@ -16,95 +18,37 @@ main_model_part.AddNodalSolutionStepVariable(KratosMultiphysics.DISTANCE_GRADIEN
 # We import the model main_model_part
 KratosMultiphysics.ModelPartIO("hertz_2d").ReadModelPart(main_model_part)
 
-for node in main_model_part.Nodes:
-    relative_x = node.X
-    relative_y = node.Y + 1.0
-    # Calculate the gap
-    if relative_y > 0:
-        node.SetSolutionStepValue(KratosMultiphysics.DISTANCE, relative_y)
-    else:
-        theta = math.acos(abs(relative_x)) + math.pi/2
-        node.SetSolutionStepValue(KratosMultiphysics.DISTANCE, abs(relative_y) + math.sin(theta))
-
-# We calculate the gardient of the distance variable
-find_nodal_h = KratosMultiphysics.FindNodalHNonHistoricalProcess(main_model_part)
-find_nodal_h.Execute()
-KratosMultiphysics.VariableUtils().SetNonHistoricalVariable(KratosMultiphysics.NODAL_AREA, 0.0, main_model_part.Nodes)
-local_gradient = KratosMultiphysics.ComputeNodalGradientProcess2D(main_model_part, KratosMultiphysics.DISTANCE, KratosMultiphysics.DISTANCE_GRADIENT, KratosMultiphysics.NODAL_AREA)
-local_gradient.Execute()
-
-# We set to zero the metric
-ZeroVector = KratosMultiphysics.Vector(3)
-ZeroVector[0] = 0.0
-ZeroVector[1] = 0.0
-ZeroVector[2] = 0.0
-for node in main_model_part.Nodes:
-    node.SetValue(MeshingApplication.METRIC_TENSOR_2D, ZeroVector)
-
-# We define a metric using the ComputeLevelSetSolMetricProcess
-level_set_param = KratosMultiphysics.Parameters("""
-                        {
-                            "minimal_size"                         : 0.1,
-                            "enforce_current"                      : false,
-                            "anisotropy_remeshing"                 : true,
-                            "anisotropy_parameters":
-                            {
-                                "hmin_over_hmax_anisotropic_ratio"      : 0.01,
-                                "boundary_layer_max_distance"           : 0.5,
-                                "interpolation"                         : "Linear"
-                            }
-                        }
-                        """)
-metric_process = MeshingApplication.ComputeLevelSetSolMetricProcess2D(main_model_part,KratosMultiphysics.DISTANCE_GRADIENT,level_set_param)
-metric_process.Execute()
-
-# We create the remeshing process
-remesh_param = KratosMultiphysics.Parameters("""{ }""")
-MmgProcess = MeshingApplication.MmgProcess2D(main_model_part, remesh_param)
-MmgProcess.Execute()
-
-# Finally we export to GiD
-from KratosMultiphysics.gid_output_process import GiDOutputProcess
-gid_output = GiDOutputProcess(main_model_part,
-                            "gid_output",
-                            KratosMultiphysics.Parameters("""
-                                {
-                                    "result_file_configuration" : {
-                                        "gidpost_flags": {
-                                            "GiDPostMode": "GiD_PostBinary",
-                                            "WriteDeformedMeshFlag": "WriteUndeformed",
-                                            "WriteConditionsFlag": "WriteConditions",
-                                            "MultiFileFlag": "SingleFile"
-                                        },
-                                        "nodal_results"       : ["DISTANCE", "DISTANCE_GRADIENT"]
-                                    }
-                                }
-                                """)
-                            )
-
-gid_output.ExecuteInitialize()
-gid_output.ExecuteBeforeSolutionLoop()
-gid_output.ExecuteInitializeSolutionStep()
-gid_output.PrintOutput()
-gid_output.ExecuteFinalizeSolutionStep()
-gid_output.ExecuteFinalize()
-
-# Finally we export to VTK
-vtk_settings = KratosMultiphysics.Parameters("""{
-    "model_part_name"                    : "MainModelPart",
-    "file_format"                        : "ascii",
-    "output_precision"                   : 7,
-    "output_control_type"                : "step",
-    "output_frequency"                   : 1.0,
-    "output_sub_model_parts"             : false,
-    "save_output_files_in_folder"        : false,
-    "nodal_solution_step_data_variables" : ["DISTANCE","DISTANCE_GRADIENT"],
-    "nodal_data_value_variables"         : [],
-    "element_data_value_variables"       : [],
-    "condition_data_value_variables"     : [],
-    "gauss_point_variables_extrapolated_to_nodes"              : []
-}""")
-
-vtk_io = KratosMultiphysics.VtkOutput(main_model_part, vtk_settings)
-vtk_io.PrintOutput()
-
+# Calculate the gap on all the nodes at once
+def ComputeGap(x, y, z):
+    relative_x = x
+    relative_y = y + 1.0
+    theta = np.arccos(np.minimum(np.abs(relative_x), 1.0)) + np.pi/2
+    return np.where(relative_y > 0, relative_y, np.abs(relative_y) + np.sin(theta))
+
+# We define the remeshing pipeline: gradient of the distance -> level set metric -> MMG -> output
+pipeline_settings = KratosMultiphysics.Parameters("""
+{
+    "metric_type"                   : "level_set",
+    "metric_variable_name"          : "DISTANCE",
+    "gradient_variable_name"        : "DISTANCE_GRADIENT",
+    "metric_parameters"             : {
+        "minimal_size"                         : 0.1,
+        "enforce_current"                      : false,
+        "anisotropy_remeshing"                 : true,
+        "anisotropy_parameters":
+        {
+            "hmin_over_hmax_anisotropic_ratio"      : 0.01,
+            "boundary_layer_max_distance"           : 0.5,
+            "interpolation"                         : "Linear"
+        }
+    },
+    "remeshing_parameters"          : { },
+    "output_name"                   : "gid_output",
+    "nodal_results"                 : ["DISTANCE","DISTANCE_GRADIENT"]
+}
+""")
+
+# We compute the gap and its gradient, the metric, remesh and export to GiD and VTK
+pipeline = RemeshingPipeline(main_model_part, pipeline_settings, lambda model_part: SetNodalField(model_part, KratosMultiphysics.DISTANCE, ComputeGap))
+pipeline.Iterate()
+pipeline.Finalize()
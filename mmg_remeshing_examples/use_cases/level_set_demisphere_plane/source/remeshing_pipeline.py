@@ -0,0 +1,185 @@
+from __future__ import print_function, absolute_import, division #makes KratosMultiphysics backward compatible with python 2.6 and 2.7
+
+import time
+
+import KratosMultiphysics
+import KratosMultiphysics.MeshingApplication as MeshingApplication
+
+from KratosMultiphysics.gid_output_process import GiDOutputProcess
+
+class RemeshingPipeline(object):
+    """ Iterative remeshing of a model part: field -> metric -> MMG -> output
+
+    The processes (nodal size, gradient, metric and MMG) and the GiD and VTK outputs are created once and reused in all
+    the iterations, as they only keep a reference to the model part. After each remeshing only the nodal data depending on
+    the topology (NODAL_H, NODAL_AREA and the metric) are recomputed, and the outputs write the new mesh (GiD multiple files).
+    The metric process is only created again if its parameters are updated. The time of each stage is recorded.
+    """
+    def __init__(self, model_part, settings, field_function = None):
+        """ The field function, if given, is called as field_function(model_part) at the beginning of each iteration,
+        e.g. to evaluate an analytic DISTANCE on the current mesh with SetNodalField
+        """
+        default_settings = KratosMultiphysics.Parameters("""
+        {
+            "metric_type"                   : "hessian",
+            "metric_variable_name"          : "DISTANCE",
+            "gradient_variable_name"        : "DISTANCE_GRADIENT",
+            "metric_parameters"             : {},
+            "remeshing_parameters"          : {},
+            "update_metric_after_remeshing" : false,
+            "output_name"                   : "gid_output",
+            "gid_output"                    : true,
+            "vtk_output"                    : true,
+            "nodal_results"                 : [],
+            "nodal_nonhistorical_results"   : []
+        }
+        """)
+        settings.ValidateAndAssignDefaults(default_settings)
+
+        self.model_part = model_part
+        self.settings = settings
+        self.field_function = field_function
+        self.dimension = self.model_part.ProcessInfo[KratosMultiphysics.DOMAIN_SIZE]
+        if self.dimension == 2:
+            self.metric_tensor_variable = MeshingApplication.METRIC_TENSOR_2D
+        else:
+            self.metric_tensor_variable = MeshingApplication.METRIC_TENSOR_3D
+        self.metric_type = self.settings["metric_type"].GetString()
+        if self.metric_type not in ["hessian", "level_set"]:
+            raise Exception("The metric type " + self.metric_type + " is not supported, use hessian or level_set")
+        self.metric_variable = KratosMultiphysics.KratosGlobals.GetVariable(self.settings["metric_variable_name"].GetString())
+        self.gradient_variable = KratosMultiphysics.KratosGlobals.GetVariable(self.settings["gradient_variable_name"].GetString())
+        self.metric_parameters = self.settings["metric_parameters"]
+
+        # Processes kept alive during all the iterations
+        self.find_nodal_h = KratosMultiphysics.FindNodalHNonHistoricalProcess(self.model_part)
+        self.gradient_process = None
+        if self.metric_type == "level_set":
+            if self.dimension == 2:
+                self.gradient_process = KratosMultiphysics.ComputeNodalGradientProcess2D(self.model_part, self.metric_variable, self.gradient_variable, KratosMultiphysics.NODAL_AREA)
+            else:
+                self.gradient_process = KratosMultiphysics.ComputeNodalGradientProcess3D(self.model_part, self.metric_variable, self.gradient_variable, KratosMultiphysics.NODAL_AREA)
+        self.metric_process = None
+        if self.dimension == 2:
+            self.mmg_process = MeshingApplication.MmgProcess2D(self.model_part, self.settings["remeshing_parameters"])
+        else:
+            self.mmg_process = MeshingApplication.MmgProcess3D(self.model_part, self.settings["remeshing_parameters"])
+
+        # Outputs kept alive during all the iterations
+        self.gid_output = None
+        if self.settings["gid_output"].GetBool():
+            gid_parameters = KratosMultiphysics.Parameters("""
+            {
+                "result_file_configuration" : {
+                    "gidpost_flags": {
+                        "GiDPostMode": "GiD_PostBinary",
+                        "WriteDeformedMeshFlag": "WriteUndeformed",
+                        "WriteConditionsFlag": "WriteConditions",
+                        "MultiFileFlag": "MultipleFiles"
+                    },
+                    "nodal_results"               : [],
+                    "nodal_nonhistorical_results" : []
+                }
+            }
+            """)
+            gid_parameters["result_file_configuration"]["nodal_results"] = self.settings["nodal_results"]
+            gid_parameters["result_file_configuration"]["nodal_nonhistorical_results"] = self.settings["nodal_nonhistorical_results"]
+            self.gid_output = GiDOutputProcess(self.model_part, self.settings["output_name"].GetString(), gid_parameters)
+            self.gid_output.ExecuteInitialize()
+            self.gid_output.ExecuteBeforeSolutionLoop()
+        self.vtk_output = None
+        if self.settings["vtk_output"].GetBool():
+            vtk_parameters = KratosMultiphysics.Parameters("""{
+                "file_format"                        : "ascii",
+                "output_precision"                   : 7,
+                "output_control_type"                : "step",
+                "output_frequency"                   : 1.0,
+                "output_sub_model_parts"             : false,
+                "save_output_files_in_folder"        : false,
+                "nodal_solution_step_data_variables" : [],
+                "nodal_data_value_variables"         : [],
+                "element_data_value_variables"       : [],
+                "condition_data_value_variables"     : [],
+                "gauss_point_variables_extrapolated_to_nodes"              : []
+            }""")
+            vtk_parameters.AddString("model_part_name", self.model_part.Name)
+            vtk_parameters["nodal_solution_step_data_variables"] = self.settings["nodal_results"]
+            vtk_parameters["nodal_data_value_variables"] = self.settings["nodal_nonhistorical_results"]
+            self.vtk_output = KratosMultiphysics.VtkOutput(self.model_part, vtk_parameters)
+
+        self.iteration = 0
+        self.timings = {"field" : [], "metric" : [], "remeshing" : [], "output" : []}
+
+    def UpdateMetricParameters(self, parameters):
+        """ Overwrites some of the metric parameters (e.g. the minimal size), the metric process is created again in the next iteration
+        """
+        for key in parameters.keys():
+            self.metric_parameters.SetValue(key, parameters[key])
+        self.metric_process = None
+
+    def Iterate(self):
+        """ Runs one iteration: field, metric, remeshing and output
+        """
+        self.model_part.ProcessInfo.SetValue(KratosMultiphysics.STEP, self.iteration)
+
+        start_time = time.time()
+        if self.field_function is not None:
+            self.field_function(self.model_part)
+        self.timings["field"].append(time.time() - start_time)
+
+        start_time = time.time()
+        self._ComputeMetric()
+        self.timings["metric"].append(time.time() - start_time)
+
+        start_time = time.time()
+        self.mmg_process.Execute()
+        self.find_nodal_h.Execute()
+        if self.settings["update_metric_after_remeshing"].GetBool():
+            self._ComputeMetric()
+        self.timings["remeshing"].append(time.time() - start_time)
+
+        start_time = time.time()
+        self._PrintOutput()
+        self.timings["output"].append(time.time() - start_time)
+
+        KratosMultiphysics.Logger.PrintInfo("RemeshingPipeline", "Iteration", self.iteration, "with", self.model_part.NumberOfNodes(), "nodes. Times (s):", \
+            ", ".join(stage + " " + "{:.3f}".format(stage_timings[-1]) for stage, stage_timings in self.timings.items()))
+        self.iteration += 1
+
+    def GetTimings(self):
+        """ Returns the time of each stage (field, metric, remeshing and output) of all the iterations
+        """
+        return self.timings
+
+    def Finalize(self):
+        """ Closes the outputs
+        """
+        if self.gid_output is not None:
+            self.gid_output.ExecuteFinalize()
+
+    def _ComputeMetric(self):
+        self.find_nodal_h.Execute()
+        KratosMultiphysics.VariableUtils().SetNonHistoricalVariableToZero(self.metric_tensor_variable, self.model_part.Nodes)
+        if self.gradient_process is not None:
+            KratosMultiphysics.VariableUtils().SetNonHistoricalVariableToZero(KratosMultiphysics.NODAL_AREA, self.model_part.Nodes)
+            self.gradient_process.Execute()
+        if self.metric_process is None:
+            self.metric_process = self._CreateMetricProcess()
+        self.metric_process.Execute()
+
+    def _CreateMetricProcess(self):
+        if self.metric_type == "hessian":
+            if self.dimension == 2:
+                return MeshingApplication.ComputeHessianSolMetricProcess2D(self.model_part, self.metric_variable, self.metric_parameters)
+            return MeshingApplication.ComputeHessianSolMetricProcess3D(self.model_part, self.metric_variable, self.metric_parameters)
+        if self.dimension == 2:
+            return MeshingApplication.ComputeLevelSetSolMetricProcess2D(self.model_part, self.gradient_variable, self.metric_parameters)
+        return MeshingApplication.ComputeLevelSetSolMetricProcess3D(self.model_part, self.gradient_variable, self.metric_parameters)
+
+    def _PrintOutput(self):
+        if self.gid_output is not None:
+            self.gid_output.ExecuteInitializeSolutionStep()
+            self.gid_output.PrintOutput()
+            self.gid_output.ExecuteFinalizeSolutionStep()
+        if self.vtk_output is not None:
+            self.vtk_output.PrintOutput()
@@ -3,7 +3,9 @@ from __future__ import print_function, absolute_import, division #makes KratosMu
 import KratosMultiphysics
 import KratosMultiphysics.MeshingApplication as MeshingApplication
 
-import math
+import numpy as np
+from field_utilities import SetNodalField
+from remeshing_pipeline import RemeshingPipeline
 
 model = KratosMultiphysics.Model()
 main_model_part = model.CreateModelPart("MainModelPart")
@@ -16,23 +18,12 @@ main_model_part.AddNodalSolutionStepVariable(KratosMultiphysics.NODAL_AREA)
 # We import the model main_model_part
 KratosMultiphysics.ModelPartIO("3D_hessian_test").ReadModelPart(main_model_part)
 
-iterations = 2
-for i in range(iterations):
-    main_model_part.ProcessInfo.SetValue(KratosMultiphysics.STEP, i)
-
-    # Calculate NODAL_H
-    find_nodal_h = KratosMultiphysics.FindNodalHNonHistoricalProcess(main_model_part)
-    find_nodal_h.Execute()
-
-    for node in main_model_part.Nodes:
-        # Calculate the element size
-        node.SetSolutionStepValue(KratosMultiphysics.DISTANCE, 0, math.tanh(-100.0 * (node.Y - 0.5 - 0.25 * math.sin(2*math.pi*node.X))) + math.tanh(100.0 * (node.Y - node.X)))
-
-    # We calculate the gardient of the distance variable
-    KratosMultiphysics.VariableUtils().SetNonHistoricalVariableToZero(MeshingApplication.METRIC_TENSOR_3D, main_model_part.Nodes)
-    minimal_size = 0.01/float(i + 1)
-    metric_param = KratosMultiphysics.Parameters(
-    """{
+# We define the remeshing pipeline: analytic field -> hessian metric -> MMG -> output
+pipeline_settings = KratosMultiphysics.Parameters("""
+{
+    "metric_type"                   : "hessian",
+    "metric_variable_name"          : "DISTANCE",
+    "metric_parameters"             : {
         "hessian_strategy_parameters"              :{
                 "estimate_interpolation_error"     : false,
                 "interpolation_error"              : 0.004,
@@ -48,65 +39,27 @@ for i in range(iterations):
             "boundary_layer_max_distance"      : 1.0,
             "interpolation"                    : "Linear"
         }
-    }"""
-    )
-    metric_param["minimal_size"].SetDouble(minimal_size)
-    local_hessian = MeshingApplication.ComputeHessianSolMetricProcess3D(main_model_part, KratosMultiphysics.DISTANCE, metric_param)
-    local_hessian.Execute()
+    },
+    "remeshing_parameters"          : { },
+    "output_name"                   : "gid_output",
+    "nodal_results"                 : ["DISTANCE"],
+    "nodal_nonhistorical_results"   : ["NODAL_H"]
+}
+""")
 
-    # We create the remeshing process
-    remesh_param = KratosMultiphysics.Parameters("""{ }""")
-    MmgProcess = MeshingApplication.MmgProcess3D(main_model_part, remesh_param)
-    MmgProcess.Execute()
+# We set the analytic field on all the nodes of the current mesh at once
+def ComputeDistance(model_part):
+    SetNodalField(model_part, KratosMultiphysics.DISTANCE, lambda x, y, z: np.tanh(-100.0 * (y - 0.5 - 0.25 * np.sin(2*np.pi*x))) + np.tanh(100.0 * (y - x)))
 
-    find_nodal_h.Execute()
+pipeline = RemeshingPipeline(main_model_part, pipeline_settings, ComputeDistance)
 
-    # Finally we export to GiD
-    from KratosMultiphysics.gid_output_process import GiDOutputProcess
-    gid_output = GiDOutputProcess(main_model_part,
-                                "gid_output_" + str(i),
-                                KratosMultiphysics.Parameters("""
-                                {
-                                    "result_file_configuration" : {
-                                        "gidpost_flags": {
-                                            "GiDPostMode": "GiD_PostBinary",
-                                            "WriteDeformedMeshFlag": "WriteUndeformed",
-                                            "WriteConditionsFlag": "WriteConditions",
-                                            "MultiFileFlag": "SingleFile"
-                                        },
-                                        "nodal_results"               : ["DISTANCE"],
-                                        "nodal_nonhistorical_results" : ["NODAL_H"]
-                                    }
-                                }
-                                """)
-                                )
-
-    gid_output.ExecuteInitialize()
-    gid_output.ExecuteBeforeSolutionLoop()
-    gid_output.ExecuteInitializeSolutionStep()
-    gid_output.PrintOutput()
-    gid_output.ExecuteFinalizeSolutionStep()
-    gid_output.ExecuteFinalize()
-
-    # Finally we export to VTK
-    vtk_settings = KratosMultiphysics.Parameters("""{
-        "model_part_name"                    : "MainModelPart",
-        "file_format"                        : "ascii",
-        "output_precision"                   : 7,
-        "output_control_type"                : "step",
-        "output_frequency"                   : 1.0,
-        "output_sub_model_parts"             : false,
-        "save_output_files_in_folder"        : false,
-        "custom_name_prefix"                 : "",
-        "nodal_solution_step_data_variables" : ["DISTANCE"],
-        "nodal_data_value_variables"         : ["NODAL_H"],
-        "nodal_flags"                        : [],
-        "element_data_value_variables"       : [],
-        "condition_data_value_variables"     : [],
-        "gauss_point_variables_extrapolated_to_nodes"              : []
-    }""")
+iterations = 2
+for i in range(iterations):
+    # We refine the minimal size at each iteration
+    minimal_size = 0.01/float(i + 1)
+    pipeline.UpdateMetricParameters(KratosMultiphysics.Parameters("""{ "minimal_size" : """ + str(minimal_size) + """ }"""))
 
-    vtk_settings["custom_name_prefix"].SetString("ITER_" + str(i) + "_")
-    vtk_io = KratosMultiphysics.VtkOutput(main_model_part, vtk_settings)
-    vtk_io.PrintOutput()
+    # We compute the field and the metric, remesh and export to GiD and VTK
+    pipeline.Iterate()
 
+pipeline.Finalize()
@@ -0,0 +1,97 @@
+# Import Python libraries
+import json
+import numpy as np
+
+
+def GatherPowerSums(indices,get_value_from_remote,number_of_power_sums=10):
+    """
+    function retrieving the power sums and the number of instances of all the qoi estimators of all the indices
+    the estimators of each index are synchronized with one call and their power sums with a second one,
+    instead of one call per power sum, qoi and index
+    input:  indices: Monte Carlo indices of the sampler, i.e. algo.monteCarloSampler.indices
+            get_value_from_remote: synchronization function of the distributed environment the algorithm ran with
+            number_of_power_sums: number of power sums of each qoi estimator
+    output: power_sums: array of shape (number of indices, number of qoi, number of power sums)
+            instances: array of shape (number of indices, number of qoi)
+    """
+    number_of_qoi = len(indices[0].qoiEstimator)
+    power_sums = np.zeros((len(indices),number_of_qoi,number_of_power_sums))
+    instances = np.zeros((len(indices),number_of_qoi),dtype=np.int64)
+    for index_counter,index in enumerate(indices):
+        estimators = get_value_from_remote(index.qoiEstimator)
+        estimators_values = get_value_from_remote([[estimator.powerSums[:number_of_power_sums],estimator._sampleCounter] for estimator in estimators])
+        for qoi_counter,(estimator_power_sums,sample_counter) in enumerate(estimators_values):
+            power_sums[index_counter,qoi_counter,:] = np.ravel(np.asarray(estimator_power_sums,dtype=np.float64))[:number_of_power_sums]
+            instances[index_counter,qoi_counter] = sample_counter
+    return power_sums,instances
+
+def CreateQoiGroup(power_sums,instances,qoi_ids,qoi_type,tag,biased_variance=False):
+    """
+    function selecting the qoi of a group (e.g. the pressure of all the nodes) and computing their first two h-statistics
+    input:  power_sums, instances: output of GatherPowerSums
+            qoi_ids: ids of the qoi of the group
+            qoi_type: e.g. "time_averaged_quantity", "time_series_quantity" or "scalar_quantity"
+            tag: physical quantity name
+            biased_variance: use the biased estimator of the variance (as done for time series quantities)
+    output: dictionary of the arrays of the group, the first axis is the index and the second the qoi
+    """
+    qoi_ids = np.asarray(list(qoi_ids),dtype=np.int64)
+    group_power_sums = power_sums[:,qoi_ids,:]
+    group_instances = instances[:,qoi_ids].astype(np.float64)
+    S1 = group_power_sums[:,:,0]
+    S2 = group_power_sums[:,:,1]
+    with np.errstate(divide="ignore",invalid="ignore"):
+        h1 = S1 / group_instances
+        if biased_variance:
+            h2 = (group_instances*S2 - S1**2) / group_instances**2
+        else:
+            h2 = (group_instances*S2 - S1**2) / ((group_instances-1)*group_instances)
+    return {"qoi_ids":qoi_ids,"power_sums":group_power_sums,"instances":instances[:,qoi_ids],"h1":h1,"h2":h2,"type":qoi_type,"tag":tag}
+
+def WritePowerSumsOutput(file_name,qoi_groups,node_ids=None,node_coordinates=None,summary=None):
+    """
+    function writing the qoi groups to a compressed npz file, with one array per group and field (e.g. "time_averaged_pressure.power_sums")
+    if a summary dictionary is given, it is written to a json file of the same name together with the description of the groups
+    input:  file_name: name of the output file without extension
+            qoi_groups: dictionary of groups created with CreateQoiGroup
+            node_ids, node_coordinates: ids and coordinates of the nodes of the model part of interest
+            summary: dictionary of further informations (e.g. project and XMC parameters)
+    """
+    arrays = {}
+    for group_name,group in qoi_groups.items():
+        for field in ["qoi_ids","power_sums","instances","h1","h2"]:
+            arrays[group_name+"."+field] = group[field]
+    if node_ids is not None:
+        arrays["node_ids"] = np.asarray(node_ids,dtype=np.int64)
+    if node_coordinates is not None:
+        arrays["node_coordinates"] = np.asarray(node_coordinates,dtype=np.float64)
+    np.savez_compressed(file_name+".npz",**arrays)
+
+    if summary is not None:
+        summary = dict(summary)
+        summary["power_sums_file"] = file_name+".npz"
+        summary["qoi_groups"] = {}
+        for group_name,group in qoi_groups.items():
+            group_summary = {"type":group["type"],"tag":group["tag"],"number_of_qoi":int(group["qoi_ids"].shape[0]),"instances":group["instances"][:,0].tolist()}
+            if group["qoi_ids"].shape[0] == 1:
+                # scalar quantities are small enough to be reported directly
+                group_summary["h1"] = group["h1"][:,0].tolist()
+                group_summary["h2"] = group["h2"][:,0].tolist()
+            summary["qoi_groups"][group_name] = group_summary
+        with open(file_name+".json","w") as f:
+            json.dump(summary,f,indent=2)
+
+def ReadPowerSumsOutput(file_name):
+    """
+    function reading a file written by WritePowerSumsOutput
+    output: dictionary {group name: {field: array}} and, if stored, the "node_ids" and "node_coordinates" arrays
+    """
+    output = {}
+    with np.load(file_name) as data:
+        for key in data.files:
+            if "." in key:
+                group_name,field = key.rsplit(".",1)
+                output.setdefault(group_name,{})[field] = data[key]
+            else:
+                output[key] = data[key]
+    return output
@@ -10,9 +10,17 @@ import pickle
 import KratosMultiphysics
 import KratosMultiphysics.MultilevelMonteCarloApplication
 import xmc
-import xmc.methodDefs_momentEstimator.computeCentralMoments as mdccm
 from exaqute.ExaquteTaskLocal import *
 
+# Import power sums output
+from power_sums_output import GatherPowerSums, CreateQoiGroup, WritePowerSumsOutput
+
+# Import checkpoint
+from xmc_checkpoint import CheckpointMultiCriterion
+
+# Import sample profiler
+from sample_profiler import GatherSampleProfiles
+
 if __name__ == "__main__":
 
     if(len(sys.argv)==2):
@@ -63,7 +71,14 @@ if __name__ == "__main__":
     multiCriterionInputDictionary=parameters["multiCriterionInputDictionary"]
     multiCriterionInputDictionary["criteria"] = criteriaArray
     multiCriterionInputDictionary["inputsForCriterion"] = criteriaInputs
-    criterion = xmc.multiCriterion.MultiCriterion(**multiCriterionInputDictionary)
+    # the criterion writes periodically the estimators to a checkpoint file and restores them if resume is true
+    checkpointInputDictionary = parameters.get("checkpointInputDictionary",{})
+    criterion = CheckpointMultiCriterion(\
+        checkpointInputDictionary.get("checkpointFileName","power_sums_outputs/checkpoint_"+parameters["solverWrapperInputDictionary"]["problemId"]+".pickle"),\
+        get_value_from_remote,\
+        checkpointInputDictionary.get("checkpointInterval",600.0),\
+        checkpointInputDictionary.get("resume",False),\
+        **multiCriterionInputDictionary)
 
     # ErrorEstimator
     statErrorEstimator = xmc.errorEstimator.ErrorEstimator(**parameters["errorEstimatorInputDictionary"])
@@ -83,6 +98,7 @@ if __name__ == "__main__":
     monteCarloSamplerInputDictionary["assemblers"] =  [expectationAssembler,varianceAssembler]
     monteCarloSamplerInputDictionary["errorEstimators"] = [statErrorEstimator]
     mcSampler = xmc.monteCarloSampler.MonteCarloSampler(**monteCarloSamplerInputDictionary)
+    criterion.SetMonteCarloSampler(mcSampler)
 
     # XMCAlgorithm
     XMCAlgorithmInputDictionary = parameters["XMCAlgorithmInputDictionary"]
@@ -99,6 +115,8 @@ if __name__ == "__main__":
         algo.runXMC()
     time_end = time.time()
     print("[SCREENING] time to solution:",time_end-time_start)
+    # final checkpoint, a new run with resume true continues from it
+    criterion.WriteCheckpoint()
 
     ########################################################################################################################################################################################################
     ########################################################################################################################################################################################################
@@ -115,6 +133,8 @@ if __name__ == "__main__":
 
     # writing to file a dictionary
     qoi_dict = {}
+    # save the cost of the samples of each level, profiled by the simulation scenario
+    qoi_dict["sample_profiles"] = GatherSampleProfiles(time_start)
     # save Kratos project parameters and mdpa info
     qoi_dict["KratosMultiphysics_project_parameters"] = {"project_parameters":project_parameters}
     qoi_dict["model_part"] = {"mdpa_names":current_model.GetModelPartNames(),"mdpa_of_interest":model_part_of_interest}
@@ -130,49 +150,17 @@ if __name__ == "__main__":
 
     # add legend
     qoi_dict["qoi_id_legend"] = {"index_legend":{}}
-    qoi_dict["qoi_id_legend"]["index_legend"] = {"qoi_id":"qoi id", "index": "Monte Carlo index/level", "instances": "number of samples/contributions for current level", "Sa": "power sum order a", "ha": "moment order a","type":"qoi type","tag":"physical quantity name","node_id": "mesh node id", "node_coordinates": "coordinates of the node"}
-
-    # save lift coefficient
-    for qoi_counter in range (0,1):
-        qoi_dict["qoi_id_"+str(qoi_counter)] = {"index_"+str(index): {} for index in range (len(algo.monteCarloSampler.indices))}
-        for index in range (len(algo.monteCarloSampler.indices)):
-            algo.monteCarloSampler.indices[index].qoiEstimator[qoi_counter] = get_value_from_remote(algo.monteCarloSampler.indices[index].qoiEstimator[qoi_counter])
-            sample_counter = algo.monteCarloSampler.indices[index].qoiEstimator[qoi_counter]._sampleCounter
-            S1 = float(get_value_from_remote(algo.monteCarloSampler.indices[index].qoiEstimator[qoi_counter].powerSums[0][0]))
-            S2 = float(get_value_from_remote(algo.monteCarloSampler.indices[index].qoiEstimator[qoi_counter].powerSums[1][0]))
-            S3 = float(get_value_from_remote(algo.monteCarloSampler.indices[index].qoiEstimator[qoi_counter].powerSums[2][0]))
-            S4 = float(get_value_from_remote(algo.monteCarloSampler.indices[index].qoiEstimator[qoi_counter].powerSums[3][0]))
-            S5 = float(get_value_from_remote(algo.monteCarloSampler.indices[index].qoiEstimator[qoi_counter].powerSums[4][0]))
-            S6 = float(get_value_from_remote(algo.monteCarloSampler.indices[index].qoiEstimator[qoi_counter].powerSums[5][0]))
-            S7 = float(get_value_from_remote(algo.monteCarloSampler.indices[index].qoiEstimator[qoi_counter].powerSums[6][0]))
-            S8 = float(get_value_from_remote(algo.monteCarloSampler.indices[index].qoiEstimator[qoi_counter].powerSums[7][0]))
-            S9 = float(get_value_from_remote(algo.monteCarloSampler.indices[index].qoiEstimator[qoi_counter].powerSums[8][0]))
-            S10 = float(get_value_from_remote(algo.monteCarloSampler.indices[index].qoiEstimator[qoi_counter].powerSums[9][0]))
-            h1 = float(get_value_from_remote(mdccm.computeCentralMomentsOrderOneDimensionZero(S1,sample_counter)))
-            h2 = float(get_value_from_remote(mdccm.computeCentralMomentsOrderTwoDimensionZero(S1,S2,sample_counter)))
-            qoi_dict["qoi_id_"+str(qoi_counter)]["index_"+str(index)] = {"qoi_id":qoi_counter, "index": index, "instances": sample_counter, "S1": S1, "S2": S2, "S3": S3, "S4": S4, "S5": S5, "S6": S6, "S7": S7, "S8": S8, "S9": S9, "S10": S10, "h1": h1, "h2": h2,"type":"scalar_quantity","tag":"lift_coefficient"}
-
-    # save pressure coefficient
-    for node in current_model.GetModelPart(model_part_of_interest).Nodes:
-        qoi_counter = qoi_counter + 1
-        qoi_dict["qoi_id_"+str(qoi_counter)] = {"index_"+str(index): {} for index in range (len(algo.monteCarloSampler.indices))}
-        for index in range (len(algo.monteCarloSampler.indices)):
-            algo.monteCarloSampler.indices[index].qoiEstimator[qoi_counter] = get_value_from_remote(algo.monteCarloSampler.indices[index].qoiEstimator[qoi_counter])
-            sample_counter = algo.monteCarloSampler.indices[index].qoiEstimator[qoi_counter]._sampleCounter
-            S1 = float(get_value_from_remote(algo.monteCarloSampler.indices[index].qoiEstimator[qoi_counter].powerSums[0][0]))
-            S2 = float(get_value_from_remote(algo.monteCarloSampler.indices[index].qoiEstimator[qoi_counter].powerSums[1][0]))
-            S3 = float(get_value_from_remote(algo.monteCarloSampler.indices[index].qoiEstimator[qoi_counter].powerSums[2][0]))
-            S4 = float(get_value_from_remote(algo.monteCarloSampler.indices[index].qoiEstimator[qoi_counter].powerSums[3][0]))
-            S5 = float(get_value_from_remote(algo.monteCarloSampler.indices[index].qoiEstimator[qoi_counter].powerSums[4][0]))
-            S6 = float(get_value_from_remote(algo.monteCarloSampler.indices[index].qoiEstimator[qoi_counter].powerSums[5][0]))
-            S7 = float(get_value_from_remote(algo.monteCarloSampler.indices[index].qoiEstimator[qoi_counter].powerSums[6][0]))
-            S8 = float(get_value_from_remote(algo.monteCarloSampler.indices[index].qoiEstimator[qoi_counter].powerSums[7][0]))
-            S9 = float(get_value_from_remote(algo.monteCarloSampler.indices[index].qoiEstimator[qoi_counter].powerSums[8][0]))
-            S10 = float(get_value_from_remote(algo.monteCarloSampler.indices[index].qoiEstimator[qoi_counter].powerSums[9][0]))
-            h1 = float(get_value_from_remote(mdccm.computeCentralMomentsOrderOneDimensionZero(S1,sample_counter)))
-            h2 = float(get_value_from_remote(mdccm.computeCentralMomentsOrderTwoDimensionZero(S1,S2,sample_counter)))
-            qoi_dict["qoi_id_"+str(qoi_counter)]["index_"+str(index)] = {"qoi_id":qoi_counter, "index": index, "instances": sample_counter, "S1": S1, "S2": S2, "S3": S3, "S4": S4, "S5": S5, "S6": S6, "S7": S7, "S8": S8, "S9": S9, "S10": S10, "h1": h1, "h2": h2,"type":"scalar_quantity","tag":"pressure coefficent","node_id":node.Id,"node_coordinates":[node.X,node.Y,node.Z]}
-
-    # save to file
-    with open('power_sums_outputs/MC_asynchronous_power_sums_' +str(time.time()) + '.json', 'w') as f:
-        json.dump(qoi_dict, f, indent=2)
+    qoi_dict["qoi_id_legend"]["index_legend"] = {"qoi_ids":"qoi ids of the group", "power_sums": "power sums S1,...,S10, axes are Monte Carlo index/level, qoi and power sum order", "instances": "number of samples/contributions for each level and qoi", "h1": "moment order 1", "h2": "moment order 2", "type":"qoi type","tag":"physical quantity name","node_ids": "mesh node ids", "node_coordinates": "coordinates of the nodes"}
+
+    # gather the power sums of all the qoi, the estimators of each index are synchronized at once
+    power_sums,instances = GatherPowerSums(algo.monteCarloSampler.indices,get_value_from_remote)
+    model_part_nodes = current_model.GetModelPart(model_part_of_interest).Nodes
+    number_nodes = current_model.GetModelPart(model_part_of_interest).NumberOfNodes()
+    qoi_groups = {}
+    qoi_groups["lift_coefficient"] = CreateQoiGroup(power_sums,instances,[0],"scalar_quantity","lift_coefficient")
+    qoi_groups["pressure_coefficient"] = CreateQoiGroup(power_sums,instances,range(1,1+number_nodes),"scalar_quantity","pressure coefficent")
+    node_ids = [node.Id for node in model_part_nodes]
+    node_coordinates = [[node.X,node.Y,node.Z] for node in model_part_nodes]
+
+    # save to file: power sums and moments to a compressed npz file, the other informations to a json summary
+    WritePowerSumsOutput('power_sums_outputs/MC_asynchronous_power_sums_' +str(time.time()),qoi_groups,node_ids,node_coordinates,summary=qoi_dict)
@@ -11,6 +11,12 @@ import KratosMultiphysics.MappingApplication
 # Importing the problem analysis stage class
 from KratosMultiphysics.CompressiblePotentialFlowApplication.potential_flow_analysis import PotentialFlowAnalysis
 
+# Import mapper cache
+from mapper_cache import GetMapper
+
+# Import sample profiler
+from sample_profiler import ProfileSampleCost
+
 # Avoid printing of Kratos informations
 KratosMultiphysics.Logger.GetDefaultOutput().SetSeverity(KratosMultiphysics.Logger.Severity.WARNING)
 
@@ -25,6 +31,7 @@ f =
 the QoI is
 lift coeficient
 """
+@ProfileSampleCost
 class SimulationScenario(PotentialFlowAnalysis):
     def __init__(self,input_model,input_parameters,sample):
         self.sample = sample
@@ -79,7 +86,7 @@ class SimulationScenario(PotentialFlowAnalysis):
             "interface_submodel_part_destination": "Body2D_Body",
             "echo_level" : 0
             }""")
-        mapper = KratosMultiphysics.MappingApplication.MapperFactory.CreateMapper(self._GetSolver().main_model_part,self.mapping_reference_model.GetModelPart("model"),mapping_parameters)
+        mapper = GetMapper(self._GetSolver().main_model_part,self.mapping_reference_model.GetModelPart("model"),mapping_parameters)
         mapper.Map(KratosMultiphysics.PRESSURE_COEFFICIENT, \
             KratosMultiphysics.PRESSURE_COEFFICIENT,        \
             KratosMultiphysics.MappingApplication.Mapper.FROM_NON_HISTORICAL |     \
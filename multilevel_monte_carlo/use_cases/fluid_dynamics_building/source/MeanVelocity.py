@@ -1,8 +1,8 @@
 import numpy as np
-import sympy
-from sympy import *
 
 def get_mean_velocity_logarithm_law():
+    # sympy is only required by the string profiles
+    from sympy import symbols
     y  = symbols('y')
     y_0_mean = 0.02 # corresponds to "open country terrain," M. Andre's dissertation, p30 laso needs to be considered as uncertain ?
     sy_0 = 0.002 # a standard deviation of 10 % is considered
@@ -20,6 +20,7 @@ def get_mean_velocity_logarithm_law():
     return str(mean_velocity)
 
 def get_mean_velocity_power_law(u_bar,alpha):
+    from sympy import symbols
     y  = symbols('y')
     yref = 10.0 # M. Andre's dissertation, p30
     uref = 10 # wind speed of 10 m/s
@@ -34,3 +35,60 @@ def get_mean_velocity_power_law(u_bar,alpha):
     mean_velocity = uref * np.power(y/yref,alpha)
 
     return str(mean_velocity)
+
+
+class LogarithmLawMeanVelocity(object):
+    """
+    numeric logarithmic mean velocity profile, u(y) = (u_bar/kappa) * log(y/y_0 + epsilon), as get_mean_velocity_logarithm_law
+    input:  u_bar: wind speed
+            y_0: roughness length
+    """
+    def __init__(self,u_bar,y_0,kappa=0.4,epsilon=1e-6):
+        self.u_bar = u_bar
+        self.y_0 = y_0
+        self.kappa = kappa
+        self.epsilon = epsilon
+
+    def Evaluate(self,y):
+        """
+        function evaluating the profile at an array of heights
+        """
+        return (self.u_bar/self.kappa) * np.log(np.asarray(y,dtype=np.float64)/self.y_0 + self.epsilon)
+
+
+class PowerLawMeanVelocity(object):
+    """
+    numeric power law mean velocity profile, u(y) = uref * (y/yref)^alpha, as get_mean_velocity_power_law
+    input:  uref: wind speed at the reference height
+            alpha: exponent of the power law
+            yref: reference height
+    """
+    def __init__(self,uref,alpha,yref=10.0):
+        self.uref = uref
+        self.alpha = alpha
+        self.yref = yref
+
+    def Evaluate(self,y):
+        """
+        function evaluating the profile at an array of heights
+        """
+        return self.uref * np.power(np.asarray(y,dtype=np.float64)/self.yref,self.alpha)
+
+
+class TabulatedMeanVelocity(object):
+    """
+    numeric mean velocity profile linearly interpolated from measured values, constant outside the table
+    input:  heights: increasing heights of the table
+            velocities: mean velocities at the heights
+    """
+    def __init__(self,heights,velocities):
+        self.heights = np.asarray(heights,dtype=np.float64)
+        self.velocities = np.asarray(velocities,dtype=np.float64)
+        if (self.heights.shape != self.velocities.shape) or (self.heights.size < 2) or np.any(np.diff(self.heights) <= 0.0):
+            raise Exception("The mean velocity table requires at least two increasing heights, with one velocity each.")
+
+    def Evaluate(self,y):
+        """
+        function evaluating the profile at an array of heights
+        """
+        return np.interp(np.asarray(y,dtype=np.float64),self.heights,self.velocities)
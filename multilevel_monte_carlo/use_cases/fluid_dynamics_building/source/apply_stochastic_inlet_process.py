@@ -1,3 +1,4 @@
+import numpy as np
 import KratosMultiphysics
 import KratosMultiphysics.FluidDynamicsApplication as KratosFluid
 from MeanVelocity import *
@@ -20,14 +21,26 @@ class ApplyInletProcess(KratosMultiphysics.Process):
             "modulus"         : 0.0,
             "constrained"     : true,
             "direction"       : [1.0,0.0,0.0],
-            "interval"        : [0.0,"End"]
+            "interval"        : [0.0,"End"],
+            "profile"         : "power_law",
+            "table_heights"   : [],
+            "table_velocities": [],
+            "ramp_time"       : 0.0
         }
         """)
 
-        # Trick: allow "modulus" and "direction" to be a double or a string value (otherwise the ValidateAndAssignDefaults might fail)
-        # inlet_velocity_modulus = get_mean_velocity_logarithm_law()
-        inlet_velocity_modulus = get_mean_velocity_power_law(settings["modulus"][0].GetDouble(),settings["modulus"][1].GetDouble())
-        settings["modulus"].SetString(inlet_velocity_modulus)
+        # the "power_law", "logarithm_law" and "tabulated" profiles are evaluated with numpy at the inlet nodes once,
+        # the "function" profile is the sympy string evaluated by the Kratos function parser at each node and step
+        self.profile = settings["profile"].GetString() if settings.Has("profile") else "power_law"
+        if (self.profile != "function"):
+            self.mean_velocity = self._CreateMeanVelocity(settings)
+            # the parameters of the profile are read, the modulus is not used anymore
+            settings.RemoveValue("modulus")
+        else:
+            # Trick: allow "modulus" and "direction" to be a double or a string value (otherwise the ValidateAndAssignDefaults might fail)
+            # inlet_velocity_modulus = get_mean_velocity_logarithm_law()
+            inlet_velocity_modulus = get_mean_velocity_power_law(settings["modulus"][0].GetDouble(),settings["modulus"][1].GetDouble())
+            settings["modulus"].SetString(inlet_velocity_modulus)
         if (settings.Has("modulus")):
             if (settings["modulus"].IsString()):
                 default_settings["modulus"].SetString("0.0")
@@ -58,16 +71,83 @@ class ApplyInletProcess(KratosMultiphysics.Process):
         for condition in self.inlet_model_part.Conditions:
             condition.Set(KratosMultiphysics.INLET, True)
 
-        # Construct the base process AssignVectorByDirectionProcess
-        import KratosMultiphysics.assign_vector_by_direction_process as assign_vector_by_direction_process
-        self.aux_process = assign_vector_by_direction_process.AssignVectorByDirectionProcess(Model, settings)
+        if (self.profile == "function"):
+            # Construct the base process AssignVectorByDirectionProcess
+            import KratosMultiphysics.assign_vector_by_direction_process as assign_vector_by_direction_process
+            self.aux_process = assign_vector_by_direction_process.AssignVectorByDirectionProcess(Model, settings)
+        else:
+            self.interval = KratosMultiphysics.IntervalUtility(settings)
+            self.constrained = settings["constrained"].GetBool()
+            self.ramp_time = settings["ramp_time"].GetDouble()
+            self.step_is_active = False
+            # cache the spatial part of the inlet velocity, the nodal profile times the unit direction
+            unit_direction = self._ComputeUnitDirection(settings)
+            heights = np.array(KratosMultiphysics.VariableUtils().GetCurrentPositionsVector(self.inlet_model_part.Nodes,3)).reshape(self.inlet_model_part.NumberOfNodes(),3)[:,1]
+            self.nodal_velocity = np.outer(self.mean_velocity.Evaluate(heights),unit_direction).ravel()
 
 
     def ExecuteInitializeSolutionStep(self):
-        # Call the base process ExecuteInitializeSolutionStep()
-        self.aux_process.ExecuteInitializeSolutionStep()
+        if (self.profile == "function"):
+            # Call the base process ExecuteInitializeSolutionStep()
+            self.aux_process.ExecuteInitializeSolutionStep()
+        else:
+            current_time = self.inlet_model_part.ProcessInfo[KratosMultiphysics.TIME]
+            if (self.interval.IsInInterval(current_time)):
+                self.step_is_active = True
+                if (self.constrained):
+                    self._ApplyFixity(True)
+                # the time dependence is a scalar factor of the cached spatial part
+                nodal_velocity = self.nodal_velocity * self._GetTimeFactor(current_time)
+                KratosMultiphysics.VariableUtils().SetSolutionStepValuesVector(self.inlet_model_part.Nodes,KratosMultiphysics.VELOCITY,KratosMultiphysics.Vector(nodal_velocity.tolist()),0)
 
 
     def ExecuteFinalizeSolutionStep(self):
-        # Call the base process ExecuteFinalizeSolutionStep()
-        self.aux_process.ExecuteFinalizeSolutionStep()
+        if (self.profile == "function"):
+            # Call the base process ExecuteFinalizeSolutionStep()
+            self.aux_process.ExecuteFinalizeSolutionStep()
+        else:
+            if (self.step_is_active and self.constrained):
+                self._ApplyFixity(False)
+            self.step_is_active = False
+
+
+    def _CreateMeanVelocity(self, settings):
+        # the modulus holds the stochastic parameters of the profile, [u_bar, alpha] for "power_law" and [u_bar, y_0] for "logarithm_law"
+        modulus = []
+        if (settings.Has("modulus") and settings["modulus"].IsArray()):
+            modulus = [settings["modulus"][i].GetDouble() for i in range(settings["modulus"].size())]
+        if (self.profile in ["power_law","logarithm_law"]) and (len(modulus) != 2):
+            raise Exception("Inlet " + self.profile + " profile requires a modulus with two parameters.")
+        if (self.profile == "power_law"):
+            # as get_mean_velocity_power_law, the profile is scaled with the reference wind speed of 10 m/s
+            return PowerLawMeanVelocity(10.0,modulus[1])
+        elif (self.profile == "logarithm_law"):
+            return LogarithmLawMeanVelocity(modulus[0],modulus[1])
+        elif (self.profile == "tabulated"):
+            return TabulatedMeanVelocity(settings["table_heights"].GetVector(),settings["table_velocities"].GetVector())
+        else:
+            raise Exception("Inlet profile " + self.profile + " is not supported, use power_law, logarithm_law, tabulated or function.")
+
+
+    def _ComputeUnitDirection(self, settings):
+        if (settings["direction"].IsString()):
+            # average inwards normal of the inlet conditions, as AssignVectorByDirectionProcess
+            KratosMultiphysics.NormalCalculationUtils().CalculateOnSimplex(self.inlet_model_part, self.inlet_model_part.ProcessInfo[KratosMultiphysics.DOMAIN_SIZE])
+            direction = -np.array(KratosMultiphysics.VariableUtils().SumConditionVectorVariable(KratosMultiphysics.NORMAL, self.inlet_model_part))
+        else:
+            direction = np.array(settings["direction"].GetVector())
+        direction_norm = np.linalg.norm(direction)
+        if (direction_norm < 1.0e-12):
+            raise Exception("Inlet direction has zero norm.")
+        return direction / direction_norm
+
+
+    def _GetTimeFactor(self, current_time):
+        if (self.ramp_time > 0.0):
+            return min(1.0, current_time / self.ramp_time)
+        return 1.0
+
+
+    def _ApplyFixity(self, is_fixed):
+        for variable in [KratosMultiphysics.VELOCITY_X, KratosMultiphysics.VELOCITY_Y, KratosMultiphysics.VELOCITY_Z]:
+            KratosMultiphysics.VariableUtils().ApplyFixity(variable, is_fixed, self.inlet_model_part.Nodes)
@@ -13,6 +13,9 @@ import xmc
 import xmc.methodDefs_momentEstimator.computeCentralMoments as mdccm
 from exaqute.ExaquteTaskLocal import *
 
+# Import sample profiler
+from sample_profiler import GatherSampleProfiles
+
 if __name__ == "__main__":
 
     if(len(sys.argv)==2):
@@ -113,6 +116,8 @@ if __name__ == "__main__":
 
     # writing to file a dictionary
     qoi_dict = {}
+    # save the cost of the samples of each level, profiled by the simulation scenario
+    qoi_dict["sample_profiles"] = GatherSampleProfiles(time_start)
     # save Kratos project parameters and mdpa info
     qoi_dict["KratosMultiphysics_project_parameters"] = {"project_parameters":project_parameters}
     qoi_dict["model_part"] = {"mdpa_names":current_model.GetModelPartNames(),"mdpa_of_interest":model_part_of_interest}
@@ -4,9 +4,19 @@ import KratosMultiphysics.FluidDynamicsApplication
 from KratosMultiphysics.FluidDynamicsApplication.fluid_dynamics_analysis import FluidDynamicsAnalysis
 import KratosMultiphysics.MappingApplication
 
+# Import mapper cache
+from mapper_cache import GetMapper
+
+# Import sample profiler
+from sample_profiler import ProfileSampleCost
+
+# Import qoi extraction
+from qoi_extraction import GetNodalValues
+
 # Avoid printing of Kratos informations
 KratosMultiphysics.Logger.GetDefaultOutput().SetSeverity(KratosMultiphysics.Logger.Severity.WARNING)
 
+@ProfileSampleCost
 class SimulationScenario(FluidDynamicsAnalysis):
     def __init__(self,input_model,input_parameters,sample):
         super().__init__(input_model,input_parameters)
@@ -24,22 +34,32 @@ class SimulationScenario(FluidDynamicsAnalysis):
         self.project_parameters["processes"]["boundary_conditions_process_list"][0]["Parameters"]["modulus"][0].SetDouble(self.sample[1])
         self.project_parameters["processes"]["boundary_conditions_process_list"][0]["Parameters"]["modulus"][1].SetDouble(self.sample[2])
 
-    def EvaluateQuantityOfInterest(self):
+    def EvaluateQuantityOfInterestArrays(self):
         """
-        function evaluating the QoI of the problem
+        function evaluating the QoI of the problem as arrays, the pressure is read from the nodes with one bulk call
         input:  self: an instance of the class
+        output: dictionary of
+                    drag_force_x: drag force x
+                    pressure: array (number of nodes) of the pressure
         """
-        qoi_list = []
+        qoi_arrays = {}
         # compute drag force
         drag_force_vector = KratosMultiphysics.FluidDynamicsApplication.DragUtilities().CalculateBodyFittedDrag(self.model.GetModelPart(self.interest_model_part))
-        qoi_list.append(drag_force_vector[0]) # add drag force
-
+        qoi_arrays["drag_force_x"] = drag_force_vector[0]
         if (self.mapping is not True):
-            for node in self.model.GetModelPart(self.interest_model_part).Nodes:
-                qoi_list.append(node.GetSolutionStepValue(KratosMultiphysics.PRESSURE)) # add pressure
+            qoi_arrays["pressure"] = GetNodalValues(self.model.GetModelPart(self.interest_model_part).Nodes,KratosMultiphysics.PRESSURE,historical=True)
         elif (self.mapping is True):
-            for node in self.mapping_reference_model.GetModelPart(self.interest_model_part).Nodes:
-                qoi_list.append(node.GetSolutionStepValue(KratosMultiphysics.PRESSURE)) # add pressure
+            qoi_arrays["pressure"] = GetNodalValues(self.mapping_reference_model.GetModelPart(self.interest_model_part).Nodes,KratosMultiphysics.PRESSURE,historical=True)
+        return qoi_arrays
+
+    def EvaluateQuantityOfInterest(self):
+        """
+        function evaluating the QoI of the problem
+        input:  self: an instance of the class
+        """
+        qoi_arrays = self.EvaluateQuantityOfInterestArrays()
+        qoi_list = [qoi_arrays["drag_force_x"]] # add drag force
+        qoi_list.extend(qoi_arrays["pressure"].tolist()) # add pressure
         print("[SCREENING] Total number of QoI:",len(qoi_list))
 
         return qoi_list
@@ -57,7 +77,7 @@ class SimulationScenario(FluidDynamicsAnalysis):
             "interface_submodel_part_destination": "NoSlip2D_structure",
             "echo_level" : 0
             }""")
-        mapper = KratosMultiphysics.MappingApplication.MapperFactory.CreateMapper(self._GetSolver().main_model_part,self.mapping_reference_model.GetModelPart("MainModelPart"),mapping_parameters)
+        mapper = GetMapper(self._GetSolver().main_model_part,self.mapping_reference_model.GetModelPart("MainModelPart"),mapping_parameters)
         mapper.Map(KratosMultiphysics.PRESSURE, \
             KratosMultiphysics.PRESSURE)
         print("[SCREENING] End Mapping")
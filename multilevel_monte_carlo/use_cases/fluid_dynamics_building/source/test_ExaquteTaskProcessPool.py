@@ -0,0 +1,89 @@
+# Import Python libraries
+import os
+import sys
+import shutil
+import tempfile
+import unittest
+
+# stub of the exaqute API, written to a folder shared with the worker processes through the environment
+_stub_directory = os.environ.get("EXAQUTE_STUB_DIRECTORY")
+if _stub_directory is None:
+    _stub_directory = tempfile.mkdtemp(prefix="exaqute_stub_")
+    os.environ["EXAQUTE_STUB_DIRECTORY"] = _stub_directory
+    os.makedirs(os.path.join(_stub_directory,"exaqute"))
+    with open(os.path.join(_stub_directory,"exaqute","__init__.py"),"w") as stub_file:
+        stub_file.write("")
+    with open(os.path.join(_stub_directory,"exaqute","ExaquteTaskLocal.py"),"w") as stub_file:
+        stub_file.write("class ExaquteTask(object):\n"
+                        "    def __init__(self,*args,**kwargs):\n"
+                        "        pass\n"
+                        "    def __call__(self,function):\n"
+                        "        return function\n"
+                        "INOUT = 'INOUT'\n"
+                        "COLLECTION_INOUT = 'COLLECTION_INOUT'\n")
+if _stub_directory not in sys.path:
+    sys.path.insert(0,_stub_directory)
+os.environ.setdefault("EXAQUTE_LOCAL_WORKERS","2")
+
+import ExaquteTaskProcessPool
+from ExaquteTaskProcessPool import *
+
+
+class Accumulator(object):
+    def __init__(self):
+        self.values = []
+
+@ExaquteTask(obj=INOUT)
+def AppendTask(obj,value):
+    obj.append(value)
+
+@ExaquteTask(obj=INOUT)
+def SetItemTask(obj,key,value):
+    obj[key] = value
+
+@ExaquteTask(obj=INOUT)
+def AppendAttributeTask(obj,value):
+    obj.values.append(value)
+
+@ExaquteTask(returns=1)
+def LengthTask(value):
+    return len(value)
+
+
+class TestExaquteTaskProcessPool(unittest.TestCase):
+    def test_inout_list(self):
+        values = []
+        for counter in range(5):
+            AppendTask(values,counter)
+        barrier()
+        self.assertEqual(values,[0,1,2,3,4])
+
+    def test_inout_dict(self):
+        values = {}
+        for counter in range(5):
+            SetItemTask(values,counter,counter**2)
+        barrier()
+        self.assertEqual(values,{0:0,1:1,2:4,3:9,4:16})
+
+    def test_inout_object(self):
+        accumulator = Accumulator()
+        for counter in range(5):
+            AppendAttributeTask(accumulator,counter)
+        barrier()
+        self.assertEqual(accumulator.values,[0,1,2,3,4])
+
+    def test_cached_arguments_released(self):
+        large_argument = b"0"*(2*ExaquteTaskProcessPool._cached_argument_minimum_size)
+        lengths = [LengthTask(large_argument) for _ in range(3)]
+        self.assertEqual(get_value_from_remote(lengths),[len(large_argument)]*3)
+        barrier()
+        self.assertEqual(len(ExaquteTaskProcessPool._cached_arguments),0)
+        if ExaquteTaskProcessPool._cached_arguments_directory is not None:
+            self.assertEqual(os.listdir(ExaquteTaskProcessPool._cached_arguments_directory),[])
+
+def tearDownModule():
+    ExaquteTaskProcessPool._ShutdownPool()
+    shutil.rmtree(_stub_directory,ignore_errors=True)
+
+if __name__ == "__main__":
+    unittest.main()
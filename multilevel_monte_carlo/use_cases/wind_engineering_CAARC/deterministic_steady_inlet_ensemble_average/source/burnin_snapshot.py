@@ -0,0 +1,96 @@
+# Import Python libraries
+import os
+import hashlib
+import numpy as np
+
+# Import Kratos
+import KratosMultiphysics
+
+# Import velocity field cache
+from velocity_field_cache import LoadAverageVelocityField
+
+
+def GetBurninSnapshotFileName(project_parameters,model_part):
+    """
+    function returning the name of the burn-in snapshot of a model part, None if snapshots are not used
+    the name depends on the problem, the burn-in time and the nodal coordinates, hence each level (mesh) has its own snapshot
+    input:  project_parameters: Kratos Parameters of the problem, snapshots are used if problem_data.burnin_snapshot.use_snapshot is true
+            model_part: model part whose flow state is stored
+    """
+    problem_data = project_parameters["problem_data"]
+    if not (problem_data.Has("burnin_snapshot") and problem_data["burnin_snapshot"]["use_snapshot"].GetBool()):
+        return None
+    coordinates = np.array(KratosMultiphysics.VariableUtils().GetCurrentPositionsVector(model_part.Nodes,3))
+    mesh_key = hashlib.sha1(coordinates.tobytes()).hexdigest()[:16]
+    file_name = problem_data["problem_name"].GetString() + "_burnin_" + str(problem_data["burnin_time"].GetDouble()) + "_" + str(model_part.NumberOfNodes()) + "_" + mesh_key + ".npz"
+    return os.path.join(problem_data["burnin_snapshot"]["folder"].GetString(),file_name)
+
+def WriteBurninSnapshot(model_part,file_name):
+    """
+    function writing velocity and pressure of all the buffer steps, time, step and time step of a model part to a binary file
+    the file is written to a temporary file first, so that concurrent samples never read an incomplete snapshot
+    input:  model_part: model part whose flow state is stored
+            file_name: name of the snapshot file
+    """
+    snapshot = {}
+    snapshot["node_ids"] = np.fromiter((node.Id for node in model_part.Nodes),dtype=np.int64,count=model_part.NumberOfNodes())
+    snapshot["time"] = model_part.ProcessInfo[KratosMultiphysics.TIME]
+    snapshot["step"] = model_part.ProcessInfo[KratosMultiphysics.STEP]
+    snapshot["delta_time"] = model_part.ProcessInfo[KratosMultiphysics.DELTA_TIME]
+    buffer_size = model_part.GetBufferSize()
+    snapshot["velocity"] = np.array([KratosMultiphysics.VariableUtils().GetSolutionStepValuesVector(model_part.Nodes,KratosMultiphysics.VELOCITY,step) for step in range(buffer_size)])
+    snapshot["pressure"] = np.array([KratosMultiphysics.VariableUtils().GetSolutionStepValuesVector(model_part.Nodes,KratosMultiphysics.PRESSURE,step) for step in range(buffer_size)])
+    snapshot_directory = os.path.dirname(file_name)
+    if snapshot_directory != "" and not os.path.isdir(snapshot_directory):
+        os.makedirs(snapshot_directory,exist_ok=True)
+    temporary_file_name = file_name + "." + str(os.getpid()) + ".tmp.npz"
+    np.savez(temporary_file_name,**snapshot)
+    os.replace(temporary_file_name,file_name)
+    print("[INFO] burn-in snapshot written to",file_name,"at time",snapshot["time"])
+
+def ReadBurninSnapshot(model_part,file_name):
+    """
+    function setting velocity and pressure of all the buffer steps, time, step and time step of a model part from a snapshot
+    input:  model_part: model part whose flow state is set, with the same nodes of the snapshot
+            file_name: name of the snapshot file
+    output: time of the snapshot
+    """
+    with np.load(file_name) as snapshot:
+        node_ids = np.fromiter((node.Id for node in model_part.Nodes),dtype=np.int64,count=model_part.NumberOfNodes())
+        if not np.array_equal(node_ids,snapshot["node_ids"]):
+            raise Exception("The nodes of the burn-in snapshot " + file_name + " are not the nodes of " + model_part.FullName())
+        buffer_size = min(model_part.GetBufferSize(),snapshot["velocity"].shape[0])
+        for step in range(buffer_size):
+            KratosMultiphysics.VariableUtils().SetSolutionStepValuesVector(model_part.Nodes,KratosMultiphysics.VELOCITY,KratosMultiphysics.Vector(snapshot["velocity"][step].tolist()),step)
+            KratosMultiphysics.VariableUtils().SetSolutionStepValuesVector(model_part.Nodes,KratosMultiphysics.PRESSURE,KratosMultiphysics.Vector(snapshot["pressure"][step].tolist()),step)
+        model_part.ProcessInfo[KratosMultiphysics.TIME] = float(snapshot["time"])
+        model_part.ProcessInfo[KratosMultiphysics.STEP] = int(snapshot["step"])
+        model_part.ProcessInfo[KratosMultiphysics.DELTA_TIME] = float(snapshot["delta_time"])
+        return float(snapshot["time"])
+
+def StartFromBurninSnapshot(model_part,file_name,project_parameters):
+    """
+    function replacing the initial condition of a sample with the flow state of the burn-in snapshot
+    the correlated perturbation of the sample, i.e. its initial velocity minus the average velocity field, is added to the snapshot
+    velocity of the free nodes, the uncorrelated perturbation is applied afterwards by the simulation scenario
+    input:  model_part: main model part of the sample, already initialized
+            file_name: name of the snapshot file
+            project_parameters: Kratos Parameters of the problem
+    output: time of the snapshot
+    """
+    number_of_nodes = model_part.NumberOfNodes()
+    initial_velocity = np.array(KratosMultiphysics.VariableUtils().GetSolutionStepValuesVector(model_part.Nodes,KratosMultiphysics.VELOCITY,0)).reshape(number_of_nodes,3)
+    snapshot_time = ReadBurninSnapshot(model_part,file_name)
+    if (project_parameters["problem_data"]["perturbation"]["type"].GetString() == "correlated"):
+        poisson_problem_data = project_parameters["processes"]["initial_conditions_process_list"][0]["Parameters"]["poisson_parameters"]["problem_data"]
+        average_velocity_field = LoadAverageVelocityField(poisson_problem_data["load_velocity_field"].GetString())
+        is_free = np.fromiter((not (node.IsFixed(KratosMultiphysics.VELOCITY_X) or node.IsFixed(KratosMultiphysics.VELOCITY_Y) or node.IsFixed(KratosMultiphysics.VELOCITY_Z) or node.IsFixed(KratosMultiphysics.PRESSURE)) \
+            for node in model_part.Nodes),dtype=bool,count=number_of_nodes)
+        free_indices = np.flatnonzero(is_free[:average_velocity_field.shape[0]])
+        perturbation = initial_velocity[free_indices] - average_velocity_field[free_indices]
+        for step in [1,0]:
+            velocity = np.array(KratosMultiphysics.VariableUtils().GetSolutionStepValuesVector(model_part.Nodes,KratosMultiphysics.VELOCITY,step)).reshape(number_of_nodes,3)
+            velocity[free_indices] += perturbation
+            KratosMultiphysics.VariableUtils().SetSolutionStepValuesVector(model_part.Nodes,KratosMultiphysics.VELOCITY,KratosMultiphysics.Vector(velocity.ravel().tolist()),step)
+    print("[INFO] sample started from the burn-in snapshot",file_name,"at time",snapshot_time)
+    return snapshot_time
@@ -0,0 +1,31 @@
+# Import Kratos
+import KratosMultiphysics
+import KratosMultiphysics.MappingApplication
+
+# mappers created by the current process: {(origin name, destination name, settings): (origin model part, destination model part, mapper)}
+_cached_mappers = {}
+
+def GetMapper(origin_model_part,destination_model_part,mapper_settings):
+    """
+    function returning a mapper from origin to destination model part, which is created (and the search is run) only
+    if no mapper with the same settings exists yet for these model parts
+    the cache belongs to the process, hence the mapper is reused by all the time steps of a sample and by the following
+    samples of the same level run by the same worker, as long as they map between the same model parts instances
+    a mapper keeps references to its model parts, so the cached entry keeps them alive until it is replaced
+    input:  origin_model_part: model part the values are mapped from
+            destination_model_part: model part the values are mapped to
+            mapper_settings: Kratos Parameters of the mapper
+    """
+    key = (origin_model_part.FullName(),destination_model_part.FullName(),mapper_settings.WriteJsonString())
+    cached_mapper = _cached_mappers.get(key)
+    if (cached_mapper is None) or (cached_mapper[0] is not origin_model_part) or (cached_mapper[1] is not destination_model_part):
+        mapper = KratosMultiphysics.MappingApplication.MapperFactory.CreateMapper(origin_model_part,destination_model_part,mapper_settings)
+        cached_mapper = (origin_model_part,destination_model_part,mapper)
+        _cached_mappers[key] = cached_mapper
+    return cached_mapper[2]
+
+def ClearMapperCache():
+    """
+    function removing all the cached mappers, e.g. after remeshing the model parts
+    """
+    _cached_mappers.clear()
@@ -10,11 +10,17 @@ import KratosMultiphysics.MappingApplication
 # Importing the problem analysis stage class
 from FluidDynamicsAnalysisMC import FluidDynamicsAnalysisMC
 from KratosMultiphysics.FluidDynamicsApplication import check_and_prepare_model_process_fluid
+from streaming_statistics import StreamingCentralMoments
+from velocity_field_cache import LoadAverageVelocityField, PerturbVelocityField
+from mapper_cache import GetMapper
+from qoi_extraction import GetNodalValues, PowerSumsToQoiList
+from sample_profiler import ProfileSampleCost
 
 # Avoid printing of Kratos informations
 # KratosMultiphysics.Logger.GetDefaultOutput().SetSeverity(KratosMultiphysics.Logger.Severity.WARNING)
 
 
+@ProfileSampleCost
 class SimulationScenario(FluidDynamicsAnalysisMC):
     def __init__(self,input_model,input_parameters,sample):
         super().__init__(input_model,input_parameters)
@@ -49,25 +55,23 @@ class SimulationScenario(FluidDynamicsAnalysisMC):
             np.random.seed(self.sample[0])
             print("[SCREENING] perturbing the domain:","Yes")
             self.main_model_part = self.model.GetModelPart("FluidModelPart")
-            # load velocity field
-            with open("average_velocity_field_CAARC_3d_combinedPressureVelocity_312k_690.0.dat") as dat_file:
-                lines=dat_file.readlines()
-                for line, node in zip(lines, self.main_model_part.Nodes):
-                    if not (node.IsFixed(KratosMultiphysics.VELOCITY_X) or node.IsFixed(KratosMultiphysics.VELOCITY_Y) or node.IsFixed(KratosMultiphysics.VELOCITY_Z) or node.IsFixed(KratosMultiphysics.PRESSURE)):
-                        # retrieve velocity
-                        velocity = KratosMultiphysics.Vector(3, 0.0)
-                        velocity[0] = float(line.split(' ')[0])
-                        velocity[1] = float(line.split(' ')[1])
-                        velocity[2] = float(line.split(' ')[2])
-                        # compute uncorrelated perturbation
-                        perturbation_intensity = self.project_parameters["problem_data"]["perturbation"]["intensity"].GetDouble()
-                        perturbation = np.random.uniform(-perturbation_intensity,perturbation_intensity,3) * velocity.norm_2() # all nodes and directions different value
-                        # sum avg velocity and perturbation
-                        velocity[0] = velocity[0] + perturbation[0]
-                        velocity[1] = velocity[1] + perturbation[1]
-                        velocity[2] = velocity[2] + perturbation[2]
-                        node.SetSolutionStepValue(KratosMultiphysics.VELOCITY, 1, velocity)
-                        node.SetSolutionStepValue(KratosMultiphysics.VELOCITY, velocity)
+            number_of_nodes = self.main_model_part.NumberOfNodes()
+            if self.started_from_burnin_snapshot is True:
+                # the sample started from the burn-in snapshot, the perturbation is applied to the developed flow
+                average_velocity_field = np.array(KratosMultiphysics.VariableUtils().GetSolutionStepValuesVector(self.main_model_part.Nodes,KratosMultiphysics.VELOCITY,1)).reshape(number_of_nodes,3)
+            else:
+                # load velocity field, the parsed file is memory-mapped and shared by all the workers
+                average_velocity_field = LoadAverageVelocityField("average_velocity_field_CAARC_3d_combinedPressureVelocity_312k_690.0.dat")
+            # compute uncorrelated perturbation of the nodes which are not fixed, all nodes and directions different value
+            is_free = np.fromiter((not (node.IsFixed(KratosMultiphysics.VELOCITY_X) or node.IsFixed(KratosMultiphysics.VELOCITY_Y) or node.IsFixed(KratosMultiphysics.VELOCITY_Z) or node.IsFixed(KratosMultiphysics.PRESSURE)) \
+                for node in self.main_model_part.Nodes),dtype=bool,count=number_of_nodes)
+            perturbation_intensity = self.project_parameters["problem_data"]["perturbation"]["intensity"].GetDouble()
+            free_indices,perturbed_velocity = PerturbVelocityField(average_velocity_field,is_free,perturbation_intensity,3)
+            # sum avg velocity and perturbation, the fixed nodes keep their velocity
+            for step in [1,0]:
+                velocity = np.array(KratosMultiphysics.VariableUtils().GetSolutionStepValuesVector(self.main_model_part.Nodes,KratosMultiphysics.VELOCITY,step)).reshape(number_of_nodes,3)
+                velocity[free_indices] = perturbed_velocity
+                KratosMultiphysics.VariableUtils().SetSolutionStepValuesVector(self.main_model_part.Nodes,KratosMultiphysics.VELOCITY,KratosMultiphysics.Vector(velocity.ravel().tolist()),step)
             self.IsVelocityFieldPerturbed = True
         else:
             print("[SCREENING] perturbing the domain:", "No")
@@ -91,21 +95,13 @@ class SimulationScenario(FluidDynamicsAnalysisMC):
         super().Initialize()
         # compute neighbour elements required for current boundary conditions and not automatically run due to remeshing
         self.ComputeNeighbourElements()
-        # initialize moment estimator array for each qoi to build time power sums
-        self.moment_estimator_array = [[[0.0],[0.0],[0.0],[0.0],[0.0],[0.0],[0.0],[0.0],[0.0],[0.0]] for _ in range (0,1)] # +1 is for drag force x
+        # initialize streaming central moments of each qoi to build time power sums
+        self.drag_force_moments = StreamingCentralMoments(1) # drag force x
         if (self.mapping is True):
-            power_sums_parameters = KratosMultiphysics.Parameters("""{
-                "reference_variable_name": "PRESSURE"
-                }""")
-            self.power_sums_process_mapping = KratosMultiphysics.MultilevelMonteCarloApplication.PowerSumsStatistics(self.mapping_reference_model.GetModelPart(self.interest_model_part),power_sums_parameters)
-            self.power_sums_process_mapping.ExecuteInitialize()
+            self.pressure_moments = StreamingCentralMoments(self.mapping_reference_model.GetModelPart(self.interest_model_part).NumberOfNodes())
             print("[SCREENING] number nodes of submodelpart + drag force x:",self.mapping_reference_model.GetModelPart(self.interest_model_part).NumberOfNodes()+1) # +1 is for drag force x
         else:
-            power_sums_parameters = KratosMultiphysics.Parameters("""{
-                "reference_variable_name": "PRESSURE"
-                }""")
-            self.power_sums_process = KratosMultiphysics.MultilevelMonteCarloApplication.PowerSumsStatistics(self.model.GetModelPart(self.interest_model_part),power_sums_parameters)
-            self.power_sums_process.ExecuteInitialize()
+            self.pressure_moments = StreamingCentralMoments(self.model.GetModelPart(self.interest_model_part).NumberOfNodes())
             print("[SCREENING] number nodes of submodelpart + drag force x:",self.model.GetModelPart(self.interest_model_part).NumberOfNodes()+1) # +1 is for drag force x
         print("[SCREENING] mapping flag:",self.mapping)
 
@@ -122,17 +118,8 @@ class SimulationScenario(FluidDynamicsAnalysisMC):
                 self.project_parameters["problem_data"]["burnin_time"].GetDouble()):
                 # update number of contributions to time power sums
                 self.number_instances_time_power_sums = self.number_instances_time_power_sums + 1
-                # update power sums of drag force x
-                self.moment_estimator_array[0][0][0] = self.moment_estimator_array[0][0][0] + self.current_drag_force_x
-                self.moment_estimator_array[0][1][0] = self.moment_estimator_array[0][1][0] + self.current_drag_force_x**2
-                self.moment_estimator_array[0][2][0] = self.moment_estimator_array[0][2][0] + self.current_drag_force_x**3
-                self.moment_estimator_array[0][3][0] = self.moment_estimator_array[0][3][0] + self.current_drag_force_x**4
-                self.moment_estimator_array[0][4][0] = self.moment_estimator_array[0][4][0] + self.current_drag_force_x**5
-                self.moment_estimator_array[0][5][0] = self.moment_estimator_array[0][5][0] + self.current_drag_force_x**6
-                self.moment_estimator_array[0][6][0] = self.moment_estimator_array[0][6][0] + self.current_drag_force_x**7
-                self.moment_estimator_array[0][7][0] = self.moment_estimator_array[0][7][0] + self.current_drag_force_x**8
-                self.moment_estimator_array[0][8][0] = self.moment_estimator_array[0][8][0] + self.current_drag_force_x**9
-                self.moment_estimator_array[0][9][0] = self.moment_estimator_array[0][9][0] + self.current_drag_force_x**10
+                # update central moments of drag force x
+                self.drag_force_moments.Update([self.current_drag_force_x])
                 if (self.mapping is True):
                     # mapping from current model part of interest to reference model part the pressure
                     mapping_parameters = KratosMultiphysics.Parameters("""{
@@ -141,16 +128,53 @@ class SimulationScenario(FluidDynamicsAnalysisMC):
                         "interface_submodel_part_destination": "FluidModelPart.NoSlip3D_structure",
                         "echo_level" : 3
                         }""")
-                    mapper = KratosMultiphysics.MappingApplication.MapperFactory.CreateMapper(self._GetSolver().main_model_part,self.mapping_reference_model.GetModelPart("FluidModelPart"),mapping_parameters)
+                    mapper = GetMapper(self._GetSolver().main_model_part,self.mapping_reference_model.GetModelPart("FluidModelPart"),mapping_parameters)
                     mapper.Map(KratosMultiphysics.PRESSURE,KratosMultiphysics.PRESSURE)
-                    # pressure field power sums
-                    self.power_sums_process_mapping.ExecuteFinalizeSolutionStep()
+                    # update pressure field central moments
+                    self.pressure_moments.Update(self.GetNodalPressure(self.mapping_reference_model.GetModelPart(self.interest_model_part)))
                 else:
-                    # update pressure field power sums
-                    self.power_sums_process.ExecuteFinalizeSolutionStep()
+                    # update pressure field central moments
+                    self.pressure_moments.Update(self.GetNodalPressure(self.model.GetModelPart(self.interest_model_part)))
         else:
             pass
 
+    def GetNodalPressure(self,model_part):
+        """
+        function returning the current pressure of all nodes of a model part as contiguous array
+        input:  self: an instance of the class
+                model_part: model part of which the nodal pressure is returned
+        """
+        return GetNodalValues(model_part.Nodes,KratosMultiphysics.PRESSURE,historical=True)
+
+    def EvaluateQuantityOfInterestArrays(self):
+        """
+        function evaluating the QoI of the problem as arrays, the nodal values are read with one bulk call per variable and the time power sums are taken from the streaming moments
+        input:  self: an instance of the class
+        output: dictionary of
+                    drag_force_x: time average drag force x
+                    averaged_pressure: array (number of nodes) of the time average pressure
+                    drag_force_x_power_sums: array (1,10) of the drag force x time series power sums
+                    pressure_power_sums: array (number of nodes,10) of the pressure time series power sums
+                    number_instances_time_power_sums: number of time steps contributing to the time series power sums
+                    drag_force_power_spectral_density: array (number of frequencies,3) of the power spectral density of the drag force components, if problem_data.spectrum is given
+                    spectrum_frequencies: frequencies of the power spectral density, if problem_data.spectrum is given
+        """
+        if (self.mapping is True):
+            model_part = self.mapping_reference_model.GetModelPart(self.interest_model_part)
+        else:
+            model_part = self.model.GetModelPart(self.interest_model_part)
+        qoi_arrays = {}
+        qoi_arrays["drag_force_x"] = self.mean_drag_force_x
+        qoi_arrays["averaged_pressure"] = GetNodalValues(model_part.Nodes,KratosMultiphysics.ExaquteSandboxApplication.AVERAGED_PRESSURE)
+        qoi_arrays["drag_force_x_power_sums"] = self.drag_force_moments.GetPowerSums().T
+        qoi_arrays["pressure_power_sums"] = self.pressure_moments.GetPowerSums().T
+        qoi_arrays["number_instances_time_power_sums"] = self.number_instances_time_power_sums
+        frequencies,power_spectral_density = self.GetForcePowerSpectralDensity()
+        if frequencies is not None:
+            qoi_arrays["drag_force_power_spectral_density"] = power_spectral_density
+            qoi_arrays["spectrum_frequencies"] = frequencies
+        return qoi_arrays
+
     def EvaluateQuantityOfInterest(self):
         """
         function evaluating the QoI of the problem: lift coefficient
@@ -159,55 +183,24 @@ class SimulationScenario(FluidDynamicsAnalysisMC):
         # run if current index is index of interest
         if (self.is_current_index_maximum_index is True):
             print("[SCREENING] computing qoi current index:",self.is_current_index_maximum_index)
+            qoi_arrays = self.EvaluateQuantityOfInterestArrays()
+            M = qoi_arrays["number_instances_time_power_sums"]
+            # XMC updates one estimator per entry of the qoi list, hence the arrays are converted to scalars and power sums lists only here
             qoi_list = []
             # append time average drag coefficient
-            qoi_list.append(self.mean_drag_force_x)
+            qoi_list.append(qoi_arrays["drag_force_x"])
             # append time average pressure
-            if (self.mapping is not True):
-                for node in self.model.GetModelPart(self.interest_model_part).Nodes:
-                    qoi_list.append(node.GetValue(KratosMultiphysics.ExaquteSandboxApplication.AVERAGED_PRESSURE))
-            elif (self.mapping is True):
-                for node in self.mapping_reference_model.GetModelPart(self.interest_model_part).Nodes:
-                    qoi_list.append(node.GetValue(KratosMultiphysics.ExaquteSandboxApplication.AVERAGED_PRESSURE))
-            # append number of contributions to the power sums list
-            self.moment_estimator_array[0].append(self.number_instances_time_power_sums) # drag force x
+            qoi_list.extend(qoi_arrays["averaged_pressure"].tolist())
+            # append power spectral density of drag force x, one qoi per frequency
+            number_frequencies = 0
+            if "drag_force_power_spectral_density" in qoi_arrays:
+                number_frequencies = qoi_arrays["drag_force_power_spectral_density"].shape[0]
+                qoi_list.extend(qoi_arrays["drag_force_power_spectral_density"][:,0].tolist())
             # append drag force x time series power sums
-            qoi_list.append(self.moment_estimator_array[0]) # drag force x
+            qoi_list.extend(PowerSumsToQoiList(qoi_arrays["drag_force_x_power_sums"],M))
             # append pressure time series power sums
-            if (self.mapping is True):
-                for node in self.mapping_reference_model.GetModelPart(self.interest_model_part).Nodes:
-                    S1 = node.GetValue(KratosMultiphysics.MultilevelMonteCarloApplication.POWER_SUM_1)
-                    S2 = node.GetValue(KratosMultiphysics.MultilevelMonteCarloApplication.POWER_SUM_2)
-                    S3 = node.GetValue(KratosMultiphysics.MultilevelMonteCarloApplication.POWER_SUM_3)
-                    S4 = node.GetValue(KratosMultiphysics.MultilevelMonteCarloApplication.POWER_SUM_4)
-                    S5 = node.GetValue(KratosMultiphysics.MultilevelMonteCarloApplication.POWER_SUM_5)
-                    S6 = node.GetValue(KratosMultiphysics.MultilevelMonteCarloApplication.POWER_SUM_6)
-                    S7 = node.GetValue(KratosMultiphysics.MultilevelMonteCarloApplication.POWER_SUM_7)
-                    S8 = node.GetValue(KratosMultiphysics.MultilevelMonteCarloApplication.POWER_SUM_8)
-                    S9 = node.GetValue(KratosMultiphysics.MultilevelMonteCarloApplication.POWER_SUM_9)
-                    S10 = node.GetValue(KratosMultiphysics.MultilevelMonteCarloApplication.POWER_SUM_10)
-                    M = self.number_instances_time_power_sums
-                    power_sums = [[S1],[S2],[S3],[S4],[S5],[S6],[S7],[S8],[S9],[S10],M]
-                    qoi_list.append(power_sums)
-                assert (len(qoi_list) == \
-                    2*(self.mapping_reference_model.GetModelPart(self.interest_model_part).NumberOfNodes()+1)) # +1 is for drag force x
-            else:
-                for node in self.model.GetModelPart(self.interest_model_part).Nodes:
-                    S1 = node.GetValue(KratosMultiphysics.MultilevelMonteCarloApplication.POWER_SUM_1)
-                    S2 = node.GetValue(KratosMultiphysics.MultilevelMonteCarloApplication.POWER_SUM_2)
-                    S3 = node.GetValue(KratosMultiphysics.MultilevelMonteCarloApplication.POWER_SUM_3)
-                    S4 = node.GetValue(KratosMultiphysics.MultilevelMonteCarloApplication.POWER_SUM_4)
-                    S5 = node.GetValue(KratosMultiphysics.MultilevelMonteCarloApplication.POWER_SUM_5)
-                    S6 = node.GetValue(KratosMultiphysics.MultilevelMonteCarloApplication.POWER_SUM_6)
-                    S7 = node.GetValue(KratosMultiphysics.MultilevelMonteCarloApplication.POWER_SUM_7)
-                    S8 = node.GetValue(KratosMultiphysics.MultilevelMonteCarloApplication.POWER_SUM_8)
-                    S9 = node.GetValue(KratosMultiphysics.MultilevelMonteCarloApplication.POWER_SUM_9)
-                    S10 = node.GetValue(KratosMultiphysics.MultilevelMonteCarloApplication.POWER_SUM_10)
-                    M = self.number_instances_time_power_sums
-                    power_sums = [[S1],[S2],[S3],[S4],[S5],[S6],[S7],[S8],[S9],[S10],M]
-                    qoi_list.append(power_sums)
-                assert (len(qoi_list) \
-                    == 2*(self.model.GetModelPart(self.interest_model_part).NumberOfNodes()+1)) # +1 is for drag force x
+            qoi_list.extend(PowerSumsToQoiList(qoi_arrays["pressure_power_sums"],M))
+            assert (len(qoi_list) == 2*(qoi_arrays["pressure_power_sums"].shape[0]+1)+number_frequencies) # +1 is for drag force x
         else:
             print("[SCREENING] computing qoi current index:",self.is_current_index_maximum_index)
             qoi_list = None
@@ -226,7 +219,7 @@ class SimulationScenario(FluidDynamicsAnalysisMC):
             "interface_submodel_part_destination": "FluidModelPart.NoSlip3D_structure",
             "echo_level" : 3
             }""")
-        mapper = KratosMultiphysics.MappingApplication.MapperFactory.CreateMapper(self._GetSolver().main_model_part,self.mapping_reference_model.GetModelPart("FluidModelPart"),mapping_parameters)
+        mapper = GetMapper(self._GetSolver().main_model_part,self.mapping_reference_model.GetModelPart("FluidModelPart"),mapping_parameters)
         mapper.Map(KratosMultiphysics.ExaquteSandboxApplication.AVERAGED_PRESSURE, \
             KratosMultiphysics.ExaquteSandboxApplication.AVERAGED_PRESSURE,        \
             KratosMultiphysics.MappingApplication.Mapper.FROM_NON_HISTORICAL |     \
@@ -0,0 +1,148 @@
+# Import Python libraries
+import numpy as np
+
+
+class StreamingCentralMoments(object):
+    """
+    streaming estimator of the central moments of several quantities (e.g. the pressure of all nodes) at once
+    the mean and the central sums M_p = sum_i (x_i - mean)^p are updated with the Welford/Pebay formulas,
+    which are numerically stable also for high moments, contrary to accumulating the raw power sums S_p = sum_i x_i^p
+    two estimators (e.g. of different time windows, samples or levels) can be merged
+    the raw power sums required by the moment estimators of XMC are computed only when exported
+    reference: P. Pebay, Formulas for robust, one-pass parallel computation of covariances and arbitrary-order statistical moments, SAND2008-6212 (2008)
+    """
+    def __init__(self,number_of_values,order=10):
+        self.number_of_values = number_of_values
+        self.order = order
+        # binomial coefficients C(p,k), p,k = 0,...,order
+        self.binomial_coefficients = np.zeros((order+1,order+1))
+        for p in range(order+1):
+            self.binomial_coefficients[p,0] = 1.0
+            for k in range(1,p+1):
+                self.binomial_coefficients[p,k] = self.binomial_coefficients[p-1,k-1] + self.binomial_coefficients[p-1,k]
+        self.Reset()
+
+    def Reset(self):
+        """
+        function resetting the estimator
+        input:  self: an instance of the class
+        """
+        self.number_of_samples = 0
+        self.mean = np.zeros(self.number_of_values)
+        # central_sums[p] = M_p, rows 0 and 1 are not used (M_0 = number_of_samples and M_1 = 0)
+        self.central_sums = np.zeros((self.order+1,self.number_of_values))
+
+    def Update(self,values):
+        """
+        function adding one realization of all quantities
+        input:  self: an instance of the class
+                values: array of size number_of_values
+        """
+        values = np.asarray(values,dtype=np.float64).reshape(self.number_of_values)
+        if self.number_of_samples == 0:
+            self.mean[:] = values
+            self.number_of_samples = 1
+        else:
+            self._Combine(1,values,None)
+
+    def UpdateBatch(self,values):
+        """
+        function adding several realizations of all quantities
+        input:  self: an instance of the class
+                values: array of shape (number_of_realizations,number_of_values)
+        """
+        values = np.asarray(values,dtype=np.float64).reshape(-1,self.number_of_values)
+        if values.shape[0] == 0:
+            return
+        batch_mean = np.mean(values,axis=0)
+        deviation = values - batch_mean
+        batch_central_sums = np.zeros((self.order+1,self.number_of_values))
+        deviation_power = deviation * deviation
+        for p in range(2,self.order+1):
+            batch_central_sums[p] = np.sum(deviation_power,axis=0)
+            deviation_power *= deviation
+        self._Combine(values.shape[0],batch_mean,batch_central_sums)
+
+    def Merge(self,other):
+        """
+        function merging the realizations of another estimator of the same quantities
+        input:  self: an instance of the class
+                other: an instance of the class
+        """
+        if (other.number_of_values != self.number_of_values) or (other.order != self.order):
+            raise Exception("Merging estimators of different size or order is not possible")
+        self._Combine(other.number_of_samples,other.mean,other.central_sums)
+
+    def _Combine(self,number_of_samples_b,mean_b,central_sums_b):
+        if number_of_samples_b == 0:
+            return
+        if self.number_of_samples == 0:
+            self.number_of_samples = number_of_samples_b
+            self.mean = np.array(mean_b,dtype=np.float64)
+            if central_sums_b is not None:
+                self.central_sums = np.array(central_sums_b,dtype=np.float64)
+            return
+        n_a = self.number_of_samples
+        n_b = number_of_samples_b
+        n = n_a + n_b
+        delta = mean_b - self.mean
+        # delta_powers[k] = delta^k
+        delta_powers = np.empty((self.order+1,self.number_of_values))
+        delta_powers[0] = 1.0
+        for k in range(1,self.order+1):
+            delta_powers[k] = delta_powers[k-1] * delta
+        central_sums_a = self.central_sums
+        central_sums = np.zeros_like(central_sums_a)
+        for p in range(2,self.order+1):
+            central_sums[p] = central_sums_a[p]
+            if central_sums_b is not None:
+                central_sums[p] += central_sums_b[p]
+            for k in range(1,p-1):
+                term = (-n_b/n)**k * central_sums_a[p-k]
+                if central_sums_b is not None:
+                    term = term + (n_a/n)**k * central_sums_b[p-k]
+                central_sums[p] += self.binomial_coefficients[p,k] * term * delta_powers[k]
+            central_sums[p] += (n_a*n_b/n)**p * (1.0/n_b**(p-1) - (-1.0/n_a)**(p-1)) * delta_powers[p]
+        self.central_sums = central_sums
+        self.mean = self.mean + delta * (n_b/n)
+        self.number_of_samples = n
+
+    def GetCentralMoment(self,p):
+        """
+        function returning the biased central moment of order p of all quantities
+        input:  self: an instance of the class
+                p: order of the central moment, 2 <= p <= order
+        """
+        return self.central_sums[p] / self.number_of_samples
+
+    def GetPowerSums(self):
+        """
+        function returning the raw power sums S_1,...,S_order of all quantities
+        S_p = sum_k C(p,k) mean^(p-k) M_k, with M_0 = number_of_samples and M_1 = 0
+        input:  self: an instance of the class
+        output: array of shape (order,number_of_values), row p-1 contains S_p
+        """
+        power_sums = np.zeros((self.order,self.number_of_values))
+        if self.number_of_samples == 0:
+            return power_sums
+        # mean_powers[k] = mean^k
+        mean_powers = np.empty((self.order+1,self.number_of_values))
+        mean_powers[0] = 1.0
+        for k in range(1,self.order+1):
+            mean_powers[k] = mean_powers[k-1] * self.mean
+        for p in range(1,self.order+1):
+            power_sum = self.number_of_samples * mean_powers[p]
+            for k in range(2,p+1):
+                power_sum = power_sum + self.binomial_coefficients[p,k] * mean_powers[p-k] * self.central_sums[k]
+            power_sums[p-1] = power_sum
+        return power_sums
+
+    def GetPowerSumsList(self,index):
+        """
+        function returning the power sums of one quantity in the format of the time power sums of the qoi list
+        input:  self: an instance of the class
+                index: index of the quantity
+        output: [[S1],...,[S_order],number_of_samples]
+        """
+        power_sums = self.GetPowerSums()[:,index]
+        return [[power_sum] for power_sum in power_sums.tolist()] + [self.number_of_samples]
@@ -0,0 +1,116 @@
+# Import Python libraries
+import os
+import numpy as np
+
+# Import streaming statistics
+from streaming_statistics import StreamingCentralMoments
+
+
+class TimeSeriesRecorder(object):
+    """
+    recorder of a time series with a fixed number of columns (e.g. time and the three drag force components)
+    the rows are stored in a preallocated buffer
+        capacity = None: the buffer grows by doubling its size, appending a row has amortized constant cost
+        capacity = n: the buffer keeps n rows, if it is full the rows are appended to spill_file_name (raw float64),
+                      or the oldest rows are overwritten if no spill file is given
+    mean and variance of the recorded rows are updated on the fly, hence they are available even if rows are not kept in memory
+    """
+    def __init__(self,number_of_columns,capacity=None,initial_capacity=1024,spill_file_name=None):
+        self.number_of_columns = number_of_columns
+        self.capacity = capacity
+        self.spill_file_name = spill_file_name
+        if capacity is None:
+            initial_capacity = max(1,initial_capacity)
+        else:
+            initial_capacity = capacity
+        self.buffer = np.empty((initial_capacity,number_of_columns))
+        self.buffer_size = 0
+        self.buffer_start = 0 # first row of the circular buffer, used if old rows are overwritten
+        self.number_of_rows = 0
+        self.number_of_spilled_rows = 0
+        self.last_row = None
+        self.statistics = StreamingCentralMoments(number_of_columns,order=2)
+        if self.spill_file_name is not None and os.path.isfile(self.spill_file_name):
+            os.remove(self.spill_file_name)
+
+    def Record(self,values,update_statistics=True):
+        """
+        function appending a row to the time series
+        input:  self: an instance of the class
+                values: array of size number_of_columns
+                update_statistics: if the row contributes to mean and variance (e.g. False during burn-in)
+        """
+        if self.buffer_size == self.buffer.shape[0]:
+            if self.capacity is None:
+                new_buffer = np.empty((2*self.buffer.shape[0],self.number_of_columns))
+                new_buffer[:self.buffer_size] = self.buffer
+                self.buffer = new_buffer
+            elif self.spill_file_name is not None:
+                self.Flush()
+        if self.buffer_size < self.buffer.shape[0]:
+            self.buffer[self.buffer_size] = values
+            self.buffer_size += 1
+        else:
+            # overwrite the oldest row
+            self.buffer[self.buffer_start] = values
+            self.buffer_start = (self.buffer_start + 1) % self.buffer.shape[0]
+        self.number_of_rows += 1
+        self.last_row = np.array(values,dtype=np.float64)
+        if update_statistics:
+            self.statistics.Update(values)
+
+    def Flush(self):
+        """
+        function appending the rows of the buffer to the spill file and emptying the buffer
+        input:  self: an instance of the class
+        """
+        if self.spill_file_name is None or self.buffer_size == 0:
+            return
+        with open(self.spill_file_name,"ab") as spill_file:
+            self.buffer[:self.buffer_size].tofile(spill_file)
+        self.number_of_spilled_rows += self.buffer_size
+        self.buffer_size = 0
+
+    @property
+    def data(self):
+        """
+        rows kept in memory, in recording order
+        """
+        if self.buffer_start == 0:
+            return self.buffer[:self.buffer_size]
+        return np.concatenate((self.buffer[self.buffer_start:],self.buffer[:self.buffer_start]))
+
+    def ReadAll(self):
+        """
+        function returning all the rows available, the spilled rows are memory-mapped and followed by the rows in memory
+        input:  self: an instance of the class
+        """
+        if self.number_of_spilled_rows == 0:
+            return self.data
+        spilled_rows = np.memmap(self.spill_file_name,dtype=np.float64,mode="r",shape=(self.number_of_spilled_rows,self.number_of_columns))
+        return np.concatenate((spilled_rows,self.data))
+
+    def GetLast(self):
+        """
+        function returning the last recorded row, None if nothing was recorded
+        input:  self: an instance of the class
+        """
+        return self.last_row
+
+    @property
+    def mean(self):
+        """
+        mean of the rows which updated the statistics, nan if there are none
+        """
+        if self.statistics.number_of_samples == 0:
+            return np.full(self.number_of_columns,np.nan)
+        return self.statistics.mean
+
+    @property
+    def variance(self):
+        """
+        unbiased variance of the rows which updated the statistics, nan if there are less than two
+        """
+        if self.statistics.number_of_samples < 2:
+            return np.full(self.number_of_columns,np.nan)
+        return self.statistics.central_sums[2] / (self.statistics.number_of_samples - 1)
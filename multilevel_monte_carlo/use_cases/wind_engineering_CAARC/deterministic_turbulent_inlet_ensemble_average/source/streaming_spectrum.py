@@ -0,0 +1,94 @@
+# Import Python libraries
+import numpy as np
+
+
+class StreamingWelchSpectrum(object):
+    """
+    streaming estimator of the one-sided power spectral density of several time series (e.g. the drag force components) at once
+    the values are stored in a circular buffer of one segment, and each time a new segment is complete, i.e. every
+    segment_length - overlap values, it is detrended, windowed and transformed, and its periodogram is added to the sum
+    of the periodograms, hence memory does not depend on the length of the series
+    the estimate is the average of the periodograms (Welch method), and two estimators with the same settings
+    (e.g. of different samples) can be merged by adding their sums, which averages the segments of both
+    the time step is assumed constant
+    reference: P. Welch, The use of fast Fourier transform for the estimation of power spectra, IEEE Trans. Audio Electroacoust. 15 (1967)
+    """
+    def __init__(self,number_of_values,segment_length=256,overlap=0.5,time_step=1.0):
+        self.number_of_values = number_of_values
+        self.segment_length = int(segment_length)
+        self.overlap_length = int(round(overlap*self.segment_length))
+        if (self.segment_length < 2) or not (0 <= self.overlap_length < self.segment_length):
+            raise Exception("The spectrum requires a segment length of at least 2 and an overlap in [0,1)")
+        self.hop_length = self.segment_length - self.overlap_length
+        self.time_step = time_step
+        # Hann window, periodic as for spectral analysis
+        self.window = 0.5 - 0.5*np.cos(2.0*np.pi*np.arange(self.segment_length)/self.segment_length)
+        self.number_of_frequencies = self.segment_length//2 + 1
+        # preallocated buffers: circular buffer of the last segment and workspace of the transform
+        self.buffer = np.empty((self.segment_length,self.number_of_values))
+        self.workspace = np.empty((self.segment_length,self.number_of_values))
+        self.Reset()
+
+    def Reset(self):
+        """
+        function resetting the estimator
+        input:  self: an instance of the class
+        """
+        self.number_of_updates = 0
+        self.number_of_segments = 0
+        self.periodogram_sums = np.zeros((self.number_of_frequencies,self.number_of_values))
+
+    def Update(self,values):
+        """
+        function adding the values of one time step of all time series
+        input:  self: an instance of the class
+                values: array of size number_of_values
+        """
+        self.buffer[self.number_of_updates % self.segment_length] = values
+        self.number_of_updates += 1
+        if (self.number_of_updates >= self.segment_length) and ((self.number_of_updates - self.segment_length) % self.hop_length == 0):
+            self._AddSegment()
+
+    def Merge(self,other):
+        """
+        function merging the segments of another estimator with the same settings
+        the values of an incomplete segment of other are not merged
+        input:  self: an instance of the class
+                other: an instance of the class
+        """
+        if (other.number_of_values != self.number_of_values) or (other.segment_length != self.segment_length) or (other.time_step != self.time_step):
+            raise Exception("Merging spectra of different size, segment length or time step is not possible")
+        self.periodogram_sums += other.periodogram_sums
+        self.number_of_segments += other.number_of_segments
+
+    def GetFrequencies(self):
+        """
+        function returning the frequencies of the spectrum
+        input:  self: an instance of the class
+        """
+        return np.fft.rfftfreq(self.segment_length,d=self.time_step)
+
+    def GetPowerSpectralDensity(self):
+        """
+        function returning the one-sided power spectral density of all time series, zero if no segment is complete
+        input:  self: an instance of the class
+        output: array of shape (number_of_frequencies,number_of_values)
+        """
+        if self.number_of_segments == 0:
+            return np.zeros((self.number_of_frequencies,self.number_of_values))
+        power_spectral_density = self.periodogram_sums / (self.number_of_segments * np.sum(self.window**2) / self.time_step)
+        # one-sided spectrum: all frequencies but zero and Nyquist are counted twice
+        last_frequency = self.number_of_frequencies - 1 if self.segment_length % 2 == 0 else self.number_of_frequencies
+        power_spectral_density[1:last_frequency] *= 2.0
+        return power_spectral_density
+
+    def _AddSegment(self):
+        # order the circular buffer in the workspace, remove the mean and apply the window
+        first_row = self.number_of_updates % self.segment_length
+        self.workspace[:self.segment_length-first_row] = self.buffer[first_row:]
+        self.workspace[self.segment_length-first_row:] = self.buffer[:first_row]
+        self.workspace -= np.mean(self.workspace,axis=0)
+        self.workspace *= self.window[:,np.newaxis]
+        transform = np.fft.rfft(self.workspace,axis=0)
+        self.periodogram_sums += transform.real**2 + transform.imag**2
+        self.number_of_segments += 1
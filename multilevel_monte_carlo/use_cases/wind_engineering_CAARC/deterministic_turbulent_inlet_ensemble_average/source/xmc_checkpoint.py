@@ -0,0 +1,139 @@
+# Import Python libraries
+import os
+import time
+import pickle
+
+# Import XMC
+import xmc
+
+
+class CheckpointMultiCriterion(xmc.multiCriterion.MultiCriterion):
+    """
+    stopping criterion of XMC which, before being evaluated, writes periodically the state of the estimators of all the indices
+    (power sums and number of samples of qoi, combined and cost estimators) to a checkpoint file
+    if resume is True, the state of the checkpoint file is added to the estimators the first time the criterion is evaluated,
+    i.e. once the first iteration created the indices, and the algorithm continues from the merged estimators
+    power sums are additive, hence the samples of the first iteration and the restored ones are combined without loss
+    input:  checkpoint_file_name: name of the checkpoint file
+            get_value_from_remote: synchronization function of the distributed environment the algorithm runs with
+            checkpoint_interval: minimum time in seconds between two checkpoints
+            resume: restore the state of the checkpoint file
+            keywordArgs: settings of the MultiCriterion
+    """
+    def __init__(self,checkpoint_file_name,get_value_from_remote,checkpoint_interval=600.0,resume=False,**keywordArgs):
+        super().__init__(**keywordArgs)
+        self.checkpoint_file_name = checkpoint_file_name
+        self.get_value_from_remote = get_value_from_remote
+        self.checkpoint_interval = checkpoint_interval
+        self.last_checkpoint_time = time.time()
+        self.monte_carlo_sampler = None
+        self.resume_state = None
+        if resume is True:
+            if os.path.isfile(self.checkpoint_file_name):
+                with open(self.checkpoint_file_name,"rb") as checkpoint_file:
+                    self.resume_state = pickle.load(checkpoint_file)
+                print("[INFO] resuming from checkpoint",self.checkpoint_file_name)
+            else:
+                print("[INFO] checkpoint",self.checkpoint_file_name,"not found, starting a new run")
+
+    def SetMonteCarloSampler(self,monte_carlo_sampler):
+        """
+        function setting the Monte Carlo sampler whose indices are checkpointed
+        input:  self: an instance of the class
+                monte_carlo_sampler: Monte Carlo sampler of the algorithm
+        """
+        self.monte_carlo_sampler = monte_carlo_sampler
+
+    def flag(self,*args,**kwargs):
+        """
+        function restoring or writing the checkpoint if required, and evaluating the stopping criterion
+        input:  self: an instance of the class
+        """
+        if self.monte_carlo_sampler is not None:
+            if self.resume_state is not None:
+                self.RestoreCheckpoint(self.resume_state)
+                self.resume_state = None
+            if (time.time() - self.last_checkpoint_time) >= self.checkpoint_interval:
+                self.WriteCheckpoint()
+        return super().flag(*args,**kwargs)
+
+    def WriteCheckpoint(self):
+        """
+        function writing the state of the estimators of all the indices to the checkpoint file
+        the file is replaced atomically, hence a run killed while writing leaves the previous checkpoint intact
+        input:  self: an instance of the class
+        """
+        time_start = time.time()
+        state = {"time":time_start,"indices":[]}
+        for index in self.monte_carlo_sampler.indices:
+            index_state = {"indexValue":index.indexValue}
+            index_state["qoiEstimator"] = self._GetEstimatorsState(index.qoiEstimator)
+            index_state["combinedEstimator"] = self._GetEstimatorsState(index.combinedEstimator)
+            index_state["costEstimator"] = self._GetEstimatorsState([index.costEstimator])
+            state["indices"].append(index_state)
+        checkpoint_directory = os.path.dirname(self.checkpoint_file_name)
+        if checkpoint_directory != "" and not os.path.isdir(checkpoint_directory):
+            os.makedirs(checkpoint_directory)
+        temporary_file_name = self.checkpoint_file_name + ".tmp"
+        with open(temporary_file_name,"wb") as checkpoint_file:
+            pickle.dump(state,checkpoint_file,protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(temporary_file_name,self.checkpoint_file_name)
+        self.last_checkpoint_time = time.time()
+        print("[TIMER] checkpoint:",self.last_checkpoint_time-time_start)
+
+    def RestoreCheckpoint(self,state):
+        """
+        function adding the state of a checkpoint to the estimators of the indices with the same index value
+        input:  self: an instance of the class
+                state: dictionary read from the checkpoint file
+        """
+        indices = {str(index.indexValue):index for index in self.monte_carlo_sampler.indices}
+        for index_state in state["indices"]:
+            index = indices.get(str(index_state["indexValue"]))
+            if index is None:
+                print("[INFO] index",index_state["indexValue"],"of the checkpoint is not in the hierarchy, it is not restored")
+                continue
+            index.qoiEstimator = self._MergeEstimatorsState(index.qoiEstimator,index_state["qoiEstimator"])
+            index.combinedEstimator = self._MergeEstimatorsState(index.combinedEstimator,index_state["combinedEstimator"])
+            index.costEstimator = self._MergeEstimatorsState([index.costEstimator],index_state["costEstimator"])[0]
+            print("[INFO] index",index_state["indexValue"],"restored with",index_state["costEstimator"][0][1],"samples")
+
+    def _GetEstimatorsState(self,estimators):
+        """
+        function returning [power sums, number of samples] of each estimator, synchronized with two calls
+        input:  self: an instance of the class
+                estimators: list of moment estimators
+        """
+        estimators = self.get_value_from_remote(estimators)
+        return self.get_value_from_remote([[estimator.powerSums,estimator._sampleCounter] for estimator in estimators])
+
+    def _MergeEstimatorsState(self,estimators,estimators_state):
+        """
+        function adding power sums and number of samples of a checkpoint to a list of estimators
+        input:  self: an instance of the class
+                estimators: list of moment estimators
+                estimators_state: output of _GetEstimatorsState
+        output: list of the merged estimators
+        """
+        estimators = self.get_value_from_remote(estimators)
+        if len(estimators) != len(estimators_state):
+            raise ValueError("the checkpoint has "+str(len(estimators_state))+" estimators instead of "+str(len(estimators)))
+        for estimator,(power_sums,sample_counter) in zip(estimators,estimators_state):
+            estimator.powerSums = _AddPowerSums(self.get_value_from_remote(estimator.powerSums),power_sums)
+            estimator._sampleCounter = self.get_value_from_remote(estimator._sampleCounter) + sample_counter
+        return estimators
+
+
+def _AddPowerSums(power_sums_a,power_sums_b):
+    """
+    function adding two power sums with the same nested list structure
+    """
+    if power_sums_a is None:
+        return power_sums_b
+    if power_sums_b is None:
+        return power_sums_a
+    if isinstance(power_sums_a,(list,tuple)):
+        if len(power_sums_a) != len(power_sums_b):
+            raise ValueError("power sums of different size can not be added")
+        return [_AddPowerSums(a,b) for a,b in zip(power_sums_a,power_sums_b)]
+    return power_sums_a + power_sums_b
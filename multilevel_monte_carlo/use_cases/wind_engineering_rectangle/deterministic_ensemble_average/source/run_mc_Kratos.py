@@ -10,9 +10,17 @@ import pickle
 import KratosMultiphysics
 import KratosMultiphysics.MultilevelMonteCarloApplication
 import xmc
-import xmc.methodDefs_momentEstimator.computeCentralMoments as mdccm
 from exaqute.ExaquteTaskLocal import *
 
+# Import power sums output
+from power_sums_output import GatherPowerSums, CreateQoiGroup, WritePowerSumsOutput
+
+# Import checkpoint
+from xmc_checkpoint import CheckpointMultiCriterion
+
+# Import sample profiler
+from sample_profiler import GatherSampleProfiles
+
 if __name__ == "__main__":
 
     if(len(sys.argv)==2):
@@ -61,7 +69,14 @@ if __name__ == "__main__":
     multiCriterionInputDictionary=parameters["multiCriterionInputDictionary"]
     multiCriterionInputDictionary["criteria"] = criteriaArray
     multiCriterionInputDictionary["inputsForCriterion"] = criteriaInputs
-    criterion = xmc.multiCriterion.MultiCriterion(**multiCriterionInputDictionary)
+    # the criterion writes periodically the estimators to a checkpoint file and restores them if resume is true
+    checkpointInputDictionary = parameters.get("checkpointInputDictionary",{})
+    criterion = CheckpointMultiCriterion(\
+        checkpointInputDictionary.get("checkpointFileName","power_sums_outputs/checkpoint_"+parameters["solverWrapperInputDictionary"]["problemId"]+".pickle"),\
+        get_value_from_remote,\
+        checkpointInputDictionary.get("checkpointInterval",600.0),\
+        checkpointInputDictionary.get("resume",False),\
+        **multiCriterionInputDictionary)
 
     # ErrorEstimator
     statErrorEstimator = xmc.errorEstimator.ErrorEstimator(**parameters["errorEstimatorInputDictionary"])
@@ -81,6 +96,7 @@ if __name__ == "__main__":
     monteCarloSamplerInputDictionary["assemblers"] =  [expectationAssembler,varianceAssembler]
     monteCarloSamplerInputDictionary["errorEstimators"] = [statErrorEstimator]
     mcSampler = xmc.monteCarloSampler.MonteCarloSampler(**monteCarloSamplerInputDictionary)
+    criterion.SetMonteCarloSampler(mcSampler)
 
     # XMCAlgorithm
     XMCAlgorithmInputDictionary = parameters["XMCAlgorithmInputDictionary"]
@@ -96,6 +112,8 @@ if __name__ == "__main__":
         algo.runXMC()
     time_end = time.time()
     print("[SCREENING] computational time:",time_end-time_start)
+    # final checkpoint, a new run with resume true continues from it
+    criterion.WriteCheckpoint()
 
     ########################################################################################################################################################################################################
     ########################################################################################################################################################################################################
@@ -111,88 +129,27 @@ if __name__ == "__main__":
 
     # writing to file a dictionary
     qoi_dict = {}
+    # save the cost of the samples of each level, profiled by the simulation scenario
+    qoi_dict["sample_profiles"] = GatherSampleProfiles(time_start)
     # save project parameters and mdpa info
     qoi_dict["project_parameters_informations"] = {"project_parameters":project_parameters}
     qoi_dict["model_part_informations"] = {"mdpa_names":current_model.GetModelPartNames(),"mdpa_of_interest":"NoSlip2D_No_Slip_Auto1"}
 
-    # save time averaged drag force x
-    for qoi_counter in range (0,1):
-        qoi_dict[qoi_counter] = {index: {} for index in range (len(algo.monteCarloSampler.indices))}
-        for index in range (len(algo.monteCarloSampler.indices)):
-            sample_counter = algo.monteCarloSampler.indices[index].qoiEstimator[qoi_counter]._sampleCounter
-            S1 = get_value_from_remote(algo.monteCarloSampler.indices[index].qoiEstimator[qoi_counter].powerSums[0][0])
-            S2 = get_value_from_remote(algo.monteCarloSampler.indices[index].qoiEstimator[qoi_counter].powerSums[1][0])
-            S3 = get_value_from_remote(algo.monteCarloSampler.indices[index].qoiEstimator[qoi_counter].powerSums[2][0])
-            S4 = get_value_from_remote(algo.monteCarloSampler.indices[index].qoiEstimator[qoi_counter].powerSums[3][0])
-            S5 = get_value_from_remote(algo.monteCarloSampler.indices[index].qoiEstimator[qoi_counter].powerSums[4][0])
-            S6 = get_value_from_remote(algo.monteCarloSampler.indices[index].qoiEstimator[qoi_counter].powerSums[5][0])
-            S7 = get_value_from_remote(algo.monteCarloSampler.indices[index].qoiEstimator[qoi_counter].powerSums[6][0])
-            S8 = get_value_from_remote(algo.monteCarloSampler.indices[index].qoiEstimator[qoi_counter].powerSums[7][0])
-            S9 = get_value_from_remote(algo.monteCarloSampler.indices[index].qoiEstimator[qoi_counter].powerSums[8][0])
-            S10 = get_value_from_remote(algo.monteCarloSampler.indices[index].qoiEstimator[qoi_counter].powerSums[9][0])
-            h1 = get_value_from_remote(mdccm.computeCentralMomentsOrderOneDimensionZero(S1,sample_counter))
-            h2 = get_value_from_remote(mdccm.computeCentralMomentsOrderTwoDimensionZero(S1,S2,sample_counter))
-            qoi_dict[qoi_counter][index] = {"qoi_id":qoi_counter, "index": index, "instances": sample_counter, "S1": S1, "S2": S2, "S3": S3, "S4": S4, "S5": S5, "S6": S6, "S7": S7, "S8": S8, "S9": S9, "S10": S10, "h1": h1, "h2": h2,"type":"time_averaged_quantity","tag":"drag_force_x"}
-
-    # save time averaged pressure field
-    for node in current_model.GetModelPart("MainModelPart.NoSlip2D_No_Slip_Auto1").Nodes:
-        qoi_counter = qoi_counter + 1
-        qoi_dict[qoi_counter] = {index: {} for index in range (len(algo.monteCarloSampler.indices))}
-        for index in range (len(algo.monteCarloSampler.indices)):
-            sample_counter = algo.monteCarloSampler.indices[index].qoiEstimator[qoi_counter]._sampleCounter
-            S1 = get_value_from_remote(algo.monteCarloSampler.indices[index].qoiEstimator[qoi_counter].powerSums[0][0])
-            S2 = get_value_from_remote(algo.monteCarloSampler.indices[index].qoiEstimator[qoi_counter].powerSums[1][0])
-            S3 = get_value_from_remote(algo.monteCarloSampler.indices[index].qoiEstimator[qoi_counter].powerSums[2][0])
-            S4 = get_value_from_remote(algo.monteCarloSampler.indices[index].qoiEstimator[qoi_counter].powerSums[3][0])
-            S5 = get_value_from_remote(algo.monteCarloSampler.indices[index].qoiEstimator[qoi_counter].powerSums[4][0])
-            S6 = get_value_from_remote(algo.monteCarloSampler.indices[index].qoiEstimator[qoi_counter].powerSums[5][0])
-            S7 = get_value_from_remote(algo.monteCarloSampler.indices[index].qoiEstimator[qoi_counter].powerSums[6][0])
-            S8 = get_value_from_remote(algo.monteCarloSampler.indices[index].qoiEstimator[qoi_counter].powerSums[7][0])
-            S9 = get_value_from_remote(algo.monteCarloSampler.indices[index].qoiEstimator[qoi_counter].powerSums[8][0])
-            S10 = get_value_from_remote(algo.monteCarloSampler.indices[index].qoiEstimator[qoi_counter].powerSums[9][0])
-            h1 = get_value_from_remote(mdccm.computeCentralMomentsOrderOneDimensionZero(S1,sample_counter))
-            h2 = get_value_from_remote(mdccm.computeCentralMomentsOrderTwoDimensionZero(S1,S2,sample_counter))
-            qoi_dict[qoi_counter][index] = {"qoi_id":qoi_counter, "index": index, "instances": sample_counter, "S1": S1, "S2": S2, "S3": S3, "S4": S4, "S5": S5, "S6": S6, "S7": S7, "S8": S8, "S9": S9, "S10": S10, "h1": h1, "h2": h2,"type":"time_averaged_quantity","tag":"pressure","node_id":node.Id,"node_coordinates":[node.X,node.Y,node.Z]}
-
-    # save time series drag force x
-    for qoi_counter in range (parameters["solverWrapperInputDictionary"]["numberMomentEstimator"],parameters["solverWrapperInputDictionary"]["numberMomentEstimator"]+1):
-        qoi_dict[qoi_counter] = {index: {} for index in range (len(algo.monteCarloSampler.indices))}
-        for index in range (len(algo.monteCarloSampler.indices)):
-            sample_counter = get_value_from_remote(algo.monteCarloSampler.indices[index].qoiEstimator[qoi_counter]._sampleCounter)
-            S1 = get_value_from_remote(algo.monteCarloSampler.indices[index].qoiEstimator[qoi_counter].powerSums[0][0])
-            S2 = get_value_from_remote(algo.monteCarloSampler.indices[index].qoiEstimator[qoi_counter].powerSums[1][0])
-            S3 = get_value_from_remote(algo.monteCarloSampler.indices[index].qoiEstimator[qoi_counter].powerSums[2][0])
-            S4 = get_value_from_remote(algo.monteCarloSampler.indices[index].qoiEstimator[qoi_counter].powerSums[3][0])
-            S5 = get_value_from_remote(algo.monteCarloSampler.indices[index].qoiEstimator[qoi_counter].powerSums[4][0])
-            S6 = get_value_from_remote(algo.monteCarloSampler.indices[index].qoiEstimator[qoi_counter].powerSums[5][0])
-            S7 = get_value_from_remote(algo.monteCarloSampler.indices[index].qoiEstimator[qoi_counter].powerSums[6][0])
-            S8 = get_value_from_remote(algo.monteCarloSampler.indices[index].qoiEstimator[qoi_counter].powerSums[7][0])
-            S9 = get_value_from_remote(algo.monteCarloSampler.indices[index].qoiEstimator[qoi_counter].powerSums[8][0])
-            S10 = get_value_from_remote(algo.monteCarloSampler.indices[index].qoiEstimator[qoi_counter].powerSums[9][0])
-            h1 = get_value_from_remote(mdccm.computeCentralMomentsOrderOneDimensionZero(S1,sample_counter))
-            h2 = get_value_from_remote(mdccm.computeCentralMomentsOrderTwoDimensionZeroBiased(S1,S2,sample_counter))
-            qoi_dict[qoi_counter][index] = {"qoi_id":qoi_counter, "index": index, "instances": sample_counter, "S1": S1, "S2": S2, "S3": S3, "S4": S4, "S5": S5, "S6": S6, "S7": S7, "S8": S8, "S9": S9, "S10": S10, "h1": h1, "h2": h2,"type":"time_series_quantity","tag":"drag_force_x"}
-
-    # save time series pressure field
-    for node in current_model.GetModelPart("MainModelPart.NoSlip2D_No_Slip_Auto1").Nodes:
-        qoi_counter = qoi_counter + 1
-        qoi_dict[qoi_counter] = {index: {} for index in range (len(algo.monteCarloSampler.indices))}
-        for index in range (len(algo.monteCarloSampler.indices)):
-            sample_counter = get_value_from_remote(algo.monteCarloSampler.indices[index].qoiEstimator[qoi_counter]._sampleCounter)
-            S1 = get_value_from_remote(algo.monteCarloSampler.indices[index].qoiEstimator[qoi_counter].powerSums[0][0])
-            S2 = get_value_from_remote(algo.monteCarloSampler.indices[index].qoiEstimator[qoi_counter].powerSums[1][0])
-            S3 = get_value_from_remote(algo.monteCarloSampler.indices[index].qoiEstimator[qoi_counter].powerSums[2][0])
-            S4 = get_value_from_remote(algo.monteCarloSampler.indices[index].qoiEstimator[qoi_counter].powerSums[3][0])
-            S5 = get_value_from_remote(algo.monteCarloSampler.indices[index].qoiEstimator[qoi_counter].powerSums[4][0])
-            S6 = get_value_from_remote(algo.monteCarloSampler.indices[index].qoiEstimator[qoi_counter].powerSums[5][0])
-            S7 = get_value_from_remote(algo.monteCarloSampler.indices[index].qoiEstimator[qoi_counter].powerSums[6][0])
-            S8 = get_value_from_remote(algo.monteCarloSampler.indices[index].qoiEstimator[qoi_counter].powerSums[7][0])
-            S9 = get_value_from_remote(algo.monteCarloSampler.indices[index].qoiEstimator[qoi_counter].powerSums[8][0])
-            S10 = get_value_from_remote(algo.monteCarloSampler.indices[index].qoiEstimator[qoi_counter].powerSums[9][0])
-            h1 = get_value_from_remote(mdccm.computeCentralMomentsOrderOneDimensionZero(S1,sample_counter))
-            h2 = get_value_from_remote(mdccm.computeCentralMomentsOrderTwoDimensionZeroBiased(S1,S2,sample_counter))
-            qoi_dict[qoi_counter][index] = {"qoi_id":qoi_counter, "index": index, "instances": sample_counter, "S1": S1, "S2": S2, "S3": S3, "S4": S4, "S5": S5, "S6": S6, "S7": S7, "S8": S8, "S9": S9, "S10": S10, "h1": h1, "h2": h2,"type":"time_series_quantity","tag":"pressure","node_id":node.Id,"node_coordinates":[node.X,node.Y,node.Z]}
-
-    # save to file
-    with open('power_sums_outputs/MC_asynchronous_power_sums_' +str(time.time()) + '.json', 'w') as f:
-        json.dump(qoi_dict, f, indent=2)
+    # gather the power sums of all the qoi, the estimators of each index are synchronized at once
+    power_sums,instances = GatherPowerSums(algo.monteCarloSampler.indices,get_value_from_remote)
+    model_part_nodes = current_model.GetModelPart("MainModelPart.NoSlip2D_No_Slip_Auto1").Nodes
+    number_nodes = current_model.GetModelPart("MainModelPart.NoSlip2D_No_Slip_Auto1").NumberOfNodes()
+    qoi_groups = {}
+    number_moment_estimator = parameters["solverWrapperInputDictionary"]["numberMomentEstimator"]
+    qoi_groups["time_averaged_drag_force_x"] = CreateQoiGroup(power_sums,instances,[0],"time_averaged_quantity","drag_force_x")
+    qoi_groups["time_averaged_pressure"] = CreateQoiGroup(power_sums,instances,range(1,1+number_nodes),"time_averaged_quantity","pressure")
+    if number_moment_estimator > 1+number_nodes:
+        # power spectral density of drag force x, if problem_data.spectrum is given, at the frequencies numpy.fft.rfftfreq(segment_length,time_step)
+        qoi_groups["power_spectral_density_drag_force_x"] = CreateQoiGroup(power_sums,instances,range(1+number_nodes,number_moment_estimator),"spectral_quantity","drag_force_x")
+    qoi_groups["time_series_drag_force_x"] = CreateQoiGroup(power_sums,instances,[number_moment_estimator],"time_series_quantity","drag_force_x",biased_variance=True)
+    qoi_groups["time_series_pressure"] = CreateQoiGroup(power_sums,instances,range(number_moment_estimator+1,number_moment_estimator+1+number_nodes),"time_series_quantity","pressure",biased_variance=True)
+    node_ids = [node.Id for node in model_part_nodes]
+    node_coordinates = [[node.X,node.Y,node.Z] for node in model_part_nodes]
+
+    # save to file: power sums and moments to a compressed npz file, the other informations to a json summary
+    WritePowerSumsOutput('power_sums_outputs/MC_asynchronous_power_sums_' +str(time.time()),qoi_groups,node_ids,node_coordinates,summary=qoi_dict)
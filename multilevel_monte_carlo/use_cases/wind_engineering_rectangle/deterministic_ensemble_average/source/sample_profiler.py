@@ -0,0 +1,147 @@
+# Import Python libraries
+import os
+import json
+import time
+import socket
+import resource
+import functools
+
+# Import Kratos
+import KratosMultiphysics
+
+
+# folder of the profiles of the samples, next to the power sums
+sample_profiles_folder = "power_sums_outputs/sample_profiles"
+
+
+def ProfileSampleCost(simulation_scenario_class):
+    """
+    class decorator recording the cost of each sample run by the solver wrapper of XMC
+    the initialization, solution loop, finalization and QoI extraction (including the mapping) times, the number of
+    time steps and the peak resident set size of the sample are appended to a file of the worker process, after the
+    QoI of the sample are extracted
+    input:  simulation_scenario_class: class of the simulation scenario
+    output: the decorated class
+    """
+    def _TimePhase(method,phase):
+        @functools.wraps(method)
+        def _ProfiledMethod(self,*args,**kwargs):
+            profile = self.__dict__.setdefault("sample_profile",_CreateSampleProfile())
+            is_outermost = phase not in profile["running_phases"]
+            profile["running_phases"].add(phase)
+            time_start = time.time()
+            try:
+                output = method(self,*args,**kwargs)
+            finally:
+                if is_outermost:
+                    profile["running_phases"].discard(phase)
+                    profile[phase+"_time"] += time.time() - time_start
+            if is_outermost and phase == "qoi_extraction":
+                _WriteSampleProfile(self,profile)
+            return output
+        return _ProfiledMethod
+
+    def _CountTimeSteps(method):
+        @functools.wraps(method)
+        def _ProfiledMethod(self,*args,**kwargs):
+            process_info = self._GetSolver().GetComputingModelPart().ProcessInfo
+            initial_step = process_info[KratosMultiphysics.STEP]
+            output = _TimePhase(method,"solve")(self,*args,**kwargs)
+            self.sample_profile["number_of_time_steps"] += process_info[KratosMultiphysics.STEP] - initial_step
+            return output
+        return _ProfiledMethod
+
+    def _ResetPeakMemory(method):
+        @functools.wraps(method)
+        def _ProfiledMethod(self,*args,**kwargs):
+            _ResetPeakResidentSetSize()
+            return _TimePhase(method,"initialization")(self,*args,**kwargs)
+        return _ProfiledMethod
+
+    simulation_scenario_class.Initialize = _ResetPeakMemory(simulation_scenario_class.Initialize)
+    simulation_scenario_class.RunSolutionLoop = _CountTimeSteps(simulation_scenario_class.RunSolutionLoop)
+    simulation_scenario_class.Finalize = _TimePhase(simulation_scenario_class.Finalize,"finalization")
+    simulation_scenario_class.EvaluateQuantityOfInterest = _TimePhase(simulation_scenario_class.EvaluateQuantityOfInterest,"qoi_extraction")
+    if hasattr(simulation_scenario_class,"MappingAndEvaluateQuantityOfInterest"):
+        simulation_scenario_class.MappingAndEvaluateQuantityOfInterest = _TimePhase(simulation_scenario_class.MappingAndEvaluateQuantityOfInterest,"qoi_extraction")
+    return simulation_scenario_class
+
+def GatherSampleProfiles(start_time=0.0,folder=None):
+    """
+    function reading the profiles of the samples and summarizing them per level, i.e. per mesh
+    input:  start_time: only the samples started after this time are considered, e.g. the start of the run
+            folder: folder of the profiles, sample_profiles_folder by default
+    output: list of dictionaries, one per mesh sorted by number of nodes, with number of samples, average and maximum times,
+            average number of time steps and maximum peak resident set size (in MB)
+    """
+    if folder is None:
+        folder = sample_profiles_folder
+    levels = {}
+    if os.path.isdir(folder):
+        for file_name in sorted(os.listdir(folder)):
+            with open(os.path.join(folder,file_name),"r") as profile_file:
+                for line in profile_file:
+                    profile = json.loads(line)
+                    if profile["start_time"] >= start_time:
+                        levels.setdefault((profile["mesh"],profile["number_of_nodes"]),[]).append(profile)
+    summary = []
+    for (mesh,number_of_nodes),profiles in sorted(levels.items(),key=lambda item: item[0][1]):
+        level_summary = {"mesh":mesh,"number_of_nodes":number_of_nodes,"number_of_samples":len(profiles)}
+        for field in ["initialization_time","solve_time","finalization_time","qoi_extraction_time","total_time"]:
+            level_summary["average_"+field] = sum(profile[field] for profile in profiles) / len(profiles)
+            level_summary["maximum_"+field] = max(profile[field] for profile in profiles)
+        level_summary["average_number_of_time_steps"] = sum(profile["number_of_time_steps"] for profile in profiles) / len(profiles)
+        level_summary["maximum_peak_resident_set_size"] = max(profile["peak_resident_set_size"] for profile in profiles)
+        summary.append(level_summary)
+    return summary
+
+def _CreateSampleProfile():
+    """
+    function returning an empty profile of a sample
+    """
+    return {"start_time":time.time(),"running_phases":set(),"initialization_time":0.0,"solve_time":0.0,"finalization_time":0.0,"qoi_extraction_time":0.0,"number_of_time_steps":0}
+
+def _WriteSampleProfile(simulation,profile):
+    """
+    function appending the profile of a sample to the file of the worker process, one json object per line
+    """
+    model_import_settings = simulation.project_parameters["solver_settings"]["model_import_settings"]
+    record = {field:value for field,value in profile.items() if field != "running_phases"}
+    record["total_time"] = record["initialization_time"] + record["solve_time"] + record["finalization_time"] + record["qoi_extraction_time"]
+    record["mesh"] = model_import_settings["input_filename"].GetString() if model_import_settings.Has("input_filename") else ""
+    record["number_of_nodes"] = simulation._GetSolver().GetComputingModelPart().GetRootModelPart().NumberOfNodes()
+    record["peak_resident_set_size"] = _GetPeakResidentSetSize()
+    record["host"] = socket.gethostname()
+    if not os.path.isdir(sample_profiles_folder):
+        os.makedirs(sample_profiles_folder,exist_ok=True)
+    file_name = os.path.join(sample_profiles_folder,"sample_profiles_"+record["host"]+"_"+str(os.getpid())+".jsonl")
+    with open(file_name,"a") as profile_file:
+        profile_file.write(json.dumps(record)+"\n")
+    # a new profile is started if the same simulation extracts again its QoI
+    simulation.sample_profile = _CreateSampleProfile()
+
+def _ResetPeakResidentSetSize():
+    """
+    function resetting the peak resident set size of the process, where the operating system allows it (Linux)
+    otherwise the peak is the one of the whole life of the process, which may have run previous samples
+    """
+    try:
+        with open("/proc/self/clear_refs","w") as clear_refs_file:
+            clear_refs_file.write("5")
+    except (IOError,OSError):
+        pass
+
+def _GetPeakResidentSetSize():
+    """
+    function returning the peak resident set size of the process in MB
+    """
+    try:
+        with open("/proc/self/status","r") as status_file:
+            for line in status_file:
+                if line.startswith("VmHWM:"):
+                    return float(line.split()[1]) / 1024.0
+    except (IOError,OSError):
+        pass
+    # kilobytes on Linux, bytes on macOS
+    peak_resident_set_size = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak_resident_set_size / (1024.0**2 if os.uname().sysname == "Darwin" else 1024.0)
@@ -0,0 +1,30 @@
+# Import Python libraries
+import numpy as np
+
+# Import Kratos
+import KratosMultiphysics
+
+
+def GetNodalValues(nodes,variable,historical=False,step=0):
+    """
+    function returning the values of a scalar variable of all the nodes as float64 array, with one bulk call
+    input:  nodes: nodes of a model part
+            variable: scalar Kratos variable
+            historical: read the solution step value (True) or the non-historical value (False)
+            step: buffer position of the solution step value
+    output: array of shape (number of nodes)
+    """
+    if historical:
+        values = KratosMultiphysics.VariableUtils().GetSolutionStepValuesVector(nodes,variable,step)
+    else:
+        values = KratosMultiphysics.VariableUtils().GetValuesVector(nodes,variable)
+    return np.array(values,dtype=np.float64)
+
+def PowerSumsToQoiList(power_sums,number_of_instances):
+    """
+    function converting power sums arrays to the format of the time power sums of the qoi list, i.e. [[S1],...,[S10],M] per row
+    input:  power_sums: array of shape (number of qoi,order)
+            number_of_instances: number of contributions to the power sums
+    output: list of length number of qoi
+    """
+    return [[[power_sum] for power_sum in qoi_power_sums] + [number_of_instances] for qoi_power_sums in np.asarray(power_sums).tolist()]
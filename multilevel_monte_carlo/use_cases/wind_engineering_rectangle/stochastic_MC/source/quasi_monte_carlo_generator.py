@@ -0,0 +1,227 @@
+# Import Python libraries
+import math
+import numpy as np
+from statistics import NormalDist
+
+
+# primitive polynomials (degree, coefficients) and initial direction numbers of the Sobol sequence, from dimension 2
+# on, Joe and Kuo, "Constructing Sobol sequences with better two-dimensional projections", SIAM J. Sci. Comput., 2008
+_sobol_direction_numbers = [
+    (1,0,[1]),
+    (2,1,[1,3]),
+    (3,1,[1,3,1]),
+    (3,2,[1,1,1]),
+    (4,1,[1,1,3,3]),
+    (4,4,[1,3,5,13]),
+    (5,2,[1,1,5,5,17]),
+    (5,4,[1,1,5,5,5]),
+    (5,7,[1,1,7,11,19]),
+    (5,11,[1,1,5,1,1]),
+    (5,13,[1,1,1,3,11]),
+    (5,14,[1,3,5,5,31]),
+    (6,1,[1,3,3,9,7,49]),
+    (6,13,[1,1,1,15,21,21]),
+    (6,16,[1,3,1,13,27,49]),
+    (6,19,[1,1,1,15,7,5]),
+    (6,22,[1,3,1,15,13,25]),
+    (6,25,[1,1,5,5,19,61]),
+    (7,1,[1,3,7,11,23,15,103]),
+    (7,4,[1,3,7,13,13,15,69])]
+
+# number of bits of the Sobol points
+_number_of_bits = 32
+
+
+class QuasiMonteCarloGenerator(object):
+    """
+    random generator of XMC drawing the random variables of the samples from a scrambled Sobol or Halton sequence
+    the generator replaces xmc.randomGeneratorWrapper.RandomGeneratorWrapper in the samplerInputDictionary, and its settings
+    are read from the randomGeneratorInputDictionary
+    the n-th realisation of a generator is the point of index n of the sequence, hence samples are a deterministic function
+    of their index and of the seed, and workers evaluating them in parallel never share a random state
+    the scrambling is randomized by the seed: Sobol points are scrambled with a random linear matrix and a random digital shift,
+    Halton points with random digit permutations and a random (Cranley-Patterson) shift
+    independent randomizations of the sequence are interleaved, the n-th realisation belongs to the randomization n % R
+    input:  sequence: "sobol" or "halton"
+            distributions: list of the distributions of the random variables, "seed", "uniform" or "normal"
+            parameters: two parameters per random variable, lower and upper bounds for "seed" and "uniform", mean and
+                        standard deviation for "normal", as the parameters of returnUniformAndTwoNormal, required
+            seed: seed of the scrambling
+            numberOfRandomizations: number of independent randomizations of the sequence
+            firstIndex: index of the first point, e.g. the number of samples of a previous run which is continued
+    """
+    # number of generators created, the generators of different levels draw different points
+    _number_of_streams = 0
+
+    def __init__(self,**keywordArgs):
+        self.sequence = keywordArgs.get("sequence","sobol")
+        self.distributions = keywordArgs.get("distributions",["seed","normal","normal"])
+        self.parameters = keywordArgs.get("parameters")
+        self.seed = keywordArgs.get("seed",0)
+        self.number_of_randomizations = keywordArgs.get("numberOfRandomizations",1)
+        self.first_index = keywordArgs.get("firstIndex",0)
+        if self.parameters is None:
+            raise ValueError("the random generator requires the parameters of the distributions "+str(self.distributions)+", e.g. [0,4294967295,10.0,1.0,0.12,0.012]")
+        if len(self.parameters) != 2*len(self.distributions):
+            raise ValueError("the random generator requires two parameters for each of the distributions "+str(self.distributions))
+        for distribution in self.distributions:
+            if distribution not in ["seed","uniform","normal"]:
+                raise ValueError("distribution "+distribution+" is not supported, use seed, uniform or normal")
+        self.dimension = len([distribution for distribution in self.distributions if distribution != "seed"])
+        self.stream = QuasiMonteCarloGenerator._number_of_streams
+        QuasiMonteCarloGenerator._number_of_streams += 1
+        self.sample_counter = 0
+        # scrambled sequences of each randomization, drawn from the seed and the stream
+        self.scrambled_sequences = []
+        for randomization in range(self.number_of_randomizations):
+            random_state = np.random.default_rng([self.seed,self.stream,randomization])
+            if self.sequence == "sobol":
+                self.scrambled_sequences.append(ScrambledSobolSequence(self.dimension,random_state))
+            elif self.sequence == "halton":
+                self.scrambled_sequences.append(ScrambledHaltonSequence(self.dimension,random_state))
+            else:
+                raise ValueError("sequence "+self.sequence+" is not supported, use sobol or halton")
+
+    def realisation(self):
+        """
+        function returning the random variables of the next sample
+        input:  self: an instance of the class
+        output: list of the random variables, ordered as the distributions
+        """
+        sample = self.Sample(self.sample_counter)
+        self.sample_counter += 1
+        return sample
+
+    def Sample(self,sample_index):
+        """
+        function returning the random variables of a sample, which only depend on its index
+        input:  self: an instance of the class
+                sample_index: index of the sample
+        output: list of the random variables, ordered as the distributions
+        """
+        randomization = sample_index % self.number_of_randomizations
+        point_index = self.first_index + sample_index // self.number_of_randomizations
+        point = self.scrambled_sequences[randomization].Points(np.array([point_index]))[0]
+        sample = []
+        dimension = 0
+        for distribution,(first_parameter,second_parameter) in zip(self.distributions,zip(self.parameters[0::2],self.parameters[1::2])):
+            if distribution == "seed":
+                # the seeds of high-dimensional random fields are drawn from a hash of the sample index
+                hashed_index = np.random.SeedSequence([self.seed,self.stream,sample_index]).generate_state(1,dtype=np.uint64)[0]
+                sample.append(int(first_parameter + int(hashed_index) % int(second_parameter-first_parameter)))
+            elif distribution == "uniform":
+                sample.append(float(first_parameter + (second_parameter-first_parameter)*point[dimension]))
+                dimension += 1
+            else:
+                sample.append(NormalDist(first_parameter,second_parameter).inv_cdf(float(point[dimension])))
+                dimension += 1
+        return sample
+
+
+class ScrambledSobolSequence(object):
+    """
+    Sobol sequence scrambled with a random linear matrix and a random digital shift (Matousek, 1998)
+    input:  dimension: number of dimensions of the points
+            random_state: numpy random generator drawing the scrambling
+    """
+    def __init__(self,dimension,random_state):
+        if dimension > len(_sobol_direction_numbers)+1:
+            raise ValueError("the Sobol sequence supports up to "+str(len(_sobol_direction_numbers)+1)+" dimensions")
+        self.dimension = dimension
+        self.direction_numbers = np.empty((_number_of_bits,dimension),dtype=np.uint64)
+        for dimension_index in range(dimension):
+            direction_numbers = _GetSobolDirectionNumbers(dimension_index)
+            # random lower triangular matrix with unit diagonal, row r sets the r-th most significant bit
+            rows = []
+            for bit in range(_number_of_bits):
+                row_bit = 1 << (_number_of_bits-1-bit)
+                higher_bits = ((1 << _number_of_bits) - 1) ^ ((row_bit << 1) - 1)
+                rows.append(row_bit | (int(random_state.integers(0,1 << _number_of_bits)) & higher_bits))
+            for bit,direction_number in enumerate(direction_numbers):
+                scrambled_direction_number = 0
+                for row_index,row in enumerate(rows):
+                    if bin(row & direction_number).count("1") % 2 == 1:
+                        scrambled_direction_number |= 1 << (_number_of_bits-1-row_index)
+                self.direction_numbers[bit,dimension_index] = scrambled_direction_number
+        self.digital_shift = random_state.integers(0,1 << _number_of_bits,size=dimension,dtype=np.uint64)
+
+    def Points(self,indices):
+        """
+        function returning the points of given indices, computed directly from the Gray code of the indices
+        input:  self: an instance of the class
+                indices: array of non negative integers
+        output: array of shape (number of indices, dimension) with values in (0,1)
+        """
+        gray_code = np.asarray(indices,dtype=np.uint64)
+        gray_code = gray_code ^ (gray_code >> np.uint64(1))
+        integer_points = np.tile(self.digital_shift,(gray_code.shape[0],1))
+        for bit in range(_number_of_bits):
+            is_set = ((gray_code >> np.uint64(bit)) & np.uint64(1)).astype(bool)
+            integer_points[is_set] ^= self.direction_numbers[bit]
+        return (integer_points.astype(np.float64) + 0.5) / float(1 << _number_of_bits)
+
+
+class ScrambledHaltonSequence(object):
+    """
+    Halton sequence scrambled with random digit permutations and a random (Cranley-Patterson) shift
+    input:  dimension: number of dimensions of the points
+            random_state: numpy random generator drawing the scrambling
+    """
+    def __init__(self,dimension,random_state):
+        self.dimension = dimension
+        self.bases = _GetPrimes(dimension)
+        # digits resolved by double precision
+        self.number_of_digits = [int(math.ceil(53*math.log(2)/math.log(base))) for base in self.bases]
+        self.permutations = [np.array([random_state.permutation(base) for _ in range(number_of_digits)]) \
+            for base,number_of_digits in zip(self.bases,self.number_of_digits)]
+        self.shift = random_state.random(dimension)
+
+    def Points(self,indices):
+        """
+        function returning the points of given indices
+        input:  self: an instance of the class
+                indices: array of non negative integers
+        output: array of shape (number of indices, dimension) with values in (0,1)
+        """
+        indices = np.asarray(indices,dtype=np.int64)
+        points = np.empty((indices.shape[0],self.dimension))
+        for dimension_index,(base,number_of_digits,permutations) in enumerate(zip(self.bases,self.number_of_digits,self.permutations)):
+            remainder = indices.copy()
+            radical_inverse = np.zeros(indices.shape[0])
+            weight = 1.0 / base
+            for digit in range(number_of_digits):
+                radical_inverse += weight * permutations[digit][remainder % base]
+                remainder //= base
+                weight /= base
+            points[:,dimension_index] = radical_inverse
+        points = np.mod(points + self.shift,1.0)
+        return np.clip(points,2.0**-53,1.0-2.0**-53)
+
+
+def _GetSobolDirectionNumbers(dimension_index):
+    """
+    function returning the direction numbers of a dimension of the Sobol sequence, scaled to the number of bits
+    """
+    if dimension_index == 0:
+        return [1 << (_number_of_bits-1-bit) for bit in range(_number_of_bits)]
+    degree,coefficients,initial_numbers = _sobol_direction_numbers[dimension_index-1]
+    direction_numbers = [initial_number << (_number_of_bits-1-bit) for bit,initial_number in enumerate(initial_numbers)]
+    for bit in range(degree,_number_of_bits):
+        direction_number = direction_numbers[bit-degree] ^ (direction_numbers[bit-degree] >> degree)
+        for coefficient_index in range(1,degree):
+            if (coefficients >> (degree-1-coefficient_index)) & 1:
+                direction_number ^= direction_numbers[bit-coefficient_index]
+        direction_numbers.append(direction_number)
+    return direction_numbers
+
+def _GetPrimes(number_of_primes):
+    """
+    function returning the first prime numbers
+    """
+    primes = []
+    candidate = 2
+    while len(primes) < number_of_primes:
+        if all(candidate % prime != 0 for prime in primes):
+            primes.append(candidate)
+        candidate += 1
+    return primes
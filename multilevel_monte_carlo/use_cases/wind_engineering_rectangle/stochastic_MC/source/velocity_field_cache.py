@@ -0,0 +1,53 @@
+# Import Python libraries
+import os
+import numpy as np
+
+# velocity fields already mapped by the current process: {cache file name: array}
+_mapped_velocity_fields = {}
+
+def GetCacheFileName(file_name):
+    """
+    function returning the name of the binary copy of a velocity field file, it changes if the file is modified
+    input:  file_name: name of the velocity field file
+    """
+    file_stat = os.stat(file_name)
+    directory, base_name = os.path.split(file_name)
+    return os.path.join(directory,"." + base_name + "." + str(file_stat.st_size) + "_" + str(file_stat.st_mtime_ns) + ".npy")
+
+def LoadAverageVelocityField(file_name):
+    """
+    function returning the average velocity field stored in a .dat file (one "vx vy vz" line per node) as read-only array
+    the .dat file is converted only once to a binary .npy file next to it, which is memory-mapped afterwards,
+    hence all the workers of a compute node share the same pages of the field instead of parsing their own copy
+    input:  file_name: name of the velocity field file
+    output: array of shape (number of nodes,3)
+    """
+    cache_file_name = GetCacheFileName(file_name)
+    if cache_file_name not in _mapped_velocity_fields:
+        if not os.path.isfile(cache_file_name):
+            velocity_field = np.loadtxt(file_name,usecols=(0,1,2),ndmin=2)
+            # write to a temporary file first, so that concurrent workers never map an incomplete file
+            temporary_file_name = cache_file_name + "." + str(os.getpid()) + ".tmp"
+            with open(temporary_file_name,"wb") as temporary_file:
+                np.save(temporary_file,velocity_field)
+            os.replace(temporary_file_name,cache_file_name)
+        _mapped_velocity_fields[cache_file_name] = np.load(cache_file_name,mmap_mode="r")
+    return _mapped_velocity_fields[cache_file_name]
+
+def PerturbVelocityField(velocity_field,is_free,perturbation_intensity,number_of_perturbed_components):
+    """
+    function adding an uncorrelated uniform perturbation, scaled by the velocity norm, to the velocity of the free nodes
+    the random numbers are drawn with one call, in the same order as drawing them node by node
+    input:  velocity_field: array of shape (number of nodes in the file,3)
+            is_free: boolean array of the model part nodes to perturb, nodes beyond the end of the field are not perturbed
+            perturbation_intensity: the perturbation is drawn from U(-intensity,intensity)
+            number_of_perturbed_components: number of perturbed velocity components (2 in 2D, 3 in 3D)
+    output: free_indices: positions of the perturbed nodes
+            perturbed_velocity: array of shape (number of perturbed nodes,3)
+    """
+    free_indices = np.flatnonzero(is_free[:velocity_field.shape[0]])
+    perturbed_velocity = np.array(velocity_field[free_indices],dtype=np.float64)
+    velocity_norm = np.linalg.norm(perturbed_velocity,axis=1)
+    perturbation = np.random.uniform(-perturbation_intensity,perturbation_intensity,(free_indices.shape[0],number_of_perturbed_components)) * velocity_norm[:,np.newaxis]
+    perturbed_velocity[:,:number_of_perturbed_components] += perturbation
+    return free_indices,perturbed_velocity
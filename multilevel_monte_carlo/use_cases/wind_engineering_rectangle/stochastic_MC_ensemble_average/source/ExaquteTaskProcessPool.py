@@ -0,0 +1,386 @@
+# Import Python libraries
+import os
+import atexit
+import shutil
+import hashlib
+import itertools
+import inspect
+import tempfile
+import functools
+import threading
+import collections
+import multiprocessing
+import concurrent.futures
+
+# Import exaqute API: decorators and parameter types are the ones of the serial scheduler, tasks are overridden below
+from exaqute.ExaquteTaskLocal import *
+
+"""
+Local execution backend of the exaqute API, running the tasks in a pool of worker processes of the current node.
+It replaces
+    from exaqute.ExaquteTaskLocal import *
+with
+    from ExaquteTaskProcessPool import *
+in the execution script and in the XMC distributedEnvironmentFramework.py, and needs no external runtime.
+The semantics are the ones of the PyCOMPSs scheduler:
+    - calling a task returns immediately a future (or a tuple of futures if returns > 1),
+    - futures can be passed, also inside lists and dictionaries, to other tasks, which start once all of them are available,
+    - INOUT parameters are updated in place once the task finishes,
+    - get_value_from_remote waits for and returns the values, keeping the order of lists and dictionaries,
+      therefore reductions over lists of futures are deterministic and independent of the completion order.
+Large bytes arguments (e.g. the pickled model and parameters of each sample) are written once to a temporary file,
+which is removed once no pending task uses it, and each worker keeps the last ones it loaded in memory for the
+following tasks. Only the transfer of the bytes is cached, the tasks still deserialize the model.
+Environment variables:
+    EXAQUTE_LOCAL_WORKERS: number of worker processes, default is the number of cores
+    EXAQUTE_LOCAL_THREADS: number of OpenMP threads of each worker, default is 1
+    EXAQUTE_LOCAL_START_METHOD: multiprocessing start method, default is spawn
+"""
+
+# minimum size of the bytes arguments cached by the workers
+_cached_argument_minimum_size = 1024**2
+# number of bytes arguments kept in memory by each worker
+_worker_cached_arguments_maximum_number = 4
+
+# state of the worker processes
+_is_worker_process = False
+_worker_cached_arguments = collections.OrderedDict() # {hash of bytes argument: bytes argument}, least recently used first
+
+# state of the main process
+_pool = None
+_pool_lock = threading.Lock()
+_submitted_futures = set()
+_pending_inout_futures = {} # {id of INOUT object: future of the last task modifying it}
+_cached_arguments = {} # {id of bytes argument: [bytes argument, cached argument, number of pending tasks using it]}
+_cached_arguments_lock = threading.Lock()
+_cached_arguments_directory = None
+_cached_arguments_counter = itertools.count()
+
+_inout_types = [globals()[name] for name in ("INOUT","COLLECTION_INOUT") if globals().get(name) is not None]
+
+
+class _CachedArgument(object):
+    """
+    large bytes argument stored in a file, which is read only once by each worker
+    """
+    def __init__(self,key,file_name):
+        self.key = key
+        self.file_name = file_name
+
+    def Load(self):
+        """
+        function returning the bytes argument, from the worker memory if recently loaded
+        input:  self: an instance of the class
+        """
+        value = _worker_cached_arguments.pop(self.key,None)
+        if value is None:
+            with open(self.file_name,"rb") as argument_file:
+                value = argument_file.read()
+            while len(_worker_cached_arguments) >= _worker_cached_arguments_maximum_number:
+                _worker_cached_arguments.popitem(last=False)
+        _worker_cached_arguments[self.key] = value
+        return value
+
+
+def _InitializeWorker(number_of_threads):
+    """
+    function initializing a worker process, before any task (and hence Kratos) is imported
+    input:  number_of_threads: number of OpenMP threads of the worker
+    """
+    global _is_worker_process
+    _is_worker_process = True
+    os.environ.setdefault("OMP_NUM_THREADS",str(number_of_threads))
+
+def _GetPool():
+    """
+    function returning the pool of worker processes, which is created at the first task
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            number_of_workers = int(os.environ.get("EXAQUTE_LOCAL_WORKERS",os.cpu_count()))
+            number_of_threads = int(os.environ.get("EXAQUTE_LOCAL_THREADS",1))
+            context = multiprocessing.get_context(os.environ.get("EXAQUTE_LOCAL_START_METHOD","spawn"))
+            _pool = concurrent.futures.ProcessPoolExecutor(max_workers=number_of_workers,mp_context=context,initializer=_InitializeWorker,initargs=(number_of_threads,))
+            atexit.register(_ShutdownPool)
+            print("[INFO] local process pool with",number_of_workers,"workers and",number_of_threads,"threads per worker")
+    return _pool
+
+def _ShutdownPool():
+    """
+    function waiting for the running tasks, stopping the workers and removing the cached arguments
+    """
+    global _pool
+    if _pool is not None:
+        _pool.shutdown(wait=True)
+        _pool = None
+    if _cached_arguments_directory is not None:
+        shutil.rmtree(_cached_arguments_directory,ignore_errors=True)
+    _cached_arguments.clear()
+
+def _CacheArgument(value,used_arguments):
+    """
+    function returning the cached argument of a large bytes argument, writing it to file if no pending task uses it
+    input:  value: bytes argument
+            used_arguments: list of the ids of the cached arguments of the task, to release them once it finishes
+    """
+    global _cached_arguments_directory
+    with _cached_arguments_lock:
+        cached_argument = _cached_arguments.get(id(value))
+        if cached_argument is None:
+            if _cached_arguments_directory is None:
+                _cached_arguments_directory = tempfile.mkdtemp(prefix="exaqute_local_")
+            key = hashlib.sha1(value).hexdigest()
+            file_name = os.path.join(_cached_arguments_directory,key+"_"+str(next(_cached_arguments_counter)))
+            with open(file_name,"wb") as argument_file:
+                argument_file.write(value)
+            # keep a reference to the bytes argument, so that its id is not reused while the entry exists
+            cached_argument = [value,_CachedArgument(key,file_name),0]
+            _cached_arguments[id(value)] = cached_argument
+        cached_argument[2] += 1
+        used_arguments.append(id(value))
+    return cached_argument[1]
+
+def _ReleaseArguments(used_arguments):
+    """
+    function releasing the cached arguments of a finished task, removing the ones no pending task uses
+    input:  used_arguments: list of the ids of the cached arguments of the task
+    """
+    with _cached_arguments_lock:
+        for argument_id in used_arguments:
+            cached_argument = _cached_arguments[argument_id]
+            cached_argument[2] -= 1
+            if cached_argument[2] == 0:
+                del _cached_arguments[argument_id]
+                try:
+                    os.remove(cached_argument[1].file_name)
+                except OSError:
+                    pass
+        del used_arguments[:]
+
+def _CollectFutures(value,futures):
+    """
+    function collecting the futures an argument depends on: futures inside lists, tuples and dictionaries,
+    and the tasks still modifying INOUT arguments
+    input:  value: argument of a task
+            futures: dictionary {id: future} to fill
+    """
+    if isinstance(value,concurrent.futures.Future):
+        futures[id(value)] = value
+    elif isinstance(value,(list,tuple)):
+        for item in value:
+            _CollectFutures(item,futures)
+    elif isinstance(value,dict):
+        for item in value.values():
+            _CollectFutures(item,futures)
+    if id(value) in _pending_inout_futures:
+        futures[id(_pending_inout_futures[id(value)])] = _pending_inout_futures[id(value)]
+
+def _Resolve(value,used_arguments=None):
+    """
+    function replacing the futures of a value, also inside lists, tuples and dictionaries, with their results
+    input:  value: value to resolve
+            used_arguments: if given, replace large bytes with cached arguments, to send them to a worker,
+                            and append their ids to the list
+    """
+    if isinstance(value,concurrent.futures.Future):
+        return value.result()
+    elif isinstance(value,list):
+        return [_Resolve(item,used_arguments) for item in value]
+    elif isinstance(value,tuple):
+        return tuple(_Resolve(item,used_arguments) for item in value)
+    elif isinstance(value,dict):
+        return {key:_Resolve(item,used_arguments) for key,item in value.items()}
+    elif used_arguments is not None and isinstance(value,bytes) and len(value) >= _cached_argument_minimum_size:
+        return _CacheArgument(value,used_arguments)
+    return value
+
+def _Restore(value):
+    """
+    function replacing the cached arguments of a value with their bytes, in the worker
+    input:  value: argument received by the worker
+    """
+    if isinstance(value,_CachedArgument):
+        return value.Load()
+    elif isinstance(value,list):
+        return [_Restore(item) for item in value]
+    elif isinstance(value,tuple):
+        return tuple(_Restore(item) for item in value)
+    elif isinstance(value,dict):
+        return {key:_Restore(item) for key,item in value.items()}
+    return value
+
+def _UpdateInPlace(original,updated):
+    """
+    function copying the state of an INOUT argument modified by a worker to the object of the main process
+    input:  original: object of the main process
+            updated: object returned by the worker
+    """
+    if isinstance(original,list):
+        original[:] = updated
+    elif isinstance(original,dict):
+        original.clear()
+        original.update(updated)
+    elif hasattr(original,"__dict__"):
+        original.__dict__.clear()
+        original.__dict__.update(updated.__dict__)
+    else:
+        raise TypeError("INOUT argument of type "+type(original).__name__+" can not be updated in place")
+
+def _ExecuteTask(task,arguments,keyword_arguments,inout_names):
+    """
+    function running a task in a worker
+    output: result of the task and values of the INOUT arguments after the task
+    """
+    arguments = _Restore(arguments)
+    keyword_arguments = _Restore(keyword_arguments)
+    result = task(*arguments,**keyword_arguments)
+    inout_values = []
+    if inout_names:
+        bound_arguments = inspect.signature(task).bind(*arguments,**keyword_arguments).arguments
+        inout_values = [bound_arguments[name] for name in inout_names]
+    return result,inout_values
+
+def _Submit(task,arguments,keyword_arguments,number_of_returns,inout_names):
+    """
+    function submitting a task to the pool once all the futures it depends on are available
+    output: future of the result, or tuple of futures if number_of_returns > 1
+    """
+    result_future = concurrent.futures.Future()
+    inout_objects = []
+    if inout_names:
+        bound_arguments = inspect.signature(task).bind(*arguments,**keyword_arguments).arguments
+        inout_objects = [bound_arguments[name] for name in inout_names]
+    dependencies = {}
+    _CollectFutures((arguments,keyword_arguments),dependencies)
+    used_arguments = []
+
+    def _Complete(pool_future):
+        _ReleaseArguments(used_arguments)
+        try:
+            result,inout_values = pool_future.result()
+            for inout_object,inout_value in zip(inout_objects,inout_values):
+                # the object of the caller is updated, a future is replaced by its result
+                if isinstance(inout_object,concurrent.futures.Future):
+                    inout_object = inout_object.result()
+                _UpdateInPlace(inout_object,inout_value)
+        except BaseException as error:
+            result_future.set_exception(error)
+        else:
+            result_future.set_result(result)
+
+    def _Launch():
+        try:
+            prepared_arguments = _Resolve(arguments,used_arguments)
+            prepared_keyword_arguments = _Resolve(keyword_arguments,used_arguments)
+            pool_future = _GetPool().submit(_ExecuteTask,task,prepared_arguments,prepared_keyword_arguments,inout_names)
+        except BaseException as error:
+            # a dependency failed or the arguments can not be sent
+            _ReleaseArguments(used_arguments)
+            result_future.set_exception(error)
+        else:
+            pool_future.add_done_callback(_Complete)
+
+    remaining_dependencies = [len(dependencies)]
+    dependencies_lock = threading.Lock()
+    def _OnDependencyDone(dependency_future):
+        with dependencies_lock:
+            remaining_dependencies[0] -= 1
+            is_ready = (remaining_dependencies[0] == 0)
+        if is_ready:
+            _Launch()
+
+    # register the task before launching it, so that barrier and INOUT dependencies see it
+    _submitted_futures.add(result_future)
+    result_future.add_done_callback(_submitted_futures.discard)
+    for inout_object in inout_objects:
+        _pending_inout_futures[id(inout_object)] = result_future
+        result_future.add_done_callback(functools.partial(_RemovePendingInout,id(inout_object)))
+    if len(dependencies) == 0:
+        _Launch()
+    else:
+        for dependency_future in list(dependencies.values()):
+            dependency_future.add_done_callback(_OnDependencyDone)
+
+    if number_of_returns == 1:
+        return result_future
+    return _SplitFuture(result_future,number_of_returns)
+
+def _RemovePendingInout(object_id,future):
+    """
+    function removing an INOUT object from the pending ones, if no later task modifies it
+    """
+    if _pending_inout_futures.get(object_id) is future:
+        del _pending_inout_futures[object_id]
+
+def _SplitFuture(future,number_of_returns):
+    """
+    function returning one future for each of the values returned by a task with number_of_returns > 1
+    """
+    futures = tuple(concurrent.futures.Future() for _ in range(number_of_returns))
+    def _Split(completed_future):
+        error = completed_future.exception()
+        results = [None]*number_of_returns if error is not None else list(completed_future.result())
+        if error is None and len(results) != number_of_returns:
+            error = ValueError("task returned "+str(len(results))+" values instead of "+str(number_of_returns))
+        for counter,item_future in enumerate(futures):
+            if error is not None:
+                item_future.set_exception(error)
+            else:
+                item_future.set_result(results[counter])
+    future.add_done_callback(_Split)
+    return futures
+
+
+class ExaquteTask(object):
+    """
+    task decorator: the decorated function runs in a worker process and returns futures,
+    inside a worker it runs directly (nested tasks are not distributed)
+    """
+    def __init__(self,*args,**kwargs):
+        self.number_of_returns = kwargs.get("returns",1)
+        self.inout_names = [name for name,value in kwargs.items() if name != "returns" and any(value is inout_type for inout_type in _inout_types)]
+
+    def __call__(self,function):
+        @functools.wraps(function)
+        def task(*args,**kwargs):
+            number_of_returns = kwargs.pop("returns",self.number_of_returns)
+            if _is_worker_process:
+                return function(*args,**kwargs)
+            return _Submit(task,args,kwargs,int(number_of_returns),self.inout_names)
+        return task
+
+def get_value_from_remote(obj):
+    """
+    function waiting for the futures of an object, also inside lists, tuples and dictionaries, and returning their values
+    input:  obj: future or object containing futures
+    """
+    futures = {}
+    _CollectFutures(obj,futures)
+    concurrent.futures.wait(list(futures.values()))
+    return _Resolve(obj)
+
+def compute(obj):
+    return get_value_from_remote(obj)
+
+def barrier():
+    """
+    function waiting for all the submitted tasks
+    """
+    while _submitted_futures:
+        concurrent.futures.wait(list(_submitted_futures))
+
+def delete_object(*objs):
+    """
+    function releasing objects, the futures are released once no reference to them is left
+    """
+    for obj in objs:
+        del obj
+
+def delete_file(file_path):
+    """
+    function removing a file once the submitted tasks finished
+    """
+    barrier()
+    if os.path.isfile(file_path):
+        os.remove(file_path)
@@ -1,4 +1,5 @@
 # Import Python libraries
+import os
 import numpy as np
 import time
 
@@ -9,14 +10,25 @@ import KratosMultiphysics.ExaquteSandboxApplication
 from KratosMultiphysics.FluidDynamicsApplication.fluid_dynamics_analysis import FluidDynamicsAnalysis
 import KratosMultiphysics.kratos_utilities as kratos_utilities
 
+# Import time series recorder, force spectrum and burn-in snapshot
+from time_series_recorder import TimeSeriesRecorder
+from streaming_spectrum import StreamingWelchSpectrum
+from burnin_snapshot import GetBurninSnapshotFileName, WriteBurninSnapshot, StartFromBurninSnapshot
+
 
 class FluidDynamicsAnalysisProblemZero(FluidDynamicsAnalysis):
 
     def __init__(self,model,project_parameters):
         super().__init__(model,project_parameters)
-        self.drag_force_vector = np.zeros([0,4])
+        self.drag_force_vector = TimeSeriesRecorder(4)
         # set model part of interest
         self.interest_model_part = "MainModelPart.NoSlip2D_No_Slip_Auto1"
+        # burn-in snapshot, used if problem_data.burnin_snapshot.use_snapshot is true
+        self.burnin_snapshot_file_name = None
+        self.started_from_burnin_snapshot = False
+        self.is_burnin_snapshot_written = False
+        # power spectral density of the drag force components after the burn-in, estimated if problem_data.spectrum is given
+        self.force_spectrum = None
 
     def ModifyInitialProperties(self):
         """
@@ -28,20 +40,58 @@ class FluidDynamicsAnalysisProblemZero(FluidDynamicsAnalysis):
             if aux_process["python_module"].GetString() == "temporal_statistics_process":
                 aux_process["Parameters"]["statistics_start_point_control_value"].SetDouble(self.project_parameters["problem_data"]["burnin_time"].GetDouble())
 
+    def Initialize(self):
+        """
+        function initializing the analysis, the sample starts from the burn-in snapshot of its level if it exists
+        input:  self: an instance of the class
+        """
+        super().Initialize()
+        self.burnin_snapshot_file_name = GetBurninSnapshotFileName(self.project_parameters,self._GetSolver().main_model_part)
+        if (self.burnin_snapshot_file_name is not None) and os.path.isfile(self.burnin_snapshot_file_name):
+            self.time = StartFromBurninSnapshot(self._GetSolver().main_model_part,self.burnin_snapshot_file_name,self.project_parameters)
+            self.started_from_burnin_snapshot = True
+
     def FinalizeSolutionStep(self):
         super().FinalizeSolutionStep()
         # compute drag force
         drag_force_vector = KratosMultiphysics.FluidDynamicsApplication.DragUtilities().CalculateBodyFittedDrag(self.model.GetModelPart(self.interest_model_part))
         drag_force = [self.time,drag_force_vector[0],drag_force_vector[1],drag_force_vector[2]]
-        self.drag_force_vector = np.vstack((self.drag_force_vector,drag_force))
+        # only steps whose previous time is past the burn-in time contribute to the time average, step 0 is not even checked
+        previous_drag_force = self.drag_force_vector.GetLast()
+        is_post_burnin = (previous_drag_force is not None) and (previous_drag_force[0] >= self.project_parameters["problem_data"]["burnin_time"].GetDouble())
+        self.drag_force_vector.Record(drag_force,update_statistics=is_post_burnin)
+        if is_post_burnin and self.project_parameters["problem_data"].Has("spectrum"):
+            if self.force_spectrum is None:
+                spectrum_settings = self.project_parameters["problem_data"]["spectrum"]
+                self.force_spectrum = StreamingWelchSpectrum(3,spectrum_settings["segment_length"].GetInt(),spectrum_settings["overlap"].GetDouble(), \
+                    self._GetSolver().GetComputingModelPart().ProcessInfo[KratosMultiphysics.DELTA_TIME])
+            self.force_spectrum.Update(drag_force[1:])
         # store current force x and moment z for updating the time power sums
         self.current_force_x = drag_force_vector[0]
+        # store the flow state at the end of the burn-in, the following samples of the level start from it
+        if (self.burnin_snapshot_file_name is not None) and (self.started_from_burnin_snapshot is False) and (self.is_burnin_snapshot_written is False) and \
+            (self.time >= self.project_parameters["problem_data"]["burnin_time"].GetDouble()):
+            if not os.path.isfile(self.burnin_snapshot_file_name):
+                WriteBurninSnapshot(self._GetSolver().main_model_part,self.burnin_snapshot_file_name)
+            self.is_burnin_snapshot_written = True
+
+    def GetForcePowerSpectralDensity(self):
+        """
+        function returning frequencies and power spectral density of the drag force components after the burn-in
+        input:  self: an instance of the class
+        output: frequencies, array (number of frequencies,3), None and None if problem_data.spectrum is not given
+        """
+        if not self.project_parameters["problem_data"].Has("spectrum"):
+            return None,None
+        if self.force_spectrum is None:
+            # the burn-in lasted the whole simulation
+            segment_length = self.project_parameters["problem_data"]["spectrum"]["segment_length"].GetInt()
+            return np.zeros(segment_length//2+1),np.zeros((segment_length//2+1,3))
+        return self.force_spectrum.GetFrequencies(),self.force_spectrum.GetPowerSpectralDensity()
 
     def Finalize(self):
         super().Finalize()
-        burnin_time = self.project_parameters["problem_data"]["burnin_time"].GetDouble()
-        force_x_no_washout = [self.drag_force_vector[i,1] for i in range (1,len(self.drag_force_vector[:,0])) if (self.drag_force_vector[i-1,0] >= burnin_time)] # not even check time step 0
-        self.mean_force_x = np.mean(force_x_no_washout)
+        self.mean_force_x = self.drag_force_vector.mean[1]
         print("[INFO] Final averaged drag value", self.mean_force_x)
 
 if __name__ == "__main__":
@@ -1,3 +1,7 @@
+# Import Python libraries
+import collections
+import numpy as np
+
 # Importing the Kratos Library
 import KratosMultiphysics
 
@@ -11,6 +15,54 @@ from  KratosMultiphysics.ConvectionDiffusionApplication.convection_diffusion_ana
 # Avoid printing of Kratos informations
 KratosMultiphysics.Logger.GetDefaultOutput().SetSeverity(KratosMultiphysics.Logger.Severity.WARNING)
 
+# maximum number of meshes whose data are kept by the current process, e.g. one per level of a fixed hierarchy of meshes
+# with stochastic adaptive refinement each sample has its own mesh, and the least recently used ones are discarded
+_maximum_cached_meshes = 4
+
+"""
+least recently used cache of data of meshes, identified by their nodal coordinates
+the coordinates are compared on each hit, hence a collision of their hash never returns the data of another mesh
+input:  maximum_size: maximum number of meshes kept
+"""
+class _MeshCache(object):
+    def __init__(self,maximum_size):
+        self.maximum_size = maximum_size
+        self.entries = collections.OrderedDict()
+
+    """
+    function returning the data of a mesh, a new empty dictionary if the mesh is not cached
+    input:  self: an instance of the class
+            coordinates: nodal coordinates of the mesh
+            settings: further key of the data, e.g. the project parameters
+    output: dictionary of the data of the mesh, True if it is new
+    """
+    def GetOrCreate(self,coordinates,settings=""):
+        key = (coordinates.shape,hash(coordinates.tobytes()),settings)
+        entry = self.entries.get(key)
+        if entry is not None and np.array_equal(entry["coordinates"],coordinates):
+            self.entries.move_to_end(key)
+            return entry["data"], False
+        self.entries.pop(key,None)
+        while len(self.entries) >= self.maximum_size:
+            self.entries.popitem(last=False)
+        entry = {"coordinates":coordinates.copy(),"data":{}}
+        self.entries[key] = entry
+        return entry["data"], True
+
+# mesh data computed by the current process: {"forcing": array, "quadrature_weights": array} of each mesh
+_mesh_data = _MeshCache(_maximum_cached_meshes)
+
+# analysis stages initialized by the current process, reused by the following samples of the same mesh and project parameters: {"analysis": analysis stage}
+_warm_started_analyses = _MeshCache(_maximum_cached_meshes)
+
+"""
+function returning the nodal coordinates of a model part as array of shape (number of nodes,2)
+the coordinates identify the mesh, to reuse forcing and quadrature weights among the samples of the same mesh run by the same process
+input:  model_part: model part of the problem
+"""
+def _GetNodalCoordinates(model_part):
+    return np.array(KratosMultiphysics.VariableUtils().GetCurrentPositionsVector(model_part.Nodes,2)).reshape(-1,2)
+
 """
 SimulationScenario is inherited from the Analysis Stage class and solves the Poisson PDE in domain \Omega = (0,1)^2 with zero Dirichlet boundary conditions
 -lapl(u) = \varepsilon*f    u \in \Omega
@@ -24,6 +76,9 @@ the QoI is
 QoI = \int_(\Omega) u(x,y)dxdy
 """
 class SimulationScenario(ConvectionDiffusionAnalysis):
+    # reuse an analysis stage already initialized by the worker for the same mesh and settings
+    warm_start = True
+
     def __init__(self,input_model,input_parameters,sample):
         self.sample = sample
         super(SimulationScenario,self).__init__(input_model,input_parameters)
@@ -33,29 +88,84 @@ class SimulationScenario(ConvectionDiffusionAnalysis):
         from KratosMultiphysics.ConvectionDiffusionApplication import convection_diffusion_stationary_solver
         return convection_diffusion_stationary_solver.CreateSolver(self.model,self.project_parameters["solver_settings"])
 
+    """
+    function running the sample
+    if warm start is active, the solution is computed by the analysis stage of the worker for the same mesh and settings,
+    which is initialized once the mesh is run a second time, e.g. a level of a fixed hierarchy of meshes: the following samples
+    only reset the solution step data, the time and the forcing. The solution is then copied to the model of the sample,
+    on which the QoI are evaluated. The first sample of a mesh runs as usual, hence samples with their own mesh (stochastic
+    adaptive refinement) never pay the setup of an analysis stage which is not reused
+    input:  self: an instance of the class
+    """
+    def Run(self):
+        if (self.warm_start is not True):
+            super(SimulationScenario,self).Run()
+            return
+        model_part_name = self.project_parameters["problem_data"]["model_part_name"].GetString()
+        model_part = self.model.GetModelPart(model_part_name)
+        warm_start, is_new_mesh = _warm_started_analyses.GetOrCreate(_GetNodalCoordinates(model_part),self.project_parameters.WriteJsonString())
+        if is_new_mesh:
+            super(SimulationScenario,self).Run()
+            return
+        analysis = warm_start.get("analysis")
+        if analysis is None:
+            # the analysis stage owns a copy of the model, hence it is not affected by changes to the model of the sample (e.g. remeshing)
+            serialized_model = KratosMultiphysics.StreamSerializer()
+            serialized_model.Save("ModelSerialization",self.model)
+            analysis_model = KratosMultiphysics.Model()
+            serialized_model.Load("ModelSerialization",analysis_model)
+            analysis = type(self)(analysis_model,self.project_parameters.Clone(),self.sample)
+            analysis.Initialize()
+            warm_start["analysis"] = analysis
+        analysis.RunWarmStartedSample(self.sample)
+        temperature = KratosMultiphysics.VariableUtils().GetSolutionStepValuesVector(analysis.model.GetModelPart(model_part_name).Nodes,KratosMultiphysics.TEMPERATURE,0)
+        KratosMultiphysics.VariableUtils().SetSolutionStepValuesVector(model_part.Nodes,KratosMultiphysics.TEMPERATURE,temperature,0)
+
+    """
+    function solving a new sample with an analysis stage already initialized
+    input:  self: an instance of the class
+            sample: random variables of the new sample
+    """
+    def RunWarmStartedSample(self,sample):
+        self.sample = sample
+        model_part = self._GetSolver().main_model_part
+        KratosMultiphysics.VariableUtils().SetHistoricalVariablesToZero(model_part.Nodes)
+        self.time = self.project_parameters["problem_data"]["start_time"].GetDouble()
+        model_part.ProcessInfo[KratosMultiphysics.TIME] = self.time
+        model_part.ProcessInfo[KratosMultiphysics.STEP] = 0
+        self.ModifyInitialProperties()
+        self.RunSolutionLoop()
+
     """
     function introducing the stochasticity in the right hand side
     input:  self: an instance of the class
     """
     def ModifyInitialProperties(self):
         model_part_name = self.project_parameters["problem_data"]["model_part_name"].GetString()
-        for node in self.model.GetModelPart(model_part_name).Nodes:
-            coord_x = node.X
-            coord_y = node.Y
-            # forcing = -432.0 * coord_x * (coord_x - 1) * coord_y * (coord_y - 1)
-            forcing = -432.0 * (coord_x**2 + coord_y**2 - coord_x - coord_y)
-            node.SetSolutionStepValue(KratosMultiphysics.HEAT_FLUX,forcing*self.sample[0])
+        model_part = self.model.GetModelPart(model_part_name)
+        coordinates = _GetNodalCoordinates(model_part)
+        mesh_data, _ = _mesh_data.GetOrCreate(coordinates)
+        if "forcing" not in mesh_data:
+            coord_x = coordinates[:,0]
+            coord_y = coordinates[:,1]
+            # mesh_data["forcing"] = -432.0 * coord_x * (coord_x - 1) * coord_y * (coord_y - 1)
+            mesh_data["forcing"] = -432.0 * (coord_x**2 + coord_y**2 - coord_x - coord_y)
+        KratosMultiphysics.VariableUtils().SetSolutionStepValuesVector(model_part.Nodes,KratosMultiphysics.HEAT_FLUX,KratosMultiphysics.Vector((mesh_data["forcing"]*self.sample[0]).tolist()),0)
 
     """
     function evaluating the QoI of the problem: int_{domain} TEMPERATURE(x,y) dx dy
-    midpoint rule used to compute the integral
+    midpoint rule used to compute the integral, with nodal weights precomputed once per mesh
     input:  self: an instance of the class
     """
     def EvaluateQuantityOfInterest(self):
-        KratosMultiphysics.CalculateNodalAreaProcess(self._GetSolver().main_model_part,2).Execute()
-        Q = 0.0
-        for node in self._GetSolver().main_model_part.Nodes:
-            Q = Q + (node.GetSolutionStepValue(KratosMultiphysics.NODAL_AREA)*node.GetSolutionStepValue(KratosMultiphysics.TEMPERATURE))
+        model_part = self._GetSolver().main_model_part
+        mesh_data, _ = _mesh_data.GetOrCreate(_GetNodalCoordinates(model_part))
+        if "quadrature_weights" not in mesh_data:
+            # nodal weights of the midpoint rule, i.e. the nodal areas, computed once per mesh
+            KratosMultiphysics.CalculateNodalAreaProcess(model_part,2).Execute()
+            mesh_data["quadrature_weights"] = np.array(KratosMultiphysics.VariableUtils().GetSolutionStepValuesVector(model_part.Nodes,KratosMultiphysics.NODAL_AREA,0))
+        temperature = np.array(KratosMultiphysics.VariableUtils().GetSolutionStepValuesVector(model_part.Nodes,KratosMultiphysics.TEMPERATURE,0))
+        Q = float(np.dot(mesh_data["quadrature_weights"],temperature))
         number_time_steps = 10
         # time_power_sum_1 = [[10*Q],[10*Q*Q],number_time_steps]
         time_power_sum_1 = [[10*Q],[10*Q**2],[10*Q**3],[10*Q**4],[10*Q**5],[10*Q**6],[10*Q**7],[10*Q**8],[10*Q**9],[10*Q**10],number_time_steps]
@@ -1,32 +1,86 @@
-import numpy, math, os
+import numpy, math, os, glob
 import matplotlib.pyplot as plt
 
 plt.rcParams.update({'font.size': 22})
 
-def read_jovic94(table_id):
-    with open("jovic94.dat", "r") as file_input:
-        lines = file_input.readlines()
+def is_numeric_line(line):
+    try:
+        [float(value) for value in line.split()]
+        return len(line.split()) > 0
+    except ValueError:
+        return False
+
+def parse_jovic94(file_name="jovic94.dat"):
+    # parses all tables of the file in one pass, tables which cannot be read as arrays are skipped
+    with open(file_name, "r") as file_input:
+        lines = file_input.read().splitlines()
+
+    tables = {}
+    line_index = 0
+    while line_index < len(lines):
+        line = lines[line_index]
+        line_index += 1
+        if line[:5] != "Table":
+            continue
 
-    start_line = -1
-    table_lines = []
+        table_id = int(line[6:line.find(":")])
+        table_lines = []
+        while line_index < len(lines) and lines[line_index].strip() != "":
+            table_lines.append(lines[line_index])
+            line_index += 1
 
-    for line in lines:
-        if line[:5] == "Table":
-            if int(line[6:line.find(":")]) == table_id:
-                start_line += 1
-                print("Reading " + line[:-1])
+        # skip the column headers
+        first_data_line = 0
+        while first_data_line < len(table_lines) and not is_numeric_line(table_lines[first_data_line]):
+            first_data_line += 1
 
-        if line == "\n":
-            start_line = -1
+        try:
+            tables[table_id] = numpy.genfromtxt(table_lines[first_data_line:], ndmin=2)
+        except ValueError:
+            print("Skipping " + line)
 
-        if (start_line <= 2 and start_line > -1):
-            start_line += 1
-            continue
+    return tables
+
+def load_jovic94(file_name="jovic94.dat"):
+    # returns {table id: data} and stores the parsed tables next to the file, they are re-parsed only if the file changes
+    cache_file_name = os.path.join(os.path.dirname(file_name), "." + os.path.basename(file_name) + ".npz")
+    file_stat = os.stat(file_name)
+    file_key = numpy.array([file_stat.st_size, file_stat.st_mtime_ns])
 
-        if start_line > -1:
-            table_lines.append(line[:-1])
+    if os.path.isfile(cache_file_name):
+        with numpy.load(cache_file_name) as cache:
+            if numpy.array_equal(cache["file_key"], file_key):
+                return {int(key[6:]): cache[key] for key in cache.files if key.startswith("table_")}
 
-    return numpy.loadtxt(table_lines)
+    tables = parse_jovic94(file_name)
+    try:
+        numpy.savez(cache_file_name, file_key=file_key, **{"table_" + str(table_id): data for table_id, data in tables.items()})
+    except OSError: # e.g. read-only folder, the cache is optional
+        pass
+    return tables
+
+jovic94_tables = None
+
+def read_jovic94(table_id):
+    global jovic94_tables
+    if jovic94_tables is None:
+        jovic94_tables = load_jovic94("jovic94.dat")
+    print("Reading Table " + str(table_id))
+    return jovic94_tables[table_id]
+
+line_outputs = None
+
+def read_line_output(filename):
+    # every csv in line_outputs is read once, later calls return the already read data
+    global line_outputs
+    if line_outputs is None:
+        line_outputs = {}
+        for line_output_file_name in glob.glob("line_outputs/*.csv"):
+            line_outputs[os.path.normpath(line_output_file_name)] = numpy.loadtxt(line_output_file_name, delimiter=',')
+    key = os.path.normpath(filename)
+    if key not in line_outputs:
+        line_outputs[key] = numpy.loadtxt(filename, delimiter=',')
+    return line_outputs[key]
 
 
 def plot_jovic_velocity(table_id):
@@ -42,7 +96,7 @@ def plot_jovic_velocity(table_id):
 
 def plot_kratos_velocity(filename, y_offset):
     ref_velocity = 7.72
-    data = numpy.loadtxt(filename, delimiter=',')
+    data = read_line_output(filename)
     plt.plot(
         data[:, 4] / ref_velocity, (data[:, 2] - y_offset) / 9.8e-3,
         "--",
@@ -63,7 +117,7 @@ def plot_jovic_turbulent_kinetic_energy(table_id):
 
 def plot_kratos_turbulent_kinetic_energy(filename, y_offset):
     ref_velocity = 7.72
-    data = numpy.loadtxt(filename, delimiter=',')
+    data = read_line_output(filename)
     plt.plot(
         data[:, 7] / ref_velocity**2, (data[:, 2] - y_offset) / 9.8e-3,
         "--",
@@ -0,0 +1,264 @@
+import os, numpy
+import matplotlib
+import matplotlib.pyplot as plt
+from concurrent.futures import ProcessPoolExecutor
+
+plt.rcParams.update({'font.size': 22})
+
+def get_column_index(headers, column_name):
+    index = -1
+    for header in headers:
+        index += 1
+        if column_name==header:
+            return index
+
+def read_kratos_line_output(file_name):
+    # returns {column name: column data} of a line output csv written by Kratos, the quotes of the headers are removed
+    data = numpy.loadtxt(file_name, skiprows=1, delimiter=",", ndmin=2)
+    with open(file_name, "r") as file_input:
+        headers = [header.strip().strip("\"") for header in file_input.readline().split(",")]
+
+    columns = {}
+    for index, header in enumerate(headers):
+        if header not in columns: # "arc_length" is written twice, the first one is used as in get_column_index
+            columns[header] = data[:, index]
+    return columns
+
+def compute_wall_units(y, u, k, u_tau, kinematic_viscosity):
+    # works on a single profile as well as on several profiles stacked as rows of 2D arrays
+    y_plus = numpy.asarray(y) * (u_tau / kinematic_viscosity)
+    u_plus = numpy.asarray(u) / u_tau
+    k_plus = numpy.asarray(k) / (u_tau * u_tau)
+    return y_plus, u_plus, k_plus
+
+def find_y_plus_cutoff_index(y_plus, initial_y_plus):
+    # index of the first point with y_plus >= initial_y_plus, y_plus has to increase along the line
+    return int(numpy.searchsorted(y_plus, initial_y_plus, side="left"))
+
+def find_y_plus_cutoff_indices(y_plus_profiles, initial_y_plus):
+    return numpy.array([find_y_plus_cutoff_index(y_plus, initial_y_plus) for y_plus in y_plus_profiles], dtype=int)
+
+def compute_wall_unit_profiles(file_names, u_tau, kinematic_viscosity, initial_y_plus):
+    # transforms several line outputs at once, the profiles are stacked if they have the same number of points
+    profiles = [read_kratos_line_output(file_name) for file_name in file_names]
+    profile_sizes = set(profile["arc_length"].shape[0] for profile in profiles)
+
+    if len(profile_sizes) == 1:
+        y = numpy.vstack([profile["arc_length"] for profile in profiles])
+        u = numpy.vstack([profile["VELOCITY_Magnitude"] for profile in profiles])
+        k = numpy.vstack([profile["TURBULENT_KINETIC_ENERGY"] for profile in profiles])
+        y_plus, u_plus, k_plus = compute_wall_units(y, u, k, u_tau, kinematic_viscosity)
+    else:
+        y_plus, u_plus, k_plus = [], [], []
+        for profile in profiles:
+            y_plus_i, u_plus_i, k_plus_i = compute_wall_units(profile["arc_length"], profile["VELOCITY_Magnitude"], profile["TURBULENT_KINETIC_ENERGY"], u_tau, kinematic_viscosity)
+            y_plus.append(y_plus_i)
+            u_plus.append(u_plus_i)
+            k_plus.append(k_plus_i)
+
+    cutoff_indices = find_y_plus_cutoff_indices(y_plus, initial_y_plus)
+    return y_plus, u_plus, k_plus, cutoff_indices
+
+class Channel:
+    def __init__(self, Re_tau, kinematic_viscosity, height, initial_y_plus, output_path="plots"):
+        self.Re_tau = Re_tau
+        self.kinematic_viscosity = kinematic_viscosity
+        self.height = height
+        self.initial_y_plus = initial_y_plus
+        self.output_path = output_path
+
+        self.u_tau = 2.0 * self.Re_tau * self.kinematic_viscosity / self.height
+
+        self.kratos_data = None
+        self.kratos_headers = None
+        self.dns_data_y_plus = None
+        self.dns_data_u_plus = None
+        self.dns_data_k_plus = None
+        self.plot_header = ""
+        self.dns_header = ""
+
+    def ReadKratosCSVFile(self, file_name):
+        self.kratos_data_file_name = file_name
+        self.kratos_data = numpy.loadtxt(file_name, skiprows=1, delimiter=",")
+        with open(file_name, "r") as file_input:
+            self.kratos_headers = file_input.readline()[:-1].split(",")
+
+        self.__modify_kratos_data()
+
+    def __get_kratos_column_data(self, column_name):
+        return self.kratos_data[:, get_column_index(self.kratos_headers, "\"" + column_name + "\"")]
+
+    def __get_plot_file_name(self, plot_name):
+        return os.path.join(self.output_path, "full_channel_re_tau_" + str(int(self.Re_tau)) + "_" + plot_name + ".png")
+
+    def __modify_kratos_data(self):
+        y = self.__get_kratos_column_data("arc_length")
+        y_plus = y * self.u_tau / self.kinematic_viscosity
+
+        index = find_y_plus_cutoff_index(y_plus, self.initial_y_plus)
+        if index < y_plus.shape[0]:
+            self.kratos_data = self.kratos_data[index:,:]
+
+    def plot_u_plus(self):
+        plt.figure(figsize=(12,9))
+        plt.semilogx(self.dns_data_y_plus,
+                     self.dns_data_u_plus,
+                     "r-",
+                     label=self.dns_header)
+
+        u = self.__get_kratos_column_data("VELOCITY_Magnitude")
+        u_plus = u / self.u_tau
+        y = self.__get_kratos_column_data("arc_length")
+        y_plus = y * self.u_tau / self.kinematic_viscosity
+
+        plt.semilogx(y_plus,
+                     u_plus,
+                     "g--",
+                     label=r"RANSApplication $k-\epsilon$ high $Re$")
+
+        plt.grid(True)
+        plt.legend(loc="upper left")
+        plt.xlabel(r"$y^+$")
+        plt.ylabel(r"$u^+$")
+        plt.title(r"Velocity Variation at $Re_\tau=%0.0f$" % (self.Re_tau))
+        plt.savefig(self.__get_plot_file_name("u_plus"), bbox_inches="tight")
+
+    def plot_turbulent_kinetic_energy(self):
+        plt.figure(figsize=(12,9))
+        plt.plot(self.dns_data_y_plus,
+                 self.dns_data_k_plus,
+                 "r-",
+                 label=self.dns_header)
+
+        k = self.__get_kratos_column_data("TURBULENT_KINETIC_ENERGY")
+        k_plus = k / (self.u_tau * self.u_tau)
+        y = self.__get_kratos_column_data("arc_length")
+        y_plus = y * self.u_tau / self.kinematic_viscosity
+
+        plt.plot(y_plus,
+                 k_plus,
+                 "g--",
+                 label=r"RANSApplication $k-\epsilon$ high $Re$")
+
+        plt.grid(True)
+        plt.legend(loc="upper right")
+        plt.xlabel(r"$y^+$")
+        plt.ylabel(r"$k^+$")
+        plt.title(r"Turbulent Kinetic Energy Variation at $Re_\tau=%0.0f$" % (self.Re_tau))
+        plt.savefig(self.__get_plot_file_name("k_plus"), bbox_inches="tight")
+
+    def plot_stresses(self):
+        plt.figure(figsize=(12,9))
+
+        nu_t = self.__get_kratos_column_data("TURBULENT_VISCOSITY")
+        du_dy = self.__get_kratos_column_data("Gradients_1")
+        y = self.__get_kratos_column_data("arc_length")
+        y_plus = y * self.u_tau / self.kinematic_viscosity
+
+        u_tau_2 = self.u_tau * self.u_tau
+
+        reynolds_stress = -nu_t * du_dy / u_tau_2
+        viscous_stress = -self.kinematic_viscosity * du_dy / u_tau_2
+        total_stress = reynolds_stress + viscous_stress
+
+        plt.plot(total_stress,
+                 y_plus,
+                 "g--",
+                 label=r"Total stress $\left[-\frac{\left(\nu + \nu_t\right)}{u_\tau^2}\frac{du}{dy}\right]$")
+
+        plt.plot(viscous_stress,
+                 y_plus,
+                 "b-.",
+                 label=r"Viscous stress $\left[-\frac{\nu}{u_\tau^2}\frac{du}{dy}\right]$")
+
+        plt.plot(reynolds_stress,
+                 y_plus,
+                 "c:",
+                 label=r"Reynolds stress $\left[-\frac{\nu_t}{u_\tau^2}\frac{du}{dy}\right]$")
+
+        plt.plot([-1.0, 0.0], [0.0, self.Re_tau], "r-", label="Reference")
+
+        plt.grid(True)
+        plt.legend(loc="upper left")
+        plt.ylabel(r"$y^+$")
+        plt.xlabel("Stress")
+        plt.title(r"Stress Variation at $Re_\tau=%0.0f$" % (self.Re_tau))
+        plt.savefig(self.__get_plot_file_name("stress"), bbox_inches="tight")
+
+def read_cached_dns_file(file_name, **loadtxt_kwargs):
+    # the parsed DNS file is stored next to it as binary, it is re-parsed only if the DNS file changes
+    cache_file_name = os.path.join(os.path.dirname(file_name), "." + os.path.basename(file_name) + ".npz")
+    file_stat = os.stat(file_name)
+    file_key = numpy.array([file_stat.st_size, file_stat.st_mtime_ns])
+
+    if os.path.isfile(cache_file_name):
+        with numpy.load(cache_file_name) as cache:
+            if numpy.array_equal(cache["file_key"], file_key):
+                return cache["data"]
+
+    data = numpy.loadtxt(file_name, **loadtxt_kwargs)
+    try:
+        numpy.savez(cache_file_name, data=data, file_key=file_key)
+    except OSError: # e.g. read-only folder, the cache is optional
+        pass
+    return data
+
+def read_moser_dns_data(case_path):
+    dns_data = read_cached_dns_file(os.path.join(case_path, "dns_data_Moser/profiles/chan590.means"))
+    y_plus = dns_data[:, 1]
+    u_plus = dns_data[:, 2]
+
+    dns_data = read_cached_dns_file(os.path.join(case_path, "dns_data_Moser/profiles/chan590.reystress"))
+    k_plus = 0.5*(dns_data[:, 2] + dns_data[:, 3] + dns_data[:, 4])
+
+    return y_plus, u_plus, k_plus, r"$Moser$ $et$ $al.$"
+
+def read_sergio_dns_data(case_path, Re_tau):
+    dns_data = read_cached_dns_file(os.path.join(case_path, "dns_data_Sergio/profiles/Re" + str(int(Re_tau)) + ".prof"), comments="%")
+    y_plus = dns_data[:, 1]
+    u_plus = dns_data[:, 2]
+    k_plus = 0.5*(dns_data[:, 3]**2 + dns_data[:, 4]**2 + dns_data[:, 5]**2)
+
+    return y_plus, u_plus, k_plus, r"$Sergio$ $et$ $al.$"
+
+# Re_tau: (case folder, DNS data reader)
+channel_cases = {
+    590.0: ("re_tau_590", lambda case_path: read_moser_dns_data(case_path)),
+    950.0: ("re_tau_950", lambda case_path: read_sergio_dns_data(case_path, 950.0)),
+    2000.0: ("re_tau_2000", lambda case_path: read_sergio_dns_data(case_path, 2000.0))
+}
+
+def create_channel_validation_plots(Re_tau, case_path=None):
+    case_folder, read_dns_data = channel_cases[Re_tau]
+    if case_path is None:
+        case_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), case_folder)
+
+    channel = Channel(Re_tau, 1e-2, 2.0, 12.0, os.path.join(case_path, "plots"))
+    channel.ReadKratosCSVFile(os.path.join(case_path, "line_outputs/x=3.14.csv"))
+    channel.dns_data_y_plus, channel.dns_data_u_plus, channel.dns_data_k_plus, channel.dns_header = read_dns_data(case_path)
+
+    channel.plot_u_plus()
+    channel.plot_turbulent_kinetic_energy()
+    channel.plot_stresses()
+
+    return channel
+
+def _create_channel_validation_plots_headless(Re_tau):
+    create_channel_validation_plots(Re_tau)
+    plt.close("all")
+    return Re_tau
+
+def _initialize_batch_worker():
+    plt.switch_backend("Agg")
+
+def create_all_channel_validation_plots(max_workers=None):
+    # every Re_tau case is processed in its own process, hence the total time is bounded by the slowest case
+    if max_workers is None:
+        max_workers = len(channel_cases)
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_initialize_batch_worker) as executor:
+        for Re_tau in executor.map(_create_channel_validation_plots_headless, channel_cases.keys()):
+            print("Created validation plots for Re_tau = %0.0f" % (Re_tau))
+
+if __name__=="__main__":
+    matplotlib.use("Agg")
+    create_all_channel_validation_plots()
@@ -0,0 +1,50 @@
+import argparse, glob
+
+from channel_validation import compute_wall_unit_profiles
+
+# Prints the wall unit properties of line outputs extracted from a channel flow run, e.g.
+#   python y_plus_analysis.py "re_tau_590/line_outputs/*.csv" --Re_tau 590
+def analyse_y_plus(file_names, Re_tau, kinematic_viscosity, height, initial_y_plus):
+    u_tau = 2.0 * Re_tau * kinematic_viscosity / height
+    y_plus, u_plus, k_plus, cutoff_indices = compute_wall_unit_profiles(file_names, u_tau, kinematic_viscosity, initial_y_plus)
+
+    summary = []
+    for file_name, y_plus_i, u_plus_i, k_plus_i, cutoff_index in zip(file_names, y_plus, u_plus, k_plus, cutoff_indices):
+        summary.append({
+            "file_name": file_name,
+            "number_of_points": y_plus_i.shape[0],
+            "cutoff_index": cutoff_index,
+            "first_y_plus": y_plus_i[min(cutoff_index, y_plus_i.shape[0] - 1)],
+            "max_y_plus": y_plus_i.max(),
+            "max_u_plus": u_plus_i[cutoff_index:].max(initial=0.0),
+            "max_k_plus": k_plus_i[cutoff_index:].max(initial=0.0)
+        })
+    return summary
+
+if __name__=="__main__":
+    parser = argparse.ArgumentParser(description="Wall unit analysis of Kratos line outputs")
+    parser.add_argument("files", nargs="+", help="line output csv files (glob patterns are allowed)")
+    parser.add_argument("--Re_tau", type=float, required=True)
+    parser.add_argument("--kinematic_viscosity", type=float, default=1e-2)
+    parser.add_argument("--height", type=float, default=2.0)
+    parser.add_argument("--initial_y_plus", type=float, default=12.0)
+    parser.add_argument("--output", help="write the summary to this csv file")
+    args = parser.parse_args()
+
+    file_names = []
+    for pattern in args.files:
+        file_names.extend(sorted(glob.glob(pattern)))
+    if len(file_names) == 0:
+        raise Exception("No line output files found for " + str(args.files))
+
+    summary = analyse_y_plus(file_names, args.Re_tau, args.kinematic_viscosity, args.height, args.initial_y_plus)
+
+    columns = ["file_name", "number_of_points", "cutoff_index", "first_y_plus", "max_y_plus", "max_u_plus", "max_k_plus"]
+    for entry in summary:
+        print("%s: %d points, cutoff index %d, y+ = [%0.2f, %0.2f], max u+ = %0.2f, max k+ = %0.4f" % tuple(entry[column] for column in columns))
+
+    if args.output:
+        with open(args.output, "w") as file_output:
+            file_output.write(",".join(columns) + "\n")
+            for entry in summary:
+                file_output.write(",".join(str(entry[column]) for column in columns) + "\n")